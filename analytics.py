@@ -0,0 +1,259 @@
+"""
+KrishiTrack – Time-Series Analytics
+Cost, income, yield and cash-flow series over any date range, bucketed
+by day / week / month / season.
+
+SQL only filters and pre-aggregates: plain range predicates on the
+indexed date columns (no extract() on the column) grouped by date, so
+at most one row per day (per crop) leaves the database. NumPy then
+buckets, accumulates and rolls the fetched arrays.
+
+Costs are expense totals, the same figure as "investment" on the profit
+page. Buckets are calendar aligned, so the first and last may be partial.
+Seasons: Kharif (Jun–Oct), Rabi (Nov–Mar), Summer (Apr–May).
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func, literal, select
+
+GRANULARITIES = ('day', 'week', 'month', 'season')
+
+EPOCH = date(1970, 1, 1)
+
+# Months back from each calendar month (Jan..Dec) to its season's first month.
+SEASON_OFFSET = np.array([2, 3, 4, 0, 1, 0, 1, 2, 3, 4, 0, 1])
+SEASON_NAMES  = {3: 'Summer', 5: 'Kharif', 10: 'Rabi'}        # by first month, 0-based
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Production is reported in quintals per acre, like CropRecommendation.
+# Boxes and bags have no fixed weight, so they count towards income only.
+UNIT_QUINTALS = {'kg': 0.01, 'quintal': 1.0, 'tonne': 10.0}
+
+
+# ─────────────────────────────────────────────────────────────
+#  Buckets
+# ─────────────────────────────────────────────────────────────
+
+def bucket_keys(days, granularity):
+    """Map day numbers (days since 1970-01-01) to integer bucket keys.
+
+    day/week keys are day numbers (weeks start on Monday); month/season
+    keys are month numbers (months since Jan 1970) of the first month.
+    """
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        return days - (days + 3) % 7                # 1970-01-01 was a Thursday
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if granularity == 'month':
+        return months
+    return months - SEASON_OFFSET[months % 12]
+
+
+def bucket_start(key, granularity):
+    if granularity in ('day', 'week'):
+        return EPOCH + timedelta(days=int(key))
+    return date(1970 + int(key) // 12, int(key) % 12 + 1, 1)
+
+
+def bucket_label(key, granularity):
+    start = bucket_start(key, granularity)
+    if granularity == 'day':
+        return start.isoformat()
+    if granularity == 'week':
+        year, week, _ = start.isocalendar()
+        return f'W{week:02d} {year}'
+    if granularity == 'month':
+        return f'{MONTH_NAMES[start.month - 1]} {start.year}'
+    name = SEASON_NAMES[start.month - 1]
+    if name == 'Rabi':
+        return f'Rabi {start.year}-{(start.year + 1) % 100:02d}'
+    return f'{name} {start.year}'
+
+
+def day_numbers(dates):
+    return np.array(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Queries
+# ─────────────────────────────────────────────────────────────
+
+def _fetch(s, start, end, crop_ids):
+    """Daily expense and harvest sums in [start, end] (None: unbounded).
+
+    Rows are (day, crop_id, cost) and (day, crop_id, unit, income,
+    production), money in paise. Without crop_ids they are farm totals, archived crops
+    included, and crop_id is 0.
+    """
+    from models import ArchivedDaily, Expense, Harvest
+    from money import expense_paise, paise
+
+    per_crop = crop_ids is not None
+    exp_crop = Expense.crop_id if per_crop else literal(0)
+    har_crop = Harvest.crop_id if per_crop else literal(0)
+    cost     = func.sum(expense_paise())
+
+    exp = (select(Expense.date, exp_crop, cost)
+           .group_by(Expense.date, *([Expense.crop_id] if per_crop else [])))
+    har = (select(Harvest.harvest_date, har_crop, Harvest.unit,
+                  func.sum(paise(Harvest.total_income)), func.sum(Harvest.total_production))
+           .group_by(Harvest.harvest_date, Harvest.unit,
+                     *([Harvest.crop_id] if per_crop else [])))
+    if start is not None:
+        exp = exp.where(Expense.date >= start, Expense.date <= end)
+        har = har.where(Harvest.harvest_date >= start, Harvest.harvest_date <= end)
+    if per_crop:
+        exp = exp.where(Expense.crop_id.in_(crop_ids))
+        har = har.where(Harvest.crop_id.in_(crop_ids))
+        return s.execute(exp).all(), s.execute(har).all()
+
+    # Archived crops keep contributing to farm totals (already in quintals).
+    arc = select(ArchivedDaily.day, literal(0), literal('quintal'),
+                 func.sum(paise(ArchivedDaily.cost)), func.sum(paise(ArchivedDaily.income)),
+                 func.sum(ArchivedDaily.production_qtl)).group_by(ArchivedDaily.day)
+    if start is not None:
+        arc = arc.where(ArchivedDaily.day >= start, ArchivedDaily.day <= end)
+    archived = s.execute(arc).all()
+    return (s.execute(exp).all() + [(d, c, cost) for d, c, _, cost, _, _ in archived],
+            s.execute(har).all() + [(d, c, u, inc, qtl) for d, c, u, _, inc, qtl in archived])
+
+
+# Farm totals still read every ledger row in the range. For long ranges
+# the whole history is fetched once instead (a few thousand daily rows)
+# and reused, per process, until the ledger version stamp changes.
+FULL_HISTORY_DAYS = 366
+
+_farm_history = {}
+
+
+def _farm_daily(s, start, end):
+    from changes import version_stamp
+
+    version = version_stamp(s, ('expenses', 'harvests'))
+    cached  = _farm_history.get('rows')
+    if cached is None or cached[0] != version:
+        if (end - start).days < FULL_HISTORY_DAYS:
+            return _fetch(s, start, end, None)
+        cached = _farm_history['rows'] = (version, _fetch(s, None, None, None))
+    exp_rows, har_rows = cached[1]
+    return ([r for r in exp_rows if start <= r[0] <= end],
+            [r for r in har_rows if start <= r[0] <= end])
+
+
+# ─────────────────────────────────────────────────────────────
+#  Series
+# ─────────────────────────────────────────────────────────────
+
+def _accumulate(days, owners, values, keys, granularity, n_owners):
+    """Sum values into an (owners × buckets) grid.
+
+    Paise stay whole numbers in float64 (exact below 2**53), so money
+    grids add up without rounding drift.
+    """
+    grid = np.zeros(n_owners * len(keys))
+    if len(days):
+        idx = owners * len(keys) + np.searchsorted(keys, bucket_keys(days, granularity))
+        grid += np.bincount(idx, weights=values, minlength=grid.size)
+    return grid.reshape(n_owners, len(keys))
+
+
+def _rolling(grid, window):
+    """Trailing sum over the last `window` buckets (fewer at the start)."""
+    c = np.cumsum(grid, axis=1)
+    c[:, window:] = c[:, window:] - c[:, :-window]
+    return c
+
+
+def _series(cost, income, production, area, rolling_cost, rolling_income):
+    """Output lists; cost and income grids are in paise, reported in rupees."""
+    def per_acre(a):
+        return np.round(a / area, 2).tolist() if area else [0.0] * len(a)
+
+    def rupees(a):
+        return (a / 100).tolist()
+
+    out = {
+        'cost':           rupees(cost),
+        'income':         rupees(income),
+        'production_qtl': np.round(production, 3).tolist(),
+        'cost_per_acre':  per_acre(cost / 100),
+        'yield_per_acre': per_acre(production),
+        'cash_flow':      rupees(np.cumsum(income - cost)),
+    }
+    if rolling_cost is not None:
+        out['rolling_cost']   = rupees(rolling_cost)
+        out['rolling_income'] = rupees(rolling_income)
+    return out
+
+
+def _grids(exp_rows, har_rows, crop_ids, keys, granularity):
+    """(cost, income, production) grids, one row per crop or one for the farm."""
+    ids = np.array(crop_ids if crop_ids is not None else [0], dtype=np.int64)
+
+    def owners(rows):
+        return np.searchsorted(ids, np.array([r[1] for r in rows], dtype=np.int64))
+
+    def column(rows, i):
+        return np.array([r[i] or 0 for r in rows], dtype=float)
+
+    exp_days = day_numbers([r[0] for r in exp_rows])
+    har_days = day_numbers([r[0] for r in har_rows])
+    to_qtl   = np.array([UNIT_QUINTALS.get(r[2], 0.0) for r in har_rows])
+    return (
+        _accumulate(exp_days, owners(exp_rows), column(exp_rows, 2), keys, granularity, len(ids)),
+        _accumulate(har_days, owners(har_rows), column(har_rows, 3), keys, granularity, len(ids)),
+        _accumulate(har_days, owners(har_rows), column(har_rows, 4) * to_qtl,
+                    keys, granularity, len(ids)),
+    )
+
+
+def timeseries(s, start, end, granularity='month', crop_ids=None, window=None):
+    """Bucketed cost / income / yield / cash-flow series for [start, end].
+
+    Always returns farm totals; per-crop series only for crop_ids.
+    window, if given, adds trailing sums over that many buckets.
+    """
+    from models import ArchivedCrop, Crop
+
+    all_days = np.arange(day_numbers([start])[0], day_numbers([end])[0] + 1)
+    keys     = np.unique(bucket_keys(all_days, granularity))
+
+    crops = []
+    if crop_ids:
+        crops = s.execute(select(Crop.id, Crop.name, Crop.field_area)
+                          .where(Crop.id.in_(crop_ids)).order_by(Crop.id)).all()
+
+    def series(grids, areas):
+        rolled = [_rolling(g, window) for g in grids[:2]] if window else [None, None]
+        return [_series(grids[0][i], grids[1][i], grids[2][i], area,
+                        None if rolled[0] is None else rolled[0][i],
+                        None if rolled[1] is None else rolled[1][i])
+                for i, area in enumerate(areas)]
+
+    # Farm cost and yield include archived crops, so their area counts too.
+    total_area = ((s.scalar(select(func.sum(Crop.field_area))) or 0.0) +
+                  (s.scalar(select(func.sum(ArchivedCrop.field_area))) or 0.0))
+    total      = series(_grids(*_farm_daily(s, start, end), None, keys, granularity),
+                        [total_area])[0]
+    per_crop   = []
+    if crops:
+        ids      = [c.id for c in crops]
+        grids    = _grids(*_fetch(s, start, end, ids), ids, keys, granularity)
+        per_crop = [dict(row, id=c.id, name=c.name, field_area=c.field_area)
+                    for c, row in zip(crops, series(grids, [c.field_area or 0.0 for c in crops]))]
+
+    return {
+        'start':       start,
+        'end':         end,
+        'granularity': granularity,
+        'window':      window,
+        'buckets':     [bucket_start(k, granularity) for k in keys],
+        'labels':      [bucket_label(k, granularity) for k in keys],
+        'total':       dict(total, field_area=total_area),
+        'crops':       per_crop,
+    }
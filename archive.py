@@ -0,0 +1,284 @@
+"""
+KrishiTrack – Season Archive
+Harvested crops of finished seasons leave the hot tables, so crop lists,
+ledgers and the queries behind them stop growing with every season:
+
+  • archived_crops  – one row per crop: rollups (investment, income,
+                      yield, row counts) for the profit history, plus a
+                      zlib-compressed JSON payload of the crop and all of
+                      its expense, labour, harvest and photo rows
+  • archived_daily  – per-crop daily cost / income / yield, which
+                      analytics reads alongside the live ledger
+  • ARCHIVE_PHOTO_FOLDER – the original photo files, off the upload disk
+
+    flask archive-season "Kharif 2024" [--before 2025-03-01] [--dry-run]
+    flask restore-archive --season "Kharif 2024" | --crop 12
+
+Files are copied first and originals removed only after the database
+commit, so a failure half-way never leaves rows pointing at nothing.
+"""
+
+import json
+import os
+import shutil
+import zlib
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import Date, DateTime, delete, func, insert, select
+
+LEDGER = (('expenses', 'Expense'), ('labours', 'Labour'),
+          ('harvests', 'Harvest'), ('photos', 'CropPhoto'))
+
+
+def season_of(day):
+    """'Kharif 2024', 'Rabi 2024-25', 'Summer 2025' – as in analytics."""
+    from analytics import bucket_keys, bucket_label, day_numbers
+    return bucket_label(bucket_keys(day_numbers([day]), 'season')[0], 'season')
+
+
+# ─────────────────────────────────────────────────────────────
+#  Row <-> JSON
+# ─────────────────────────────────────────────────────────────
+
+def _dump(obj):
+    row = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        row[column.key] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return row
+
+
+def _load(model, row):
+    out = {}
+    for column in model.__table__.columns:
+        if column.key not in row:
+            continue
+        value = row[column.key]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        out[column.key] = value
+    return out
+
+
+# ─────────────────────────────────────────────────────────────
+#  Files
+# ─────────────────────────────────────────────────────────────
+
+def _files(crop_row, photo_rows):
+    """(sub-folder, filename) of every file a crop uses."""
+    files = [('crop_photos', p['photo_path']) for p in photo_rows if p['photo_path']]
+    if crop_row.get('image_path'):
+        files.append(('', crop_row['image_path']))
+    return files
+
+
+def _still_used(s, crop_id, folder, name):
+    """Another live row points at the file (shared after a storage reclaim)."""
+    from models import Crop, CropPhoto
+    if folder:
+        stmt = select(CropPhoto.id).where(CropPhoto.photo_path == name,
+                                          CropPhoto.crop_id != crop_id)
+    else:
+        stmt = select(Crop.id).where(Crop.image_path == name, Crop.id != crop_id)
+    return s.scalar(stmt.limit(1)) is not None
+
+
+def _copy(files, src_root, dst_root):
+    for folder, name in files:
+        src, dst = os.path.join(src_root, folder, name), os.path.join(dst_root, folder, name)
+        if os.path.exists(src) and not os.path.exists(dst):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+
+
+def _remove(files, root):
+    for folder, name in files:
+        try:
+            os.remove(os.path.join(root, folder, name))
+        except FileNotFoundError:
+            pass
+
+
+# ─────────────────────────────────────────────────────────────
+#  Archive
+# ─────────────────────────────────────────────────────────────
+
+def finished_crops(s, before, season=None):
+    """[(crop, season, last activity)] of Harvested crops idle since `before`.
+
+    Last activity is the latest of seeding, expected harvest and every
+    ledger date, so a crop still being paid for stays live.
+    """
+    from models import Crop, Expense, Harvest, Labour
+
+    last = {}
+    for model, column in ((Expense, Expense.date), (Labour, Labour.date),
+                          (Harvest, Harvest.harvest_date)):
+        stmt = (select(model.crop_id, func.max(column))
+                .join(Crop, Crop.id == model.crop_id)
+                .where(Crop.status == 'Harvested')
+                .group_by(model.crop_id))
+        for crop_id, day in s.execute(stmt):
+            if day is not None:
+                last[crop_id] = max(day, last.get(crop_id, day))
+
+    out = []
+    for crop in s.scalars(select(Crop).where(Crop.status == 'Harvested').order_by(Crop.id)):
+        idle_since = max(d for d in (crop.seeding_date, crop.expected_harvest,
+                                     last.get(crop.id)) if d is not None)
+        label = season_of(crop.seeding_date)
+        if idle_since < before and (season is None or label.lower() == season.lower()):
+            out.append((crop, label, idle_since))
+    return out
+
+
+def archive_crop(s, crop, season, last_activity):
+    """Move one crop and everything hanging off it into the archive."""
+    import models
+    import views.sync  # noqa: F401  (registers the tombstone listeners for ledger deletes)
+    from analytics import UNIT_QUINTALS
+    from models import ArchivedCrop, ArchivedDaily, ImageHash
+    from money import crop_totals, to_paise, to_rupees
+
+    # Queried, not crop.<collection>: rows left out of the collections are
+    # removed by the database cascade instead of one ORM delete each.
+    rows = {}
+    for key, name in LEDGER:
+        model     = getattr(models, name)
+        rows[key] = s.scalars(select(model).where(model.crop_id == crop.id)
+                              .order_by(model.id)).all()
+    payload = {'crop': _dump(crop)}
+    for key, _ in LEDGER:
+        payload[key] = [_dump(r) for r in rows[key]]
+
+    daily = {}                                        # day -> [cost paise, income paise, qtl]
+    for e in rows['expenses']:
+        if e.date is not None:
+            daily.setdefault(e.date, [0, 0, 0.0])[0] += to_paise(e.total)
+    for h in rows['harvests']:
+        day = daily.setdefault(h.harvest_date, [0, 0, 0.0])
+        day[1] += to_paise(h.total_income or 0)
+        day[2] += (h.total_production or 0.0) * UNIT_QUINTALS.get(h.unit, 0.0)
+    totals = crop_totals(s, [crop.id])
+
+    cold  = current_app.config['ARCHIVE_PHOTO_FOLDER']
+    hot   = current_app.config['UPLOAD_FOLDER']
+    files = _files(payload['crop'], payload['photos'])
+    _copy(files, hot, cold)
+    gone  = [f for f in files if not _still_used(s, crop.id, *f)]
+    for folder, name in gone:
+        s.execute(delete(ImageHash).where(ImageHash.kind == ('photo' if folder else 'crop'),
+                                          ImageHash.path == name))
+
+    archived = ArchivedCrop(
+        crop_id        = crop.id,
+        name           = crop.name,
+        variety        = crop.variety,
+        field_area     = crop.field_area,
+        seeding_date   = crop.seeding_date,
+        season         = season,
+        last_activity  = last_activity,
+        investment     = to_rupees(int(totals['investment'][0])),
+        labour_cost    = to_rupees(int(totals['labour'][0])),
+        income         = to_rupees(int(totals['income'][0])),
+        production_qtl = sum(v[2] for v in daily.values()),
+        expense_count  = len(payload['expenses']),
+        labour_count   = len(payload['labours']),
+        harvest_count  = len(payload['harvests']),
+        photo_count    = len(payload['photos']),
+        payload        = zlib.compress(json.dumps(payload, separators=(',', ':')).encode(), 9),
+    )
+    s.add(archived)
+    s.flush()
+    if daily:
+        s.execute(insert(ArchivedDaily), [
+            {'crop_id': archived.id, 'day': day, 'cost': to_rupees(c), 'income': to_rupees(i),
+             'production_qtl': q}
+            for day, (c, i, q) in daily.items()])
+    s.delete(crop)
+    s.commit()
+    _remove(gone, hot)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Restore
+# ─────────────────────────────────────────────────────────────
+
+def _insert_keeping_ids(s, model, rows):
+    """Insert rows under their old ids unless an id has been reused meanwhile."""
+    taken = set(s.scalars(select(model.id).where(model.id.in_([r['id'] for r in rows]))))
+    keep  = [r for r in rows if r['id'] not in taken]
+    fresh = [{k: v for k, v in r.items() if k != 'id'} for r in rows if r['id'] in taken]
+    for batch in (keep, fresh):
+        if batch:
+            s.execute(insert(model), batch)
+
+
+def restore(s, archived):
+    """Put an archived crop back into the live tables. Returns its crop id."""
+    import models
+    from models import ArchivedDaily, Crop
+    from photo_index import rebuild
+    from workforce import assign_workers
+
+    data = json.loads(zlib.decompress(archived.payload))
+    now  = datetime.utcnow()                          # offline devices pull them again
+
+    crop_row = dict(_load(Crop, data['crop']), updated_at=now)
+    crop_row.pop('sync_seq', None)                    # a new one, from models.change_counter
+    if s.get(Crop, crop_row['id']) is not None:
+        del crop_row['id']
+    crop_id = s.execute(insert(Crop).values(**crop_row)).inserted_primary_key[0]
+
+    for key, name in LEDGER:
+        model = getattr(models, name)
+        rows  = [_load(model, r) for r in data[key]]
+        for r in rows:
+            r['crop_id'] = crop_id
+            r.pop('sync_seq', None)
+            if 'updated_at' in r:
+                r['updated_at'] = now
+        if rows:
+            _insert_keeping_ids(s, model, rows)
+    rebuild(s.connection(), [crop_id])
+    assign_workers(s.connection())                      # rows archived before workers existed
+
+    cold  = current_app.config['ARCHIVE_PHOTO_FOLDER']
+    files = _files(data['crop'], data['photos'])
+    _copy(files, cold, current_app.config['UPLOAD_FOLDER'])
+    s.execute(delete(ArchivedDaily).where(ArchivedDaily.crop_id == archived.id))
+    s.delete(archived)
+    s.commit()
+    _remove(files, cold)
+
+    from search import refresh                          # Core inserts skip its flush hook
+    refresh(s, Crop, Crop.id == crop_id)
+    for model in (models.Expense, models.Labour):
+        refresh(s, model, model.crop_id == crop_id)
+    return crop_id
+
+
+# ─────────────────────────────────────────────────────────────
+#  Profit history
+# ─────────────────────────────────────────────────────────────
+
+def season_totals(s):
+    """Rollups per archived season, newest first (one grouped query)."""
+    from models import ArchivedCrop
+
+    rows = s.execute(
+        select(ArchivedCrop.season,
+               func.count(ArchivedCrop.id),
+               func.sum(ArchivedCrop.field_area),
+               func.sum(ArchivedCrop.investment),
+               func.sum(ArchivedCrop.income),
+               func.max(ArchivedCrop.seeding_date))
+        .group_by(ArchivedCrop.season)
+        .order_by(func.max(ArchivedCrop.seeding_date).desc())).all()
+    return [{'season': season, 'crops': n, 'area': area or 0.0,
+             'investment': inv or 0.0, 'income': inc or 0.0,
+             'profit': (inc or 0.0) - (inv or 0.0)}
+            for season, n, area, inv, inc, _ in rows]
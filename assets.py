@@ -0,0 +1,281 @@
+"""
+KrishiTrack – Static Assets
+Third-party CSS/JS and fonts are vendored under static/vendor/, page CSS
+and JS live in static/src/ (one file per template, named after it).
+
+    flask vendor-assets     # download the pinned CDN files (once, then commit)
+    flask build-assets      # bundle, fingerprint and precompress into static/dist/
+
+Templates ask for a logical name – {{ asset_tags('vendor.css') }},
+{{ asset_tags('market_price.js') }}. After a build that is one
+/assets/<name>.<hash>.<ext> URL from static/dist/manifest.json, served
+with a year-long immutable Cache-Control and the .br / .gz file the
+client accepts, so repeat visits only fetch HTML. Without a build the
+tags point at the unbundled sources under /static (or the CDN for
+vendor files not downloaded yet), so a fresh checkout still runs.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import urllib.request
+from urllib.parse import urljoin, urlsplit
+
+from flask import abort, current_app, request, send_file, url_for
+from markupsafe import Markup, escape
+from werkzeug.security import safe_join
+
+STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Vendored file (under static/vendor/) -> the pinned URL it comes from.
+VENDOR = {
+    'fonts/fonts.css':
+        'https://fonts.googleapis.com/css2?family=Lora:wght@400;600;700'
+        '&family=Nunito:wght@400;500;600;700&display=swap',
+    'bootstrap/bootstrap.min.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css',
+    'bootstrap/bootstrap.bundle.min.js':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js',
+    'bootstrap-icons/bootstrap-icons.min.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.min.css',
+    'chart/chart.umd.min.js':
+        'https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js',
+}
+
+# Logical name -> files under static/, concatenated in order. Every other
+# file in static/src/ is published on its own under its file name.
+BUNDLES = {
+    'vendor.css': ['vendor/fonts/fonts.css', 'vendor/bootstrap/bootstrap.min.css',
+                   'vendor/bootstrap-icons/bootstrap-icons.min.css'],
+    'vendor.js':  ['vendor/bootstrap/bootstrap.bundle.min.js'],
+    'chart.js':   ['vendor/chart/chart.umd.min.js'],
+    'app.css':    ['src/base.css'],
+    'app.js':     ['src/base.js'],
+}
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt')
+ONE_YEAR     = 365 * 24 * 3600
+
+# Google Fonts only serves woff2 to browsers it recognises.
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+CSS_URL    = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+SOURCE_MAP = re.compile(r'/\*# sourceMappingURL=[^*]*\*/|^//# sourceMappingURL=.*$', re.M)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Vendoring
+# ─────────────────────────────────────────────────────────────
+
+def _fetch(url):
+    req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return resp.read()
+
+
+def vendor(static=STATIC):
+    """Download VENDOR into static/vendor/. Fonts referenced by a CSS file
+    are saved next to it in fonts/ and the CSS is rewritten to use them.
+    Returns the paths written, relative to static/vendor/."""
+    written = []
+
+    def save(rel, data):
+        path = os.path.join(static, 'vendor', rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        written.append(rel)
+
+    for rel, url in VENDOR.items():
+        data = _fetch(url)
+        if rel.endswith('.css'):
+            fonts = {}
+
+            def local(match):
+                ref = match.group(2)
+                if ref.startswith('data:'):
+                    return match.group(0)
+                src  = urljoin(url, ref.split('#')[0].split('?')[0])
+                name = 'fonts/' + posixpath.basename(urlsplit(src).path)
+                if fonts.setdefault(name, src) != src:      # same file name, other font
+                    name = f'fonts/{hashlib.sha256(src.encode()).hexdigest()[:8]}-{name[6:]}'
+                    fonts[name] = src
+                return f'url({name})'
+
+            data = CSS_URL.sub(local, data.decode('utf-8')).encode('utf-8')
+            for name, src in fonts.items():
+                save(posixpath.join(posixpath.dirname(rel), name), _fetch(src))
+        save(rel, data)
+    return written
+
+
+# ─────────────────────────────────────────────────────────────
+#  Build
+# ─────────────────────────────────────────────────────────────
+
+def _fingerprint(name, data):
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+
+
+def _compress(path, data):
+    """Write path.gz and path.br (when brotli is installed) if they are smaller."""
+    if not path.endswith(COMPRESSIBLE):
+        return
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gz)
+    try:
+        import brotli
+    except ImportError:
+        return
+    br = brotli.compress(data, quality=11)
+    if len(br) < len(data):
+        with open(path + '.br', 'wb') as f:
+            f.write(br)
+
+
+def build(static=STATIC):
+    """Write every bundle and page asset to static/dist/ under a content
+    hash, with compressed copies and manifest.json. Returns the manifest."""
+    dist = os.path.join(static, 'dist')
+    shutil.rmtree(dist, ignore_errors=True)
+    os.makedirs(dist)
+    published = {}                        # source path -> hashed name (fonts, images)
+
+    def publish(path):
+        if path not in published:
+            with open(path, 'rb') as f:
+                data = f.read()
+            published[path] = write(posixpath.basename(path), data)
+        return published[path]
+
+    def write(name, data):
+        hashed = _fingerprint(name, data)
+        out    = os.path.join(dist, hashed)
+        with open(out, 'wb') as f:
+            f.write(data)
+        _compress(out, data)
+        return hashed
+
+    def read(rel):
+        path = os.path.join(static, rel)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f'{rel} is missing – run `flask vendor-assets` first'
+                                    if rel.startswith('vendor/') else f'{rel} is missing')
+        with open(path, encoding='utf-8') as f:
+            text = SOURCE_MAP.sub('', f.read())
+        if not rel.endswith('.css'):
+            return text
+
+        def rebase(match):                # url() relative to the source -> hashed copy
+            ref = match.group(2)
+            if ref.startswith(('data:', '#')) or urlsplit(ref).scheme or ref.startswith('/'):
+                return match.group(0)
+            target   = os.path.normpath(os.path.join(os.path.dirname(path),
+                                                     ref.split('#')[0].split('?')[0]))
+            fragment = '#' + ref.split('#', 1)[1] if '#' in ref else ''
+            return f'url({publish(target)}{fragment})'
+
+        return CSS_URL.sub(rebase, text)
+
+    manifest = {}
+    for name, parts in BUNDLES.items():
+        joiner = '\n' if name.endswith('.css') else ';\n'
+        manifest[name] = write(name, joiner.join(read(rel) for rel in parts).encode('utf-8'))
+
+    bundled = {rel for parts in BUNDLES.values() for rel in parts}
+    for name in sorted(os.listdir(os.path.join(static, 'src'))):
+        rel = f'src/{name}'
+        if rel not in bundled and name.endswith(('.css', '.js')):
+            manifest[name] = write(name, read(rel).encode('utf-8'))
+
+    tmp = os.path.join(dist, 'manifest.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(dist, 'manifest.json'))
+    return manifest
+
+
+# ─────────────────────────────────────────────────────────────
+#  Templates and serving
+# ─────────────────────────────────────────────────────────────
+
+class Assets:
+    """Maps logical asset names to URLs, from the manifest when built."""
+
+    def __init__(self, static=STATIC, reload=False):
+        self.static   = static
+        self.dist     = os.path.join(static, 'dist')
+        self.reload   = reload                  # re-read the manifest when it changes
+        self.mtime    = None
+        self.manifest = {}
+        self._load()
+
+    def _load(self):
+        path = os.path.join(self.dist, 'manifest.json')
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            self.mtime, self.manifest = None, {}
+            return
+        if mtime != self.mtime:
+            with open(path) as f:
+                self.manifest = json.load(f)
+            self.mtime = mtime
+
+    def urls(self, name):
+        if self.reload:
+            self._load()
+        if name in self.manifest:
+            return [url_for('assets', filename=self.manifest[name])]
+        urls = []
+        for rel in BUNDLES.get(name, [f'src/{name}']):
+            vendored = rel.startswith('vendor/')
+            if vendored and not os.path.isfile(os.path.join(self.static, rel)):
+                urls.append(VENDOR[rel[len('vendor/'):]])
+            else:
+                urls.append(url_for('static', filename=rel))
+        return urls
+
+    def tags(self, name):
+        if name.endswith('.css'):
+            tag = '<link rel="stylesheet" href="{}">'
+        else:
+            tag = '<script src="{}"></script>'
+        return Markup('\n'.join(tag.format(escape(url)) for url in self.urls(name)))
+
+
+def serve(filename):
+    """A built asset, precompressed when the client accepts it."""
+    dist = current_app.extensions['assets'].dist
+    path = safe_join(dist, filename)
+    if path is None or filename == 'manifest.json' or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for enc, ext in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[enc] and os.path.isfile(path + ext):
+            path, encoding = path + ext, enc
+            break
+    response = send_file(path, mimetype=mimetype, max_age=ONE_YEAR, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public    = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    assets = Assets(reload=app.config.get('TEMPLATES_AUTO_RELOAD', False))
+    app.extensions['assets'] = assets
+    app.jinja_env.globals['asset_tags'] = assets.tags
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve)
@@ -0,0 +1 @@
+"""KrishiTrack – benchmark and load-test scripts (not imported by the app)."""
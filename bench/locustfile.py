@@ -0,0 +1,51 @@
+"""
+KrishiTrack – HTTP Load Test (locust)
+Runs against a live server, e.g. the dev server or gunicorn:
+
+    pip install locust
+    BENCH_USER=bench BENCH_PASSWORD=bench-only \\
+        locust -f bench/locustfile.py --host http://127.0.0.1:5000
+
+Create the user first with `python -m bench.routes --generate small`
+against the same database.
+"""
+
+import os
+
+from locust import HttpUser, between, task
+
+
+class FarmerUser(HttpUser):
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.client.post('/login', data={
+            'username': os.environ.get('BENCH_USER', 'bench'),
+            'password': os.environ.get('BENCH_PASSWORD', 'bench-only'),
+        })
+
+    @task(5)
+    def dashboard(self):
+        self.client.get('/dashboard')
+
+    @task(3)
+    def crops(self):
+        self.client.get('/crops')
+
+    @task(2)
+    def profit(self):
+        self.client.get('/profit')
+
+    @task(2)
+    def ledgers(self):
+        self.client.get('/expenses')
+        self.client.get('/labour')
+
+    @task(1)
+    def recommend(self):
+        self.client.post('/crop-recommendation',
+                         data={'season': 'Kharif', 'soil_type': 'Loamy'})
+
+    @task(1)
+    def export(self):
+        self.client.get('/reports/export/crops')
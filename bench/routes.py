@@ -0,0 +1,201 @@
+"""
+KrishiTrack – Route Benchmarks
+Drives the key routes through the Flask test client against a database
+of your choice and records latency and SQL query count per route.
+
+    python -m bench.routes --db sqlite:///bench.db --generate small
+    python -m bench.routes --db mysql+pymysql://root:pw@localhost/krishi_bench --generate small
+    python -m bench.routes --db sqlite:///bench.db --save bench/baseline.json
+    python -m bench.routes --db sqlite:///bench.db --compare bench/baseline.json
+    python -m bench.routes --db sqlite:///bench.db --cached   # fragment cache hit path
+
+The bench profile turns the fragment and shared caches off, so every
+timed run does the route's real work. --cached turns them on; the
+warm-up run fills them and the timed runs measure hits. Compare cached
+results only against a baseline saved with --cached.
+
+The bench profile keeps its search index, sessions and shared cache in
+a sidecar directory of its own (config.sidecar_dir), and --generate
+runs the same post-load steps as `flask gen-synthetic` (workers linked,
+search index rebuilt), so a bench run neither reads nor fills the dev
+database's files.
+
+--compare exits with status 1 when a route's median latency grows past
+--threshold times the baseline, or when it issues more queries than the
+baseline did, so it can gate a CI job.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import event, func, select
+
+SCALES = {
+    'tiny':   dict(crops=50,    expenses=2000,    labours=1000,   harvests=40,   photos=200),
+    'small':  dict(crops=500,   expenses=20000,   labours=10000,  harvests=400,  photos=2000),
+    'medium': dict(crops=5000,  expenses=200000,  labours=100000, harvests=4000, photos=20000),
+    'large':  dict(crops=10000, expenses=1000000, labours=500000, harvests=8000, photos=50000),
+}
+
+ROUTES = [
+    ('GET',  '/dashboard',                None),
+    ('GET',  '/profit',                   None),
+    ('GET',  '/crops',                    None),
+    ('GET',  '/crops?q=Whe',              None),
+    ('GET',  '/expenses',                 None),
+    ('GET',  '/labour',                   None),
+    ('GET',  '/harvest',                  None),
+    ('GET',  '/reports/export/crops',     None),
+    ('GET',  '/reports/export/expenses',  None),
+    ('GET',  '/reports/export/labour',    None),
+    ('GET',  '/reports/export/harvest',   None),
+    ('POST', '/crop-recommendation',      {'season': 'Kharif', 'soil_type': 'Loamy', 'water_req': ''}),
+    ('POST', '/fertilizer',               {'crop_name': 'Wheat'}),
+    ('POST', '/pesticide',                {'crop_name': 'Wheat'}),
+    ('POST', '/profit-prediction',        {'pred_crop': 'Wheat', 'pred_area': '2'}),
+]
+
+
+def build_app(db_url, cached=False):
+    os.environ.setdefault('KRISHITRACK_ENV', 'bench')
+    from app import create_app
+    overrides = {'SQLALCHEMY_DATABASE_URI': db_url}
+    if cached:
+        overrides.update(FRAGMENT_CACHE_ENABLED=True, SHARED_CACHE_ENABLED=True)
+    app = create_app(overrides)
+    if 'shared_cache' in app.extensions:
+        app.extensions['shared_cache'].clear()      # start cold: the warm-up fills it
+    return app
+
+
+def prepare(app, scale, seed):
+    from extensions import db
+    from models import Crop, User
+
+    with app.app_context():
+        from changes import new_epoch
+        db.create_all()
+        with db.engine.begin() as conn:
+            new_epoch(conn, replace=False)
+        if scale and not db.session.scalar(select(func.count(Crop.id))):
+            from synthetic import generate
+            print(f'Generating {scale} dataset (seed={seed}) …')
+            generate(seed=seed, **SCALES[scale])
+
+        user = User.query.filter_by(username='bench').first()
+        if user is None:
+            user = User(username='bench', email='bench@example.com',
+                        full_name='Bench Admin', role='admin')
+            user.set_password('bench-only')
+            db.session.add(user)
+            db.session.commit()
+        return user.id
+
+
+def run(app, user_id, repeat, only=None):
+    from extensions import db
+
+    queries = [0]
+
+    def count(*_args):
+        queries[0] += 1
+
+    results = {}
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+        client = app.test_client()
+        with client.session_transaction() as s:
+            s.update(logged_in=True, user_id=user_id, username='bench',
+                     full_name='Bench Admin', user_role='admin')
+
+        for method, url, form in ROUTES:
+            if only and not any(o in url for o in only):
+                continue
+            timings, counts, status = [], [], None
+            for i in range(repeat + 1):                 # first run is warm-up
+                queries[0] = 0
+                t0   = time.perf_counter()
+                resp = client.open(url, method=method, data=form)
+                _    = resp.get_data()
+                dt   = time.perf_counter() - t0
+                status = resp.status_code
+                if i:
+                    timings.append(dt * 1000)
+                    counts.append(queries[0])
+            timings.sort()
+            results[f'{method} {url}'] = {
+                'status':  status,
+                'p50_ms':  round(statistics.median(timings), 2),
+                'p95_ms':  round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+                'mean_ms': round(statistics.fmean(timings), 2),
+                'queries': int(statistics.median(counts)),
+            }
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return results
+
+
+def report(results, baseline=None, threshold=1.25):
+    regressions = []
+    print(f"{'route':<40} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8}  vs baseline")
+    for route, r in results.items():
+        note = ''
+        base = (baseline or {}).get(route)
+        if base:
+            ratio = r['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 1.0
+            note  = f"{ratio:5.2f}x  q {base['queries']}→{r['queries']}"
+            if ratio > threshold or r['queries'] > base['queries']:
+                note += '  ← REGRESSION'
+                regressions.append(route)
+        print(f"{route:<40} {r['status']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['queries']:>8}  {note}")
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('--db', default='sqlite:///bench.db', help='SQLAlchemy database URL')
+    p.add_argument('--generate', choices=sorted(SCALES), help='generate data if the DB is empty')
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--repeat', type=int, default=5, help='timed runs per route')
+    p.add_argument('--only', nargs='*', help='substring filter on route URLs')
+    p.add_argument('--cached', action='store_true',
+                   help='keep the fragment and shared caches on (times cache hits)')
+    p.add_argument('--save', help='write results JSON here')
+    p.add_argument('--compare', help='baseline JSON to compare against')
+    p.add_argument('--threshold', type=float, default=1.25,
+                   help='allowed p50 slowdown factor before failing')
+    args = p.parse_args(argv)
+
+    app     = build_app(args.db, args.cached)
+    user_id = prepare(app, args.generate, args.seed)
+    results = run(app, user_id, args.repeat, args.only)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        if saved.get('cached', False) != args.cached:
+            print('Baseline was saved with%s --cached; not comparable.'
+                  % ('' if saved.get('cached') else 'out'))
+            return 2
+        baseline = saved['routes']
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'db': app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1],
+                       'repeat': args.repeat, 'cached': args.cached,
+                       'routes': results}, f, indent=2)
+        print(f'Saved {args.save}')
+    if regressions:
+        print(f'{len(regressions)} route(s) regressed.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
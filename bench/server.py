@@ -0,0 +1,192 @@
+"""
+KrishiTrack – Server Load Test
+Runs the app under the Flask dev server and under gunicorn (with
+gunicorn.conf.py), drives each with the same logged-in clients for a
+fixed time and compares throughput and latency.
+
+    python -m bench.server --db sqlite:///bench.db --generate small
+    python -m bench.server --clients 32 --seconds 30 --servers gunicorn
+    python -m bench.server --save bench/server.json
+
+Both servers get KRISHITRACK_ENV=bench and the same database. Clients
+are several processes of keep-alive threads, so one interpreter's GIL
+does not cap the load; on a small machine they still share the CPUs
+with the server, which understates the gap. For a browser-like mix
+against a server you started yourself, see bench/locustfile.py.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Pool
+from urllib.parse import urlencode
+
+from bench.routes import ROUTES, SCALES, build_app, prepare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'dev':      [sys.executable, 'app.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', 'app:create_app()'],
+}
+
+# Page views only: exports are timed by bench.routes and would dominate here.
+URLS = [url for method, url, _ in ROUTES if method == 'GET' and '/export/' not in url]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start(name, db_url, port):
+    env = dict(os.environ, KRISHITRACK_ENV='bench', DATABASE_URL=db_url, PORT=str(port),
+               GUNICORN_BIND=f'127.0.0.1:{port}')
+    log  = tempfile.TemporaryFile()
+    proc = subprocess.Popen(SERVERS[name], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=log)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f'{name} exited:\n{log.read().decode()[-2000:]}')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/login')
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f'{name} did not answer on port {port}')
+
+
+# ─────────────────────────────────────────────────────────────
+#  Clients
+# ─────────────────────────────────────────────────────────────
+
+def login(conn, user, password):
+    """Log in (retrying while the server sheds hashing load). Returns the Cookie header."""
+    body = urlencode({'username': user, 'password': password})
+    for _ in range(50):
+        conn.request('POST', '/login', body,
+                     {'Content-Type': 'application/x-www-form-urlencoded'})
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status == 302:
+            return '; '.join(c.split(';', 1)[0] for c in resp.headers.get_all('Set-Cookie') or [])
+        time.sleep(0.2)
+    raise RuntimeError(f'login failed: HTTP {resp.status}')
+
+
+def client_thread(port, seconds, offset, out):
+    conn   = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    cookie = login(conn, 'bench', 'bench-only')
+    timings, errors, i = [], 0, offset
+    t_end = time.perf_counter() + seconds
+    while True:
+        t0 = time.perf_counter()
+        if t0 >= t_end:
+            break
+        try:
+            conn.request('GET', URLS[i % len(URLS)], headers={'Cookie': cookie})
+            resp = conn.getresponse()
+            resp.read()
+            ok = resp.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            ok = False
+        timings.append(time.perf_counter() - t0)
+        errors += not ok
+        i += 1
+    out.append((timings, errors))
+
+
+def client_process(args):
+    port, seconds, threads, first = args
+    out  = []
+    pool = [threading.Thread(target=client_thread, args=(port, seconds, first + t, out))
+            for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return out
+
+
+def load(port, clients, seconds):
+    processes = max(1, min(clients, os.cpu_count() or 1, 8))
+    per_proc  = -(-clients // processes)
+    jobs      = [(port, seconds, per_proc, p * per_proc) for p in range(processes)]
+    with Pool(processes) as pool:
+        results = [r for out in pool.map(client_process, jobs) for r in out]
+
+    timings = sorted(t * 1000 for ts, _ in results for t in ts)
+    # Threads log in at different moments; each ran for `seconds` on its own.
+    return {
+        'clients':    processes * per_proc,
+        'requests':   len(timings),
+        'errors':     sum(e for _, e in results),
+        'rps':        round(sum(len(ts) for ts, _ in results) / seconds, 1),
+        'p50_ms':     round(statistics.median(timings), 1),
+        'p95_ms':     round(timings[int(len(timings) * 0.95)], 1),
+        'p99_ms':     round(timings[int(len(timings) * 0.99)], 1),
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+#  CLI
+# ─────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('--db', default='sqlite:///bench.db', help='SQLAlchemy database URL')
+    p.add_argument('--generate', choices=sorted(SCALES),
+                   help='generate data if the DB is empty')
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--servers', nargs='*', default=list(SERVERS), choices=list(SERVERS))
+    p.add_argument('--clients', type=int, default=16, help='concurrent connections')
+    p.add_argument('--seconds', type=float, default=15, help='measured time per server')
+    p.add_argument('--save', help='write results JSON here')
+    args = p.parse_args(argv)
+
+    prepare(build_app(args.db), args.generate, args.seed)
+
+    results = {}
+    for name in args.servers:
+        port = free_port()
+        proc = start(name, args.db, port)
+        try:
+            load(port, min(args.clients, 4), 2)                # warm caches and workers
+            results[name] = load(port, args.clients, args.seconds)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    base = results.get('dev')
+    print(f"{'server':<10} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'errors':>7}  vs dev")
+    for name, r in results.items():
+        note = f"{r['rps'] / base['rps']:5.2f}x" if base and base['rps'] else ''
+        print(f"{name:<10} {r['clients']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7}  {note}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'db': args.db.split('@')[-1], 'cpus': os.cpu_count(),
+                       'seconds': args.seconds, 'servers': results}, f, indent=2)
+        print(f'Saved {args.save}')
+    return 0 if all(r['errors'] == 0 for r in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
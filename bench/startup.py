@@ -0,0 +1,129 @@
+"""
+KrishiTrack – Startup Benchmarks
+Times cold start in fresh interpreters: importing the app module,
+create_app(), the first request (which loads the blueprints) and a
+`flask` CLI call. Each case runs in its own subprocess.
+
+    python -m bench.startup
+    python -m bench.startup --repeat 10 --save bench/startup.json
+    python -m bench.startup --compare bench/startup.json
+
+--compare exits with status 1 when a case's median grows past
+--threshold times the baseline.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet prints its own elapsed milliseconds on the last line.
+CASES = {
+    'import app': """
+t0 = time.perf_counter()
+import app
+""",
+    'create_app()': """
+t0 = time.perf_counter()
+from app import create_app
+create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+""",
+    'create_app() eager': """
+t0 = time.perf_counter()
+from app import create_app
+create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'LAZY_BLUEPRINTS': False})
+""",
+    'first request': """
+t0 = time.perf_counter()
+from app import create_app
+create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}).test_client().get('/login')
+""",
+}
+CLI_CASES = {
+    'flask --help':            ['--help'],
+    'flask upgrade-db --help': ['upgrade-db', '--help'],
+}
+
+
+def time_snippet(body):
+    code = 'import time\n' + body + '\nprint((time.perf_counter() - t0) * 1000)\n'
+    out  = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                          capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def time_cli(args):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', *args], cwd=ROOT,
+                   check=True, capture_output=True)
+    return (time.perf_counter() - t0) * 1000
+
+
+def run(repeat, only=None):
+    results = {}
+    jobs = [(name, time_snippet, body) for name, body in CASES.items()]
+    jobs += [(name, time_cli, args) for name, args in CLI_CASES.items()]
+    for name, fn, arg in jobs:
+        if only and not any(o in name for o in only):
+            continue
+        fn(arg)                                         # warm the OS page cache
+        timings = sorted(fn(arg) for _ in range(repeat))
+        results[name] = {
+            'p50_ms': round(statistics.median(timings), 1),
+            'min_ms': round(timings[0], 1),
+            'max_ms': round(timings[-1], 1),
+        }
+    return results
+
+
+def report(results, baseline=None, threshold=1.25):
+    regressions = []
+    print(f"{'case':<24} {'p50 ms':>9} {'min ms':>9} {'max ms':>9}  vs baseline")
+    for name, r in results.items():
+        note = ''
+        base = (baseline or {}).get(name)
+        if base:
+            ratio = r['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 1.0
+            note  = f'{ratio:5.2f}x'
+            if ratio > threshold:
+                note += '  ← REGRESSION'
+                regressions.append(name)
+        print(f"{name:<24} {r['p50_ms']:>9.1f} {r['min_ms']:>9.1f} {r['max_ms']:>9.1f}  {note}")
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    p.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    p.add_argument('--only', nargs='*', help='substring filter on case names')
+    p.add_argument('--save', help='write results JSON here')
+    p.add_argument('--compare', help='baseline JSON to compare against')
+    p.add_argument('--threshold', type=float, default=1.25,
+                   help='allowed p50 slowdown factor before failing')
+    args = p.parse_args(argv)
+
+    results  = run(args.repeat, args.only)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['cases']
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'repeat': args.repeat,
+                       'cases': results}, f, indent=2)
+        print(f'Saved {args.save}')
+    if regressions:
+        print(f'{len(regressions)} case(s) regressed.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+KrishiTrack – Change Feed
+Every write to a versioned table bumps counters in the small
+data_versions table, in the same transaction as the write:
+
+  • (table, 0)        – any change to the table
+  • (table, crop_id)  – a change to that crop's rows (the crop itself for
+                        'crops'); deleting a crop also bumps its cascaded
+                        ledger and photo rows
+  • (table, -1)       – a change whose crops are unknown (UPDATE / DELETE
+                        statements, large bulk inserts); per-crop stamps
+                        include it
+
+All of a write's counters go in one upsert statement. ORM flushes are
+seen by a before_flush hook, statements sent through the session
+(unit_of_work(), bulk inserts) by do_orm_execute. Writes on a raw
+Connection must call bump() themselves, as workforce.assign_workers does.
+
+The counters are bumped before the rows are written, and their rows stay
+locked until commit, so writers of a table take turns and each sees the
+(table, 0) counter its predecessor committed. Synced tables copy it into
+sync_seq (models.change_counter), which therefore grows in commit order:
+offline sync pages on it (views/sync.py).
+
+version_stamp() reads the counters of a few tables, table-wide or for one
+crop, by primary key, so every worker can check "has this changed?" on
+each request without touching the ledger tables. fragment_cache.data_version()
+and the analytics history cache key on it; pages about one crop
+(@not_modified(..., per_crop=...)) are not invalidated by writes to others.
+
+Counters start over when a database is re-created or a dump restored, so
+every stamp also carries the database's epoch: a random number in the
+('_epoch', 0) row, written by `flask upgrade-db` / `init-db` and replaced
+by `flask clear-cache`. Stamps of two databases, or of one database
+before and after a restore, never match.
+"""
+
+import secrets
+from datetime import datetime
+
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+# Tables whose changes are counted, and what deleting a crop takes with it.
+VERSIONED = ('crops', 'expenses', 'labours', 'harvests', 'workers', 'crop_photos',
+             'crop_recommendations', 'fertilizer_recommendations',
+             'pesticide_recommendations', 'seasonal_alerts')
+CASCADES  = {'crops': ('expenses', 'labours', 'harvests', 'crop_photos')}
+EPOCH     = '_epoch'
+
+TABLE    = 0
+UNSCOPED = -1
+# Bulk inserts touching more crops than this bump (table, -1) instead.
+MAX_CROPS_PER_STATEMENT = 100
+
+
+def _table():
+    from models import DataVersion
+    return DataVersion.__table__
+
+
+# ─────────────────────────────────────────────────────────────
+#  Writes
+# ─────────────────────────────────────────────────────────────
+
+def _upsert(conn, t, rows):
+    dialect = conn.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(t)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.table_name, t.c.crop_id],
+            set_={'version': t.c.version + 1, 'updated_at': stmt.excluded.updated_at})
+    elif dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(t)
+        stmt = stmt.on_duplicate_key_update(version=t.c.version + 1,
+                                            updated_at=stmt.inserted.updated_at)
+    else:
+        for row in rows:
+            bumped = conn.execute(update(t)
+                                  .where(t.c.table_name == row['table_name'],
+                                         t.c.crop_id == row['crop_id'])
+                                  .values(version=t.c.version + 1,
+                                          updated_at=row['updated_at'])).rowcount
+            if not bumped:
+                conn.execute(insert(t), row)
+        return
+    conn.execute(stmt, rows)
+
+
+def bump(conn, changes):
+    """Count a change for each (table, crop_id or None) in `changes`."""
+    keys = set()
+    for table, crop_id in changes:
+        keys.add((table, TABLE))
+        keys.add((table, UNSCOPED if crop_id is None else crop_id))
+        if crop_id is None:                        # may have been a DELETE of crops
+            for child in CASCADES.get(table, ()):
+                keys |= {(child, TABLE), (child, UNSCOPED)}
+    if not keys:
+        return
+    now  = datetime.utcnow()
+    rows = [{'table_name': t, 'crop_id': c, 'version': 1, 'updated_at': now}
+            for t, c in sorted(keys)]              # one lock order for every writer
+    _upsert(conn, _table(), rows)
+
+
+def new_epoch(conn, replace=True):
+    """Give the database a new random epoch (only if it has none, with
+    replace=False). Every stamp read afterwards differs from all before."""
+    t     = _table()
+    row   = {'table_name': EPOCH, 'crop_id': TABLE, 'version': secrets.randbits(62),
+             'updated_at': datetime.utcnow()}
+    where = (t.c.table_name == EPOCH, t.c.crop_id == TABLE)
+    if conn.execute(select(t.c.version).where(*where)).first() is None:
+        conn.execute(insert(t), row)
+    elif replace:
+        conn.execute(update(t).where(*where)
+                     .values(version=row['version'], updated_at=row['updated_at']))
+
+
+def _crop_ids(obj, table):
+    if table == 'crops':
+        return {TABLE if obj.id is None else obj.id}     # a new crop has no pages yet
+    if not hasattr(obj, 'crop_id'):
+        return {None}
+    state = inspect(obj)
+    ids   = {obj.crop_id, *state.attrs.crop_id.history.deleted}   # moved to another crop
+    crop  = state.dict.get('crop')                  # set through the relationship, not synced yet
+    if crop is not None:
+        ids.add(TABLE if crop.id is None else crop.id)
+    return {i for i in ids if i is not None} or {None}
+
+
+def _before_flush(sess, flush_context, instances):
+    changes = set()
+    dirty   = [o for o in sess.dirty if sess.is_modified(o, include_collections=False)]
+    for obj in (*sess.new, *dirty, *sess.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table in VERSIONED:
+            changes.update((table, crop_id) for crop_id in _crop_ids(obj, table))
+    for obj in sess.deleted:
+        for child in CASCADES.get(getattr(obj, '__tablename__', None), ()):
+            changes.add((child, obj.id))
+    if changes:
+        bump(sess.connection(), changes)
+
+
+def _do_orm_execute(state):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(getattr(state.statement, 'table', None), 'name', None)
+    if table not in VERSIONED:
+        return
+    crop_ids = {None}
+    params   = state.parameters
+    if state.is_insert and params:
+        rows = params if isinstance(params, (list, tuple)) else [params]
+        key  = 'id' if table == 'crops' else 'crop_id'
+        ids  = {row.get(key) for row in rows}
+        if None not in ids and len(ids) <= MAX_CROPS_PER_STATEMENT:
+            crop_ids = ids
+    bump(state.session.connection(), {(table, crop_id) for crop_id in crop_ids})
+
+
+# ─────────────────────────────────────────────────────────────
+#  Reads
+# ─────────────────────────────────────────────────────────────
+
+def current_versions(s, tables, crop_id=None):
+    """{(table, key): version} for the tables, table-wide or for one crop,
+    and (EPOCH, 0). Counters never bumped yet are missing."""
+    t    = _table()
+    keys = [TABLE] if crop_id is None else [crop_id, UNSCOPED]
+    rows = s.execute(select(t.c.table_name, t.c.crop_id, t.c.version)
+                     .where(t.c.table_name.in_(tables), t.c.crop_id.in_(keys))
+                     .union_all(select(t.c.table_name, t.c.crop_id, t.c.version)
+                                .where(t.c.table_name == EPOCH, t.c.crop_id == TABLE)))
+    return {(name, key): version for name, key, version in rows}
+
+
+def version_stamp(s, tables, crop_id=None):
+    """A string that changes whenever any of `tables` (or that crop's rows
+    in them) change, prefixed by the database epoch. Counters never
+    bumped yet count as 0."""
+    found = current_versions(s, tables, crop_id)
+    keys  = [TABLE] if crop_id is None else [crop_id, UNSCOPED]
+    return (f'{found.get((EPOCH, TABLE), 0):x}:'
+            + '/'.join(str(found.get((t, k), 0)) for t in sorted(tables) for k in keys))
+
+
+def init_changes(app):
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
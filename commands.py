@@ -0,0 +1,241 @@
+"""
+KrishiTrack – CLI Commands
+flask init-db | gen-synthetic | upgrade-db | train-forecast | build-assets
+"""
+
+from datetime import date, timedelta
+
+import click
+
+from extensions import db
+
+
+def register_commands(app):
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create all tables and seed sample data."""
+        from changes import new_epoch
+        db.create_all()
+        with db.engine.begin() as conn:
+            new_epoch(conn)                          # counters may have started over
+        seed_sample_data()
+        print("✅  Database initialised with sample data.")
+
+    @app.cli.command('gen-synthetic')
+    @click.option('--crops',    default=10000,   show_default=True)
+    @click.option('--expenses', default=1000000, show_default=True)
+    @click.option('--labours',  default=500000,  show_default=True)
+    @click.option('--harvests', default=8000,    show_default=True)
+    @click.option('--photos',   default=50000,   show_default=True)
+    @click.option('--seed',     default=42,      show_default=True)
+    def gen_synthetic(crops, expenses, labours, harvests, photos, seed):
+        """Bulk-generate a reproducible large-farm dataset."""
+        from synthetic import generate
+        from changes import new_epoch
+        db.create_all()
+        with db.engine.begin() as conn:
+            new_epoch(conn, replace=False)
+        counts = generate(crops=crops, expenses=expenses, labours=labours,
+                          harvests=harvests, photos=photos, seed=seed)
+        print(f"✅  Generated {sum(counts.values()):,} rows (seed={seed}).")
+
+    @app.cli.command('upgrade-db')
+    def upgrade_db():
+        """Create new tables and apply pending schema migrations."""
+        from migrations import upgrade
+        applied = upgrade()
+        for name in applied:
+            print(f"   applied {name}")
+        print(f"✅  Database up to date ({len(applied)} migration(s) applied).")
+
+    @app.cli.command('rebuild-photo-index')
+    def rebuild_photo_index():
+        """Recompute the per-crop photo timeline index."""
+        from photo_index import rebuild
+        with db.engine.begin() as conn:
+            n = rebuild(conn)
+        print(f"✅  Photo index rebuilt for {n} crop(s).")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Re-index crops, ledger notes, workers and advice for search."""
+        n = app.extensions['search'].rebuild(db.session)
+        print(f"✅  Search index rebuilt ({n} documents).")
+
+    @app.cli.command('train-forecast')
+    def train_forecast():
+        """Fit yield, price and cost models on the harvest history."""
+        from forecast import train
+        table = train(db.session, app.config['FORECAST_MODEL_PATH'])
+        crops = table[table['variety'] == '']
+        print(f"   {int(crops['n'].sum())} harvested crop(s) -> "
+              f"{int((crops['n'] > 0).sum())} crop and "
+              f"{int((table['variety'] != '').sum())} variety model(s)")
+        print(f"✅  Forecast model written to {app.config['FORECAST_MODEL_PATH']}.")
+
+    @app.cli.command('vendor-assets')
+    def vendor_assets():
+        """Download the pinned CSS/JS/font files into static/vendor/."""
+        from assets import vendor
+        written = vendor()
+        for rel in written:
+            print(f"   static/vendor/{rel}")
+        print(f"✅  {len(written)} vendor file(s) downloaded – commit them.")
+
+    @app.cli.command('build-assets')
+    def build_assets():
+        """Bundle, fingerprint and precompress static assets into static/dist/."""
+        from assets import build
+        try:
+            manifest = build()
+        except FileNotFoundError as e:
+            raise click.ClickException(str(e))
+        for name, hashed in manifest.items():
+            print(f"   {name:<24} -> {hashed}")
+        print(f"✅  {len(manifest)} asset(s) built – restart the app to serve them.")
+
+    @app.cli.command('hash-images')
+    @click.option('--batch', default=200, show_default=True, help='Files per commit.')
+    def hash_images(batch):
+        """Compute perceptual hashes for uploaded images that lack one."""
+        from image_hash import hash_pending
+        total = 0
+        while (n := hash_pending(db.session, batch)):
+            total += n
+            print(f"   hashed {total}")
+        print(f"✅  {total} image(s) hashed.")
+
+    @app.cli.command('archive-season')
+    @click.argument('season', required=False)
+    @click.option('--before', type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Only crops idle since before this date '
+                       '[default: ARCHIVE_AFTER_DAYS ago].')
+    @click.option('--dry-run', is_flag=True, help='List the crops, change nothing.')
+    def archive_season(season, before, dry_run):
+        """Move harvested crops of finished seasons to the archive.
+
+        SEASON is e.g. "Kharif 2024" or "Rabi 2024-25"; all seasons if omitted.
+        """
+        from archive import archive_crop, finished_crops
+        before = (before.date() if before else
+                  date.today() - timedelta(days=app.config['ARCHIVE_AFTER_DAYS']))
+        crops  = finished_crops(db.session, before, season)
+        for crop, label, last in crops:
+            print(f"   {label:<14} #{crop.id} {crop.name} (last activity {last})")
+            if not dry_run:
+                archive_crop(db.session, crop, label, last)
+        verb = 'would be archived' if dry_run else 'archived'
+        print(f"✅  {len(crops)} crop(s) {verb}.")
+
+    @app.cli.command('restore-archive')
+    @click.option('--season', help='Restore every crop of this season.')
+    @click.option('--crop', 'crop_ids', type=int, multiple=True,
+                  help='Original id of an archived crop.')
+    def restore_archive(season, crop_ids):
+        """Move archived crops back into the live tables."""
+        from archive import restore
+        from models import ArchivedCrop
+        if not season and not crop_ids:
+            raise click.UsageError("Give --season or --crop.")
+        query = ArchivedCrop.query
+        if season:
+            query = query.filter(db.func.lower(ArchivedCrop.season) == season.lower())
+        if crop_ids:
+            query = query.filter(ArchivedCrop.crop_id.in_(crop_ids))
+        archived = query.order_by(ArchivedCrop.id).all()
+        for a in archived:
+            crop_id = restore(db.session, a)
+            print(f"   restored {a.name} ({a.season}) as crop #{crop_id}")
+        print(f"✅  {len(archived)} crop(s) restored.")
+
+    @app.cli.command('purge-sessions')
+    def purge_sessions():
+        """Delete expired server-side sessions."""
+        store = getattr(app.session_interface, 'store', None)
+        if store is None or not hasattr(store, 'purge'):
+            print("Nothing to purge for this SESSION_BACKEND.")
+            return
+        total = 0
+        while (n := store.purge()):
+            total += n
+        print(f"✅  Purged {total} expired session(s).")
+
+    @app.cli.command('clear-cache')
+    def clear_cache():
+        """Start a new cache epoch and drop the host-wide shared cache.
+        Run after restoring a database dump."""
+        from changes import new_epoch
+        with db.engine.begin() as conn:
+            new_epoch(conn)
+        cache = app.extensions.get('shared_cache')
+        if cache is not None:
+            cache.clear()
+        print("✅  Cache epoch renewed%s." % ('' if cache is None else ', shared cache cleared'))
+
+    @app.cli.command('deactivate-user')
+    @click.argument('username')
+    def deactivate_user(username):
+        """Deactivate an account and end all of its sessions."""
+        from models import User
+        from sessions import revocable
+        user = User.query.filter_by(username=username.lower()).first()
+        if user is None:
+            raise click.ClickException(f"No user {username!r}.")
+        user.is_active = False
+        db.session.commit()
+        if revocable(app):
+            print(f"✅  {user.username} deactivated and logged out everywhere.")
+        else:
+            print(f"⚠️  {user.username} deactivated. SESSION_BACKEND=cookie cannot end "
+                  f"sessions: browsers already logged in stay so until their session expires.")
+
+
+# ─────────────────────────────────────────────────────────────
+#  SEED DATA
+# ─────────────────────────────────────────────────────────────
+
+def seed_sample_data():
+    """Insert sample data only on first run."""
+    from models import Crop, Expense, Labour, Harvest
+
+    if Crop.query.count() > 0:
+        return
+
+    wheat = Crop(name='Wheat', variety='GW-322', field_area=2.5,
+                 seeding_date=date(2024, 11, 1),
+                 expected_harvest=date(2025, 3, 15),
+                 fertilizer_details='DAP 50kg, Urea 30kg per acre',
+                 water_schedule='Every 10 days', status='Growing',
+                 notes='Rabi season crop')
+    tomato = Crop(name='Tomato', variety='Hybrid-100', field_area=1.0,
+                  seeding_date=date(2024, 9, 10),
+                  expected_harvest=date(2024, 12, 20),
+                  fertilizer_details='NPK 19-19-19',
+                  water_schedule='Daily drip irrigation', status='Harvested',
+                  notes='Vegetable crop for local market')
+    db.session.add_all([wheat, tomato])
+    db.session.flush()
+
+    db.session.add_all([
+        Expense(crop_id=wheat.id,  date=date(2024, 11, 1),
+                seeds_cost=3500, fertilizer_cost=4200,
+                equipment_cost=1500, labour_cost=2000, other_expenses=500),
+        Expense(crop_id=tomato.id, date=date(2024, 9, 10),
+                seeds_cost=1800, fertilizer_cost=2500,
+                equipment_cost=800,  labour_cost=3000, other_expenses=300),
+    ])
+
+    db.session.add_all([
+        Labour(crop_id=wheat.id,  name='Ramesh Kumar', work_type='Sowing',
+               days_worked=3, payment_per_day=400, date=date(2024, 11, 2)),
+        Labour(crop_id=tomato.id, name='Suresh Yadav', work_type='Harvesting',
+               days_worked=5, payment_per_day=450, date=date(2024, 12, 18)),
+    ])
+
+    h = Harvest(crop_id=tomato.id, harvest_date=date(2024, 12, 20),
+                total_production=2200, unit='kg', selling_price=18,
+                notes='Good yield')
+    h.calculate_income()
+    db.session.add(h)
+    db.session.commit()
@@ -0,0 +1,310 @@
+"""
+KrishiTrack – Yield & Price Forecast
+Per-crop and per-variety models of yield per acre, price per quintal and
+cost per acre, fitted on this farm's own harvests:
+
+  • samples – every Harvested crop with a field area, live or archived:
+              yield = quintals / acres, price = income / quintals,
+              cost = investment / acres (the profit page's definitions)
+  • fit     – a weighted linear trend over the seeding date for every
+              group at once, from bincount sums (no per-crop loop). The
+              level is shrunk towards the crop-wide fit (for a variety)
+              or the crop guide's averages (for a crop), so a single
+              season moves the forecast without replacing it
+  • storage – one structured .npy file (FORECAST_MODEL_PATH) written by
+              `flask train-forecast` and memory-mapped by each worker;
+              a retrained file is picked up on its next use
+
+    flask train-forecast
+
+Scoring is a dict lookup and a little arithmetic: no query, no fitting.
+Crop-guide crops without history are in the table too, at the guide's
+averages, so a forecast never needs the database.
+"""
+
+import math
+import os
+import threading
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import func, select
+
+TARGETS = ('yield', 'price', 'cost')
+
+# Seasons of history the crop guide (or crop-wide fit) counts as.
+PRIOR_WEIGHT = 2.0
+# Ridge on the trend, in years²: a single year of spread barely tilts it.
+TREND_RIDGE  = 1.0
+# Trends are extrapolated at most this many years past the history.
+MAX_TREND_YEARS = 3.0
+
+# Model table columns. NumPy is imported on use, like every NumPy code path,
+# so create_app() only loads it when a model file exists.
+FIELDS = ([('crop', 'U64'), ('variety', 'U64'), ('name', 'U64'), ('n', 'i4')] +
+          [(f'{t}_{f}', 'f8') for t in TARGETS for f in ('t', 'level', 'slope', 'sd')] +
+          [(f'{t}_n', 'i4') for t in TARGETS])
+
+
+def key(text):
+    """Matching key for crop and variety names: spacing collapsed, case folded."""
+    return ' '.join((text or '').split()).casefold()[:64]
+
+
+def years(day):
+    return day.toordinal() / 365.25
+
+
+# ─────────────────────────────────────────────────────────────
+#  Training data
+# ─────────────────────────────────────────────────────────────
+
+def samples(s):
+    """One row per harvested crop: names, seeding time (years), acres,
+    quintals, income and investment (rupees)."""
+    import numpy as np
+    from analytics import UNIT_QUINTALS
+    from models import ArchivedCrop, Crop, Harvest
+    from money import crop_totals
+
+    crops = s.execute(select(Crop.id, Crop.name, Crop.variety, Crop.field_area, Crop.seeding_date)
+                      .where(Crop.status == 'Harvested', Crop.field_area > 0)
+                      .order_by(Crop.id)).all()
+    ids   = [c.id for c in crops]
+
+    # Quintals per crop; crops with a harvest in boxes or bags are skipped.
+    qtl, unknown = {}, set()
+    for crop_id, unit, amount in s.execute(
+            select(Harvest.crop_id, Harvest.unit, func.sum(Harvest.total_production))
+            .join(Crop, Crop.id == Harvest.crop_id)
+            .where(Crop.status == 'Harvested')
+            .group_by(Harvest.crop_id, Harvest.unit)):
+        if unit in UNIT_QUINTALS:
+            qtl[crop_id] = qtl.get(crop_id, 0.0) + (amount or 0.0) * UNIT_QUINTALS[unit]
+        else:
+            unknown.add(crop_id)
+    totals = crop_totals(s, ids) if ids else {'ids': np.zeros(0, dtype=np.int64)}
+    pos    = {cid: i for i, cid in enumerate(totals['ids'].tolist())}
+
+    rows = []
+    for c in crops:
+        if c.id in unknown or not qtl.get(c.id):
+            continue
+        i = pos[c.id]
+        rows.append((c.name, c.variety, years(c.seeding_date), c.field_area, qtl[c.id],
+                     totals['income'][i] / 100, totals['investment'][i] / 100))
+    for a in s.execute(select(ArchivedCrop.name, ArchivedCrop.variety, ArchivedCrop.seeding_date,
+                              ArchivedCrop.field_area, ArchivedCrop.production_qtl,
+                              ArchivedCrop.income, ArchivedCrop.investment)
+                       .where(ArchivedCrop.field_area > 0, ArchivedCrop.production_qtl > 0)):
+        rows.append((a.name, a.variety, years(a.seeding_date), a.field_area, a.production_qtl,
+                     a.income or 0.0, a.investment or 0.0))
+
+    cols = list(zip(*rows)) if rows else [()] * 7
+    return {'crop':   [key(n) for n in cols[0]],
+            'name':   [' '.join((n or '').split()) for n in cols[0]],
+            'variety': [key(v) for v in cols[1]],
+            't':      np.array(cols[2], dtype=float),
+            'area':   np.array(cols[3], dtype=float),
+            'qtl':    np.array(cols[4], dtype=float),
+            'income': np.array(cols[5], dtype=float),
+            'cost':   np.array(cols[6], dtype=float)}
+
+
+def priors(s):
+    """{crop key: (name, yield/acre, price/q, cost/acre)} from the crop guide."""
+    from models import CropRecommendation as R
+    return {key(name): (name, y, p, c) for name, y, p, c in s.execute(
+        select(R.crop_name, func.avg(R.avg_yield_acre), func.avg(R.avg_price_quintal),
+               func.avg(R.cost_per_acre)).group_by(R.crop_name))}
+
+
+# ─────────────────────────────────────────────────────────────
+#  Fitting
+# ─────────────────────────────────────────────────────────────
+
+def _fit(group, x, y, w, size, prior, prior_t):
+    """Weighted trend y ~ level + slope·(x − t) per group, all groups at once.
+
+    prior (NaN where none) is blended into the level with PRIOR_WEIGHT;
+    groups without samples keep it as their level at time prior_t.
+    Returns (t, level, slope, sd, n) arrays.
+    """
+    import numpy as np
+    W    = np.bincount(group, w, size)
+    n    = np.bincount(group, w > 0, size).astype(np.int32)
+    safe = np.where(W > 0, W, 1.0)
+    t    = np.bincount(group, w * x, size) / safe
+    ym   = np.bincount(group, w * y, size) / safe
+    dx, dy = x - t[group], y - ym[group]
+    slope = np.bincount(group, w * dx * dy, size) / (np.bincount(group, w * dx * dx, size)
+                                                     + TREND_RIDGE * safe)
+    sd    = np.sqrt(np.bincount(group, w * (dy - slope[group] * dx) ** 2, size) / safe)
+
+    has   = ~np.isnan(prior)
+    level = np.where(has, (n * ym + PRIOR_WEIGHT * np.nan_to_num(prior)) / (n + PRIOR_WEIGHT),
+                     np.where(n > 0, ym, np.nan))
+    t     = np.where(n > 0, t, prior_t)
+    return t, level, slope, np.where(n > 1, sd, np.nan), n
+
+
+def fit(data, guide):
+    """Structured array (FIELDS) of crop rows (variety '') then variety rows."""
+    import numpy as np
+    crops     = sorted(set(data['crop']) | set(guide))
+    crop_pos  = {c: i for i, c in enumerate(crops)}
+    varieties = sorted({(c, v) for c, v in zip(data['crop'], data['variety']) if v})
+    var_pos   = {cv: i for i, cv in enumerate(varieties)}
+
+    names = {c: guide[c][0] for c in guide}
+    for c, name in zip(data['crop'], data['name']):
+        names.setdefault(c, name)
+
+    area, qtl = data['area'], data['qtl']
+    targets = {
+        'yield': (qtl / area,                                 area),
+        'price': (data['income'] / np.where(qtl > 0, qtl, 1), np.where(data['income'] > 0, qtl, 0.0)),
+        'cost':  (data['cost'] / area,                        np.where(data['cost'] > 0, area, 0.0)),
+    }
+    cg = np.array([crop_pos[c] for c in data['crop']], dtype=np.int64)
+    vg = np.array([var_pos.get((c, v), -1) for c, v in zip(data['crop'], data['variety'])],
+                  dtype=np.int64)
+    inv = vg >= 0
+
+    out = np.zeros(len(crops) + len(varieties), dtype=np.dtype(FIELDS))
+    out['crop']    = crops + [c for c, _ in varieties]
+    out['variety'] = [''] * len(crops) + [v for _, v in varieties]
+    out['name']    = [names.get(c, c) for c in out['crop']]
+    out['n'][:len(crops)] = np.bincount(cg, minlength=len(crops))
+    out['n'][len(crops):] = np.bincount(vg[inv], minlength=len(varieties))
+
+    now = years(date.today())
+    for i, target in enumerate(TARGETS):
+        y, w  = targets[target]
+        prior = np.array([guide[c][1 + i] if c in guide and guide[c][1 + i] is not None
+                          else np.nan for c in crops])
+        ct, cl, cs, csd, cn = _fit(cg, data['t'], y, w, len(crops), prior, np.full(len(crops), now))
+
+        # Varieties lean on their crop's fit, read at the variety's own dates.
+        parent = np.array([crop_pos[c] for c, _ in varieties], dtype=np.int64)
+        W      = np.bincount(vg[inv], w[inv], len(varieties))
+        vt     = np.bincount(vg[inv], w[inv] * data['t'][inv], len(varieties)) / np.where(W > 0, W, 1)
+        vt     = np.where(W > 0, vt, ct[parent])
+        vprior = cl[parent] + cs[parent] * np.clip(vt - ct[parent], -MAX_TREND_YEARS, MAX_TREND_YEARS)
+        vt, vl, vs, vsd, vn = _fit(vg[inv], data['t'][inv], y[inv], w[inv], len(varieties),
+                                   vprior, ct[parent])
+
+        for field, crop_part, var_part in (('t', ct, vt), ('level', cl, vl), ('slope', cs, vs),
+                                           ('sd', csd, vsd), ('n', cn, vn)):
+            out[f'{target}_{field}'] = np.concatenate([crop_part, var_part])
+    return out
+
+
+def train(s, path):
+    """Fit on the current ledgers and replace the model file. Returns the table."""
+    import numpy as np
+    table = fit(samples(s), priors(s))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, table)
+    os.replace(tmp, path)                      # workers holding the old map keep reading it
+    return table
+
+
+# ─────────────────────────────────────────────────────────────
+#  Scoring
+# ─────────────────────────────────────────────────────────────
+
+class Forecast:
+    """A memory-mapped model table with a (crop, variety) -> row index."""
+
+    def __init__(self, path):
+        import numpy as np
+        self.table = np.load(path, mmap_mode='r')
+        self.mtime = os.stat(path).st_mtime_ns
+        self.rows  = {(c, v): i for i, (c, v) in
+                      enumerate(zip(self.table['crop'].tolist(), self.table['variety'].tolist()))}
+
+    def crops(self):
+        """Display names of every crop with history or guide values."""
+        return sorted(str(r['name']) for r in self.table if not r['variety'])
+
+    def predict_many(self, items, when=None):
+        """items: [(crop, variety, acres)] -> [dict or None], vectorised."""
+        import numpy as np
+        idx, var = [], []
+        for crop, variety, _ in items:
+            k, v = key(crop), key(variety)
+            i    = self.rows.get((k, v)) if v else None
+            var.append(i is not None)
+            idx.append(i if i is not None else self.rows.get((k, ''), -1))
+        idx  = np.array(idx, dtype=np.int64)
+        hit  = idx >= 0
+        rows = self.table[idx[hit]]
+        area = np.array([a for (_, _, a), h in zip(items, hit) if h], dtype=float)
+        when = years(when or date.today())
+
+        est = {}
+        for target in TARGETS:
+            ahead = np.clip(when - rows[f'{target}_t'], -MAX_TREND_YEARS, MAX_TREND_YEARS)
+            est[target] = np.maximum(rows[f'{target}_level'] + rows[f'{target}_slope'] * ahead, 0)
+        yield_q = est['yield'] * area
+        income  = yield_q * est['price']
+        cost    = est['cost'] * area
+
+        out, j = [], 0
+        for h, v in zip(hit, var):
+            if not h:
+                out.append(None)
+                continue
+            r = rows[j]
+            out.append({
+                'crop':       str(r['name']),
+                'variety':    str(r['variety']) if v else '',
+                'samples':    int(r['yield_n']),
+                'yield_acre': _num(est['yield'][j]),
+                'yield_q':    _num(yield_q[j]),
+                'yield_sd':   _num(r['yield_sd'] * area[j]),
+                'price_q':    _num(est['price'][j]),
+                'income':     _num(income[j]),
+                'cost':       _num(cost[j]),
+                'profit':     _num(income[j] - cost[j]),
+                'roi':        _num((income[j] - cost[j]) / cost[j] * 100) if cost[j] > 0 else None,
+            })
+            j += 1
+        return out
+
+    def predict(self, crop, variety='', acres=1.0, when=None):
+        return self.predict_many([(crop, variety, acres)], when)[0]
+
+
+def _num(x):
+    x = float(x)
+    return None if math.isnan(x) else x
+
+
+_lock = threading.Lock()
+
+
+def current():
+    """This worker's model, reloaded when the file is retrained; None if untrained."""
+    path = current_app.config['FORECAST_MODEL_PATH']
+    held = current_app.extensions.get('forecast')
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if held is None or held.mtime != mtime:
+        with _lock:
+            held = current_app.extensions.get('forecast')
+            if held is None or held.mtime != mtime:
+                held = current_app.extensions['forecast'] = Forecast(path)
+    return held
+
+
+def init_forecast(app):
+    """Map the model at start-up (before a preloading server forks)."""
+    app.extensions['forecast'] = None
+    if os.path.exists(app.config['FORECAST_MODEL_PATH']):
+        app.extensions['forecast'] = Forecast(app.config['FORECAST_MODEL_PATH'])
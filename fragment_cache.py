@@ -0,0 +1,180 @@
+"""
+KrishiTrack – Template Fragment Cache
+
+    {% cache 'dashboard-stats', data_version('crops', 'expenses'), today %}
+      … expensive markup …
+    {% endcache %}
+
+The rendered fragment is stored under the key parts, JSON-encoded. Keys that
+include data_version(...) change whenever those tables change, so stale
+fragments are never served; they just age out of the LRU. With the
+shared cache on (shared_cache.py) a miss here is looked up host-wide
+before rendering, so each fragment is rendered by one worker.
+
+Views pair this with deferred(): heavy queries wrapped in deferred() run
+only if a template actually touches them, i.e. only on a cache miss.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from changes import version_stamp
+from extensions import db
+
+
+class FragmentCache:
+    """In-process LRU bounded by entry count and total size in bytes."""
+
+    def __init__(self, max_entries=512, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.entries     = OrderedDict()
+        self.size        = 0
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+        self.lock        = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        cost = len(value)
+        if cost > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = value
+            self.size += cost
+            while self.entries and (len(self.entries) > self.max_entries
+                                    or self.size > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def metric_lines(self):
+        return [
+            '# TYPE krishitrack_fragment_cache_hits_total counter',
+            f'krishitrack_fragment_cache_hits_total {self.hits}',
+            '# TYPE krishitrack_fragment_cache_misses_total counter',
+            f'krishitrack_fragment_cache_misses_total {self.misses}',
+            '# TYPE krishitrack_fragment_cache_evictions_total counter',
+            f'krishitrack_fragment_cache_evictions_total {self.evictions}',
+            '# TYPE krishitrack_fragment_cache_entries gauge',
+            f'krishitrack_fragment_cache_entries {len(self.entries)}',
+            '# TYPE krishitrack_fragment_cache_bytes gauge',
+            f'krishitrack_fragment_cache_bytes {self.size}',
+        ]
+
+
+class FragmentCacheExtension(Extension):
+    """Adds the {% cache key, ... %}…{% endcache %} tag."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts  = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, parts, caller):
+        cache = current_app.extensions.get('fragment_cache')
+        if cache is None:
+            return caller()
+        # JSON quotes and escapes each part, so a '|' or quote typed into a
+        # search box cannot make two different part lists share a key.
+        key   = json.dumps(parts, default=str, ensure_ascii=False)
+        value = cache.get(key)
+        if value is None:
+            shared = current_app.extensions.get('shared_cache')
+            if shared is None:
+                value = caller()
+            else:
+                value = Markup(shared.get_or_compute('fragment:' + key,
+                                                     lambda: caller().encode()).decode())
+            cache.set(key, value)
+        return value
+
+
+# ─────────────────────────────────────────────────────────────
+#  Data version stamps
+# ─────────────────────────────────────────────────────────────
+
+def data_version(*tables, crop_id=None):
+    """A stamp that changes whenever any of the given tables change (only
+    that crop's rows in them, with crop_id) – read from the change feed
+    (changes.py). Memoised for the rest of the request."""
+    key  = (tuple(sorted(set(tables))), crop_id)
+    memo = g.setdefault('data_versions', {})
+    if key not in memo:
+        memo[key] = version_stamp(db.session, key[0], crop_id)
+    return memo[key]
+
+
+class deferred:
+    """Lazy stand-in for a view value: fn() runs on first use, once.
+
+    Supports attribute/item access, iteration, len() and truthiness,
+    which covers lists of rows and dicts of figures in templates.
+    """
+
+    def __init__(self, fn):
+        self._fn    = fn
+        self._value = None
+        self._done  = False
+
+    def _get(self):
+        if not self._done:
+            self._value = self._fn()
+            self._done  = True
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __bool__(self):
+        return bool(self._get())
+
+
+def init_fragment_cache(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.globals['data_version'] = data_version
+    if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        cache = FragmentCache(app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 512),
+                              app.config.get('FRAGMENT_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+        app.extensions['fragment_cache'] = cache
+        from metrics import registry
+        registry.collectors['fragment_cache'] = cache.metric_lines
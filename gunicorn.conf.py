@@ -0,0 +1,79 @@
+"""
+KrishiTrack – Gunicorn Settings
+Read automatically when gunicorn starts in this directory:
+
+    gunicorn "app:create_app()"
+
+Sizing (each can be pinned from the environment):
+
+  • threads  – GUNICORN_THREADS, default 4 but never more than one
+               worker's pool (DB_POOL_SIZE + DB_MAX_OVERFLOW), so a
+               thread never waits for a connection
+  • workers  – WEB_CONCURRENCY, default 2 × CPUs + 1, capped so every
+               worker's full pool fits in DB_MAX_CONNECTIONS (not for
+               SQLite, which has no server limit)
+
+The app is created once in the master (preload) and forked, so workers
+share its imported code, view blueprints included (LAZY_BLUEPRINTS
+defaults to off here), and the mapped forecast model; post_fork gives
+each worker its own database connections (app.after_fork).
+
+Workers are gthread: the worker's main loop keeps answering the master's
+heartbeat while a thread builds a slow CSV export, so GUNICORN_TIMEOUT
+only catches a stuck worker. Exports of a large farm take seconds, not
+minutes; the default leaves room for them on a slow database.
+
+Worker stats: /metrics on each worker (pid-labelled gauges, see
+metrics.py), plus gunicorn's own statsd metrics when STATSD_HOST is set.
+"""
+
+import os
+
+os.environ.setdefault('LAZY_BLUEPRINTS', '0')       # before config reads it
+
+from sqlalchemy.engine import make_url
+
+from config import settings
+
+_cfg  = settings()
+_cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+_pool = _cfg.DB_POOL_SIZE + _cfg.DB_MAX_OVERFLOW
+
+
+def _workers():
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    workers = 2 * _cpus + 1
+    if make_url(_cfg.SQLALCHEMY_DATABASE_URI).get_backend_name() != 'sqlite':
+        workers = min(workers, _cfg.DB_MAX_CONNECTIONS // _pool)
+    return max(workers, 1)
+
+
+bind         = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+worker_class = 'gthread'
+threads      = int(os.environ.get('GUNICORN_THREADS', min(4, _pool)))
+workers      = _workers()
+preload_app  = True
+
+timeout          = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive        = 5
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter
+# keeps them from all restarting at once.
+max_requests        = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog     = os.environ.get('GUNICORN_ACCESS_LOG') or None      # '-' for stdout
+statsd_host   = os.environ.get('STATSD_HOST') or None
+statsd_prefix = 'krishitrack'
+
+
+def post_fork(server, worker):
+    from app import after_fork
+    after_fork(server.app.wsgi())
+
+
+def when_ready(server):
+    server.log.info('KrishiTrack: %s profile, %d workers × %d threads, timeout %ds',
+                    _cfg.PROFILE, workers, threads, timeout)
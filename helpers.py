@@ -0,0 +1,44 @@
+"""
+KrishiTrack – View Helpers
+Small utilities shared by the view blueprints.
+"""
+
+from functools import wraps
+
+from flask import current_app, flash, redirect, request, session, url_for
+
+
+def allowed_file(filename):
+    return ('.' in filename and
+            filename.rsplit('.', 1)[1].lower()
+            in current_app.config['ALLOWED_EXTENSIONS'])
+
+
+def page_args(total, per_page):
+    """(page, pages) from ?page=, clamped to the available pages."""
+    pages = max(1, -(-total // per_page))
+    page  = min(max(1, request.args.get('page', 1, type=int)), pages)
+    return page, pages
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not session.get('logged_in'):
+            flash('Please log in to continue.', 'warning')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not session.get('logged_in'):
+            flash('Please log in to continue.', 'warning')
+            return redirect(url_for('auth.login'))
+        if session.get('user_role') != 'admin':
+            flash('Only admins can do that.', 'danger')
+            return redirect(url_for('reports.dashboard'))
+        return f(*args, **kwargs)
+    return decorated
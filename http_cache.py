@@ -0,0 +1,136 @@
+"""
+KrishiTrack – Response Compression and Conditional GET
+
+  • compression – HTML, JSON, CSS, JS and text responses of at least
+                  COMPRESS_MIN_BYTES go out brotli-encoded (when the
+                  brotli package is installed and the client accepts it)
+                  or gzipped. Files sent with send_file and responses that
+                  already carry a Content-Encoding are left alone.
+  • @not_modified('crops', 'expenses') – a weak ETag from the tables'
+                  data_version() stamp, the URL, the user, the day and the
+                  release (templates and assets). A matching If-None-Match
+                  gets 304 before the view runs, so an unchanged list page
+                  costs one lookup in data_versions. Pages with pending flash
+                  messages always render. per_crop=('expenses',) stamps
+                  those tables for the crop_id in the URL only, so a page
+                  about one crop survives writes to the others.
+"""
+
+import gzip
+import hashlib
+import os
+from datetime import date
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+from fragment_cache import data_version
+from metrics import registry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript',
+                'application/javascript', 'application/json', 'image/svg+xml'}
+
+
+# ─────────────────────────────────────────────────────────────
+#  Compression
+# ─────────────────────────────────────────────────────────────
+
+def _encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    config = current_app.config
+    if (not config.get('COMPRESS_ENABLED', True)
+            or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _encoding()
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < config.get('COMPRESS_MIN_BYTES', 1024):
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(body, quality=config.get('COMPRESS_BROTLI_QUALITY', 4))
+    else:
+        data = gzip.compress(body, compresslevel=config.get('COMPRESS_GZIP_LEVEL', 6))
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    # The encoded bytes differ from the identity ones: a strong validator
+    # may only stand for one of them.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+# ─────────────────────────────────────────────────────────────
+#  Conditional GET
+# ─────────────────────────────────────────────────────────────
+
+def release_stamp(app):
+    """Changes when a template or static asset is deployed."""
+    newest = 0
+    for folder in (app.template_folder, app.static_folder):
+        if not folder:
+            continue
+        for root, _, files in os.walk(os.path.join(app.root_path, folder)):
+            for name in files:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return str(newest)
+
+
+def page_etag(tables, per_crop=()):
+    crop_id = (request.view_args or {}).get('crop_id') or request.args.get('crop_id', type=int)
+    if crop_id and per_crop:
+        stamps = [data_version(*(set(tables) - set(per_crop))),
+                  data_version(*per_crop, crop_id=crop_id)]
+    else:
+        stamps = [data_version(*tables, *per_crop)]
+    parts = [current_app.extensions['release'], request.full_path,
+             str(session.get('user_id')), str(session.get('user_role')),
+             date.today().isoformat(), *stamps]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def not_modified(*tables, per_crop=()):
+    """Answer GETs with 304 while `tables` and the rest of the ETag are
+    unchanged. Tables in per_crop count only the URL's crop_id, if any."""
+    def decorator(view):
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            if request.method != 'GET' or session.get('_flashes'):
+                return view(*args, **kwargs)
+            etag = page_etag(tables, per_crop)
+            if request.if_none_match.contains_weak(etag):
+                registry.incr('http_not_modified_total')
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated
+    return decorator
+
+
+def init_http_cache(app):
+    app.extensions['release'] = release_stamp(app)
+    app.after_request(compress_response)
@@ -0,0 +1,250 @@
+"""
+KrishiTrack – Perceptual Image Hashes
+A 64-bit difference hash (dHash) per uploaded image, so the same field
+shot sent twice – resized or re-compressed by WhatsApp on the way –
+is recognised as a near-duplicate.
+
+  • new growth photos are hashed on upload and checked at once
+  • older files are hashed in batches: `flask hash-images`
+  • lookups compare against every stored hash in one vectorised pass:
+    the hashes live in a uint64 NumPy array (per process, reloaded when
+    image_hashes changes); XOR + byte popcount gives all Hamming
+    distances
+  • reclaim() keeps the best file of each duplicate group, points the
+    other rows at it and deletes the rest from disk
+
+Kinds: 'photo' (CropPhoto.photo_path, uploads/crop_photos/) and 'crop'
+(Crop.image_path, uploads/). Duplicates are only merged within a kind,
+since the two are served from different folders.
+"""
+
+import os
+import threading
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+
+KINDS = ('photo', 'crop')
+
+# Set bits in every byte value; indexes a uint8 view of XORed hashes.
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Distance-matrix cells computed at once in duplicate_groups() (8 bytes each).
+PAIR_BLOCK_CELLS = 4 * 1024 * 1024
+
+
+def kind_folder(kind):
+    root = current_app.config['UPLOAD_FOLDER']
+    return os.path.join(root, 'crop_photos') if kind == 'photo' else root
+
+
+# ─────────────────────────────────────────────────────────────
+#  Hashing
+# ─────────────────────────────────────────────────────────────
+
+def dhash(path):
+    """64-bit dHash of an image file, as a signed int (fits BIGINT)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as img:
+        img.draft('L', (64, 64))                   # JPEG: decode at 1/8 scale
+        img = ImageOps.exif_transpose(img).convert('L').resize((9, 8), Image.LANCZOS)
+        px  = np.asarray(img, dtype=np.int16)
+    bits = (px[:, 1:] > px[:, :-1]).ravel()
+    return int(np.packbits(bits).view('>i8')[0])
+
+
+def hash_file(kind, path):
+    """Row values for image_hashes; phash None if the file is missing or unreadable."""
+    full = os.path.join(kind_folder(kind), path)
+    try:
+        return {'kind': kind, 'path': path, 'phash': dhash(full),
+                'size_bytes': os.path.getsize(full)}
+    except (OSError, ValueError):
+        return {'kind': kind, 'path': path, 'phash': None, 'size_bytes': 0}
+
+
+def _referenced(kind):
+    from models import Crop, CropPhoto
+    return CropPhoto.photo_path if kind == 'photo' else Crop.image_path
+
+
+def hash_pending(s, batch=200):
+    """Hash up to `batch` referenced files that have no row yet. Returns rows added."""
+    from models import ImageHash
+
+    rows = []
+    for kind in KINDS:
+        column = _referenced(kind)
+        known  = select(ImageHash.id).where(ImageHash.kind == kind, ImageHash.path == column)
+        paths  = s.scalars(select(column).distinct()
+                           .where(column.is_not(None), column != '', ~known.exists())
+                           .limit(batch - len(rows))).all()
+        rows  += [hash_file(kind, p) for p in paths]
+        if len(rows) >= batch:
+            break
+    if rows:
+        s.execute(insert(ImageHash), rows)
+        s.commit()
+    return len(rows)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Lookup
+# ─────────────────────────────────────────────────────────────
+
+def distances(hashes, h):
+    """Hamming distance from h to every hash in a uint64 array."""
+    x = np.bitwise_xor(hashes, np.uint64(h & 0xFFFFFFFFFFFFFFFF))
+    return POPCOUNT[x.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+_index      = {}
+_index_lock = threading.Lock()
+
+
+def load_index(s):
+    """(ids, kinds, paths, sizes, hashes) of all readable files, cached per process."""
+    from models import ImageHash
+
+    stamp = s.execute(select(func.count(ImageHash.id), func.max(ImageHash.id))).one()
+    with _index_lock:
+        cached = _index.get('hashes')
+        if cached is not None and cached[0] == tuple(stamp):
+            return cached[1]
+    rows = s.execute(select(ImageHash.id, ImageHash.kind, ImageHash.path,
+                            ImageHash.size_bytes, ImageHash.phash)
+                     .where(ImageHash.phash.is_not(None))
+                     .order_by(ImageHash.id)).all()
+    index = (np.array([r[0] for r in rows], dtype=np.int64),
+             np.array([r[1] for r in rows], dtype=object),
+             [r[2] for r in rows],
+             np.array([r[3] or 0 for r in rows], dtype=np.int64),
+             np.array([r[4] for r in rows], dtype=np.int64).view(np.uint64))
+    with _index_lock:
+        _index['hashes'] = (tuple(stamp), index)
+    return index
+
+
+def near(s, h, kind=None, max_distance=None, exclude=None):
+    """[(distance, kind, path)] of stored images within max_distance of h, nearest first."""
+    if max_distance is None:
+        max_distance = current_app.config['PHASH_MAX_DISTANCE']
+    ids, kinds, paths, sizes, hashes = load_index(s)
+    if not len(ids):
+        return []
+    d    = distances(hashes, h)
+    hits = np.flatnonzero(d <= max_distance)
+    out  = [(int(d[i]), kinds[i], paths[i]) for i in hits
+            if (kind is None or kinds[i] == kind) and (kinds[i], paths[i]) != exclude]
+    return sorted(out)
+
+
+def record_upload(s, path):
+    """Hash a newly saved growth photo. Returns its near-duplicates (see near())."""
+    from models import ImageHash
+
+    row = hash_file('photo', path)
+    s.execute(delete(ImageHash).where(ImageHash.kind == 'photo', ImageHash.path == path))
+    s.execute(insert(ImageHash), [row])
+    s.commit()
+    if row['phash'] is None:
+        return []
+    return near(s, row['phash'], exclude=('photo', path))
+
+
+# ─────────────────────────────────────────────────────────────
+#  Duplicate groups and reclaiming storage
+# ─────────────────────────────────────────────────────────────
+
+def duplicate_groups(s, max_distance=None):
+    """Near-duplicate groups within each kind.
+
+    Returns [{'kind', 'keep', 'drop', 'bytes'}] where keep/drop are
+    image_hashes ids: keep is the largest file (least re-compressed),
+    bytes what deleting the others frees.
+    """
+    if max_distance is None:
+        max_distance = current_app.config['PHASH_MAX_DISTANCE']
+    ids, kinds, paths, sizes, hashes = load_index(s)
+    n      = len(ids)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Upper triangle of the all-pairs distance matrix, a block of rows at a time.
+    block = max(1, PAIR_BLOCK_CELLS // max(n, 1))
+    for start in range(0, n, block):
+        x = np.bitwise_xor(hashes[start:start + block, None], hashes[None, :])
+        d = POPCOUNT[x.view(np.uint8)].reshape(x.shape[0], n, 8).sum(axis=2)
+        rows, cols = np.nonzero(d <= max_distance)
+        rows += start
+        upper = cols > rows
+        for i, j in zip(rows[upper], cols[upper]):
+            if kinds[i] == kinds[j]:
+                a, b = find(i), find(j)
+                if a != b:
+                    parent[b] = a
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    out = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda i: (-sizes[i], ids[i]))
+        out.append({
+            'kind':  kinds[members[0]],
+            'keep':  int(ids[members[0]]),
+            'drop':  [int(ids[i]) for i in members[1:]],
+            'bytes': int(sum(sizes[i] for i in members[1:])),
+        })
+    out.sort(key=lambda g: -g['bytes'])
+    return out
+
+
+def reclaim(s, keep_id, drop_ids, max_distance=None):
+    """Point rows using the dropped files at the kept one and delete those files.
+
+    Files that are not near-duplicates of keep_id (anymore) are left
+    alone. Returns bytes freed.
+    """
+    from models import Crop, CropPhoto, ImageHash
+
+    if max_distance is None:
+        max_distance = current_app.config['PHASH_MAX_DISTANCE']
+    keep = s.get(ImageHash, keep_id)
+    if keep is None or keep.phash is None:
+        return 0
+    drops = s.scalars(select(ImageHash).where(ImageHash.id.in_(drop_ids),
+                                              ImageHash.kind == keep.kind,
+                                              ImageHash.id != keep.id,
+                                              ImageHash.phash.is_not(None))).all()
+    drops = [h for h in drops
+             if distances(np.array([h.phash], dtype=np.int64).view(np.uint64),
+                          keep.phash)[0] <= max_distance]
+    if not drops:
+        return 0
+
+    model, column = ((CropPhoto, CropPhoto.photo_path) if keep.kind == 'photo'
+                     else (Crop, Crop.image_path))
+    paths = [h.path for h in drops]
+    s.execute(update(model).where(column.in_(paths)).values({column: keep.path}),
+              execution_options={'synchronize_session': False})
+    s.execute(delete(ImageHash).where(ImageHash.id.in_([h.id for h in drops])))
+    s.commit()
+
+    freed, folder = 0, kind_folder(keep.kind)
+    for h in drops:
+        try:
+            os.remove(os.path.join(folder, h.path))
+            freed += h.size_bytes or 0
+        except FileNotFoundError:
+            pass
+    return freed
@@ -0,0 +1,101 @@
+"""
+KrishiTrack – Login Guard
+Keeps password hashing from eating the workers during credential-stuffing
+bursts:
+
+  • token buckets per client IP and per username, checked before any
+    hash is computed (in-memory, per process)
+  • a cap on concurrent hash computations per process; a request that
+    cannot get a slot within PASSWORD_HASH_WAIT seconds gets a 503
+    instead of queueing behind the attackers
+
+    guard = current_app.extensions['login_guard']
+    wait  = guard.blocked(ip=request.remote_addr, username=username)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import registry
+
+
+class TokenBuckets:
+    """One token bucket per key: `burst` tokens, refilled at `per_minute`.
+
+    Keys are kept in LRU order and the least recently seen are dropped
+    past max_keys, so a flood of random usernames cannot grow memory.
+    """
+
+    def __init__(self, burst, per_minute, max_keys=10000):
+        self.burst    = float(burst)
+        self.rate     = per_minute / 60.0
+        self.max_keys = max_keys
+        self.buckets  = OrderedDict()          # key -> (tokens, last refill)
+        self.lock     = threading.Lock()
+
+    def _tokens(self, key, now):
+        tokens, last = self.buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - last) * self.rate)
+
+    def retry_after(self, key):
+        """Seconds until one token is available (0 if one is now)."""
+        with self.lock:
+            tokens = self._tokens(key, time.monotonic())
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def hit(self, key):
+        """Take a token. Returns False (and takes nothing) when empty."""
+        now = time.monotonic()
+        with self.lock:
+            tokens = self._tokens(key, now)
+            ok     = tokens >= 1
+            self.buckets[key] = (tokens - 1 if ok else tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return ok
+
+
+class LoginGuard:
+    def __init__(self, config):
+        self.by_ip   = TokenBuckets(config['LOGIN_BURST_PER_IP'],
+                                    config['LOGIN_RATE_PER_IP'])
+        self.by_user = TokenBuckets(config['LOGIN_BURST_PER_USER'],
+                                    config['LOGIN_RATE_PER_USER'])
+        self.slots   = threading.BoundedSemaphore(config['PASSWORD_HASH_CONCURRENCY'])
+        self.wait    = config['PASSWORD_HASH_WAIT']
+
+    def blocked(self, ip, username=None):
+        """Spend one IP token; return seconds to wait, or 0 if allowed.
+
+        Username buckets are only spent by failed attempts (see failed()),
+        so the real owner is not locked out by their own good logins.
+        """
+        wait = self.by_user.retry_after(username) if username else 0
+        if not wait and not self.by_ip.hit(ip):
+            wait = self.by_ip.retry_after(ip)
+        if wait:
+            registry.incr('login_rate_limited_total')
+        return wait
+
+    def failed(self, username):
+        if username:
+            self.by_user.hit(username)
+
+    @contextmanager
+    def hashing(self):
+        """Hold one of the hash slots; yields False if none freed up in time."""
+        got = self.slots.acquire(timeout=self.wait)
+        if not got:
+            registry.incr('password_hash_busy_total')
+        try:
+            yield got
+        finally:
+            if got:
+                self.slots.release()
+
+
+def init_login_guard(app):
+    app.extensions['login_guard'] = LoginGuard(app.config)
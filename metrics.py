@@ -0,0 +1,295 @@
+"""
+KrishiTrack – Request Metrics & Profiling
+
+Per endpoint it records:
+  • request latency histogram
+  • SQL query count and total SQL time per request
+  • Jinja template render time
+  • slow queries (over SLOW_QUERY_SECONDS) in a small ring buffer
+
+GET /metrics serves everything in Prometheus text format (admin session,
+or "Authorization: Bearer <METRICS_TOKEN>" when that is configured).
+
+An admin can profile one request by sending the header
+"X-Profile: 1" (cProfile, text) or "X-Profile: pyinstrument" (HTML,
+when pyinstrument is installed). The profile replaces the response body.
+Numbers are per process; each gunicorn worker keeps its own and labels
+its worker gauges (uptime, requests in flight, memory, DB pool) with its
+pid, so a scrape says which worker answered.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from flask import (Response, before_render_template, current_app, g,
+                   has_request_context, request, session, template_rendered)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger('krishitrack.sql')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS   = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts  = [0] * len(buckets)
+        self.total   = 0.0
+        self.count   = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        out, running = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f'{name}_sum{{{labels}}} {self.total:.6f}')
+        out.append(f'{name}_count{{{labels}}} {self.count}')
+        return out
+
+
+class Registry:
+    """All metrics for this process, guarded by one lock."""
+
+    HISTOGRAMS = {
+        'request_duration_seconds':  ('Request latency by endpoint.',           LATENCY_BUCKETS),
+        'request_queries':           ('SQL queries per request by endpoint.',   QUERY_BUCKETS),
+        'request_sql_seconds':       ('Total SQL time per request by endpoint.', LATENCY_BUCKETS),
+        'template_render_seconds':   ('Jinja render time by endpoint.',          LATENCY_BUCKETS),
+    }
+
+    def __init__(self):
+        self.lock         = threading.Lock()
+        self.histograms   = {name: {} for name in self.HISTOGRAMS}
+        self.requests     = {}            # (endpoint, method, status) -> count
+        self.counters     = {}            # name -> value, for other modules
+        self.collectors   = {}            # name -> callable returning extra exposition lines
+        self.slow_queries = deque(maxlen=50)
+        self.started      = time.time()
+        self.in_flight    = 0
+
+    def reopen(self):
+        """Start a forked worker's numbers from zero; collectors stay."""
+        collectors = self.collectors
+        self.__init__()
+        self.collectors = collectors
+
+    def observe(self, name, endpoint, value):
+        with self.lock:
+            hist = self.histograms[name].get(endpoint)
+            if hist is None:
+                hist = self.histograms[name][endpoint] = Histogram(self.HISTOGRAMS[name][1])
+            hist.observe(value)
+
+    def count_request(self, endpoint, method, status):
+        key = (endpoint, method, status)
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def enter(self, amount=1):
+        with self.lock:
+            self.in_flight += amount
+
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                full = f'krishitrack_{name}'
+                lines += [f'# HELP {full} {help_text}', f'# TYPE {full} histogram']
+                for endpoint, hist in sorted(self.histograms[name].items()):
+                    lines += hist.lines(full, f'endpoint="{endpoint}"')
+            lines += ['# HELP krishitrack_requests_total Requests by endpoint, method and status.',
+                      '# TYPE krishitrack_requests_total counter']
+            for (endpoint, method, status), n in sorted(self.requests.items()):
+                lines.append(f'krishitrack_requests_total{{endpoint="{endpoint}",'
+                             f'method="{method}",status="{status}"}} {n}')
+            for name, value in sorted(self.counters.items()):
+                lines += [f'# TYPE krishitrack_{name} counter', f'krishitrack_{name} {value}']
+        for collect in self.collectors.values():
+            lines += collect()
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def worker_lines():
+    """Gauges for this worker process and its database pool."""
+    from sqlalchemy.pool import QueuePool
+    from extensions import db
+
+    label = f'pid="{os.getpid()}"'
+    gauges = [('worker_uptime_seconds', 'Seconds since this worker started.',
+               round(time.time() - registry.started)),
+              ('worker_requests_in_flight', 'Requests this worker is handling now.',
+               registry.in_flight)]
+    try:
+        import resource
+        scale = 1 if os.uname().sysname == 'Darwin' else 1024      # bytes vs KiB
+        gauges.append(('worker_max_rss_bytes', 'Peak resident memory of this worker.',
+                       resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale))
+    except ImportError:
+        pass
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool):
+        gauges += [('db_pool_size', 'Connections the pool keeps open.', pool.size()),
+                   ('db_pool_checked_out', 'Connections in use by requests.', pool.checkedout()),
+                   ('db_pool_overflow', 'Connections opened past the pool size.',
+                    max(pool.overflow(), 0))]
+    lines = []
+    for name, help_text, value in gauges:
+        lines += [f'# HELP krishitrack_{name} {help_text}', f'# TYPE krishitrack_{name} gauge',
+                  f'krishitrack_{name}{{{label}}} {value}']
+    return lines
+
+
+# ─────────────────────────────────────────────────────────────
+#  SQLAlchemy listeners – all engines, attributed to the request
+# ─────────────────────────────────────────────────────────────
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_queries += 1
+        g.metrics_sql     += elapsed
+        threshold = current_app.config.get('SLOW_QUERY_SECONDS', 0.25)
+        if elapsed >= threshold:
+            entry = {'endpoint': request.endpoint, 'seconds': round(elapsed, 4),
+                     'statement': ' '.join(statement.split())[:500]}
+            registry.slow_queries.append(entry)
+            log.warning('slow query %.3fs on %s: %s',
+                        elapsed, entry['endpoint'], entry['statement'])
+
+
+# ─────────────────────────────────────────────────────────────
+#  Request hooks
+# ─────────────────────────────────────────────────────────────
+
+def _is_admin():
+    return session.get('logged_in') and session.get('user_role') == 'admin'
+
+
+def init_metrics(app):
+    """Install request hooks, template signals and the /metrics route."""
+    registry.collectors['worker'] = worker_lines
+
+    @app.before_request
+    def metrics_start():
+        g.metrics_start    = time.perf_counter()
+        g.metrics_queries  = 0
+        g.metrics_sql      = 0.0
+        g.metrics_template = 0.0
+        registry.enter()
+
+        mode = request.headers.get('X-Profile', '').lower()
+        if mode and _is_admin():
+            if mode == 'pyinstrument':
+                try:
+                    from pyinstrument import Profiler
+                except ImportError:
+                    Profiler = None
+                if Profiler is not None:
+                    g.profiler = ('pyinstrument', Profiler())
+                    g.profiler[1].start()
+                    return
+            import cProfile
+            g.profiler = ('cprofile', cProfile.Profile())
+            g.profiler[1].enable()
+
+    @app.after_request
+    def metrics_finish(response):
+        if 'metrics_start' not in g:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        elapsed  = time.perf_counter() - g.metrics_start
+        registry.observe('request_duration_seconds', endpoint, elapsed)
+        registry.observe('request_queries',          endpoint, g.metrics_queries)
+        registry.observe('request_sql_seconds',      endpoint, g.metrics_sql)
+        if g.metrics_template:
+            registry.observe('template_render_seconds', endpoint, g.metrics_template)
+        registry.count_request(endpoint, request.method, response.status_code)
+
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'sql;dur={g.metrics_sql * 1000:.1f};desc="{g.metrics_queries} queries", '
+            f'tpl;dur={g.metrics_template * 1000:.1f}')
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            response = _profile_response(profiler, response)
+        return response
+
+    @app.teardown_request
+    def metrics_leave(exc):
+        if 'metrics_start' in g:
+            registry.enter(-1)
+
+    def on_before_render(sender, template, context, **extra):
+        if 'metrics_start' in g:
+            g.metrics_template_start = time.perf_counter()
+
+    def on_rendered(sender, template, context, **extra):
+        start = g.pop('metrics_template_start', None)
+        if start is not None:
+            g.metrics_template += time.perf_counter() - start
+
+    before_render_template.connect(on_before_render, app, weak=False)
+    template_rendered.connect(on_rendered, app, weak=False)
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        auth  = request.headers.get('Authorization', '')
+        if not ((token and auth == f'Bearer {token}') or _is_admin()):
+            return Response('Forbidden\n', status=403, mimetype='text/plain')
+        body = registry.render()
+        body += '# Slow queries (most recent last)\n'
+        for q in registry.slow_queries:
+            body += f"# {q['seconds']}s {q['endpoint']}: {q['statement']}\n"
+        return Response(body, mimetype='text/plain; version=0.0.4')
+
+
+def _profile_response(profiler, response):
+    kind, prof = profiler
+    status = str(response.status_code)
+    if kind == 'pyinstrument':
+        prof.stop()
+        resp = Response(prof.output_html(), mimetype='text/html')
+    else:
+        import io
+        import pstats
+        prof.disable()
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats('cumulative').print_stats(40)
+        resp = Response(out.getvalue(), mimetype='text/plain')
+    resp.headers['X-Profile-Original-Status'] = status
+    resp.headers['Server-Timing'] = response.headers.get('Server-Timing', '')
+    return resp
@@ -0,0 +1,256 @@
+"""
+KrishiTrack – Schema Migrations
+db.create_all() only creates missing tables. The steps below patch
+tables that already exist (new columns, indexes, data fixes). Each step
+runs once and is recorded in the schema_migrations table.
+
+    flask upgrade-db
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Integer, inspect, text
+
+from extensions import db
+
+MIGRATIONS = []
+
+
+def migration(name):
+    """Register an upgrade step. Steps run in definition order."""
+    def register(fn):
+        MIGRATIONS.append((name, fn))
+        return fn
+    return register
+
+
+# ─────────────────────────────────────────────────────────────
+#  DDL helpers – safe to re-run on fresh databases
+# ─────────────────────────────────────────────────────────────
+
+def has_column(conn, table, column):
+    return column in {c['name'] for c in inspect(conn).get_columns(table)}
+
+
+def has_index(conn, table, index):
+    return index in {i['name'] for i in inspect(conn).get_indexes(table)}
+
+
+def add_column(conn, table, column, ddl):
+    if not has_column(conn, table, column):
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def create_index(conn, table, index, columns, unique=False, where=None):
+    """where makes a partial index on SQLite / PostgreSQL; MySQL indexes every row."""
+    if not has_index(conn, table, index):
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        cond = f' WHERE {where}' if where and conn.dialect.name in ('sqlite', 'postgresql') else ''
+        conn.execute(text(f'CREATE {kind} {index} ON {table} ({columns}){cond}'))
+
+
+def to_paise(conn, table, column):
+    """Float rupees -> integer paise, in place. Skips columns that are
+    already integer (tables created after the Money type)."""
+    col = {c['name']: c for c in inspect(conn).get_columns(table)}.get(column)
+    if col is None or isinstance(col['type'], Integer):
+        return
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text(f'ALTER TABLE {table} ALTER COLUMN {column} '
+                          f'TYPE BIGINT USING ROUND({column} * 100)'))
+        return
+    if conn.dialect.name == 'mysql':
+        # FLOAT holds 24 bits: widen to exact DECIMAL before scaling, or
+        # amounts over ~₹1.67 lakh would be rounded by the UPDATE.
+        conn.execute(text(f'ALTER TABLE {table} MODIFY COLUMN {column} DECIMAL(20, 2) NULL'))
+    conn.execute(text(f'UPDATE {table} SET {column} = ROUND({column} * 100)'))
+    if conn.dialect.name == 'mysql':
+        conn.execute(text(f'ALTER TABLE {table} MODIFY COLUMN {column} BIGINT NULL'))
+    # SQLite keeps the declared type; the whole numbers stored are exact.
+
+
+def has_cascade(conn, table, column):
+    return any(fk['constrained_columns'] == [column] and
+               (fk.get('options') or {}).get('ondelete', '').upper() == 'CASCADE'
+               for fk in inspect(conn).get_foreign_keys(table))
+
+
+def cascade_foreign_key(conn, table, column, parent):
+    """Make table.column -> parent.id ON DELETE CASCADE.
+
+    SQLite cannot alter a constraint: the table is rebuilt from its model
+    (rename, create, copy, drop), keeping any extra indexes. Rows whose
+    parent is already gone are not copied – the cascade would have
+    removed them.
+    """
+    if has_cascade(conn, table, column):
+        return
+    if conn.dialect.name != 'sqlite':
+        name = next((fk['name'] for fk in inspect(conn).get_foreign_keys(table)
+                     if fk['constrained_columns'] == [column]), None)
+        if name:
+            drop = 'FOREIGN KEY' if conn.dialect.name == 'mysql' else 'CONSTRAINT'
+            conn.execute(text(f'ALTER TABLE {table} DROP {drop} {name}'))
+        name = name or f'fk_{table}_{column}'
+        conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) '
+                          f'REFERENCES {parent} (id) ON DELETE CASCADE'))
+        return
+
+    model   = db.metadata.tables[table]
+    old     = f'_{table}_old'
+    indexes = conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+                                "AND tbl_name = :t AND sql IS NOT NULL"), {'t': table}).all()
+    present = {c['name'] for c in inspect(conn).get_columns(table)}
+    columns = ', '.join(c for c in model.columns.keys() if c in present)
+    conn.execute(text(f'ALTER TABLE {table} RENAME TO {old}'))
+    for name, _ in indexes:
+        conn.execute(text(f'DROP INDEX {name}'))
+    model.create(conn)
+    conn.execute(text(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {old} '
+                      f'WHERE {column} IN (SELECT id FROM {parent})'))
+    conn.execute(text(f'DROP TABLE {old}'))
+    for name, sql in indexes:
+        if not has_index(conn, table, name):
+            conn.execute(text(sql))
+
+
+# ─────────────────────────────────────────────────────────────
+#  Steps
+# ─────────────────────────────────────────────────────────────
+
+@migration('0001_sync_columns')
+def sync_columns(conn):
+    """updated_at watermark + client_id for offline sync."""
+    for table in ('expenses', 'labours', 'harvests'):
+        add_column(conn, table, 'updated_at', 'DATETIME')
+        add_column(conn, table, 'client_id', 'VARCHAR(36)')
+        conn.execute(text(f'UPDATE {table} SET updated_at = created_at '
+                          f'WHERE updated_at IS NULL'))
+        create_index(conn, table, f'ix_{table}_updated_at', 'updated_at')
+        create_index(conn, table, f'ix_{table}_client_id', 'client_id', unique=True)
+    create_index(conn, 'crops', 'ix_crops_updated_at', 'updated_at')
+
+
+@migration('0002_ledger_date_indexes')
+def ledger_date_indexes(conn):
+    """Range scans on ledger dates, farm-wide and per crop (analytics)."""
+    for table, column in (('expenses', 'date'), ('labours', 'date'),
+                          ('harvests', 'harvest_date')):
+        create_index(conn, table, f'ix_{table}_{column}', column)
+        create_index(conn, table, f'ix_{table}_crop_date', f'crop_id, {column}')
+
+
+@migration('0003_crop_photo_index')
+def crop_photo_index(conn):
+    """Timeline lookups by crop and date; backfill crop_photo_index."""
+    from photo_index import rebuild
+    create_index(conn, 'crop_photos', 'ix_crop_photos_crop_taken', 'crop_id, taken_date')
+    create_index(conn, 'crop_photos', 'ix_crop_photos_taken_date', 'taken_date')
+    rebuild(conn)
+
+
+@migration('0004_labour_workers')
+def labour_workers(conn):
+    """Worker dimension from the labour names; part-payment column."""
+    from workforce import assign_workers
+    add_column(conn, 'labours', 'worker_id', 'INTEGER REFERENCES workers (id)')
+    add_column(conn, 'labours', 'amount_paid', 'FLOAT')
+    create_index(conn, 'labours', 'ix_labours_worker_date', 'worker_id, date')
+    create_index(conn, 'labours', 'ix_labours_unpaid', 'worker_id, amount_paid',
+                 where='amount_paid IS NOT NULL')
+    add_column(conn, 'labours', 'sync_seq', 'BIGINT')     # assign_workers sets it; see 0008
+    assign_workers(conn)
+
+
+
+MONEY_COLUMNS = {
+    'expenses':       ('seeds_cost', 'fertilizer_cost', 'equipment_cost',
+                       'labour_cost', 'other_expenses'),
+    'labours':        ('payment_per_day', 'amount_paid'),
+    'harvests':       ('selling_price', 'total_income'),
+    'archived_crops': ('investment', 'labour_cost', 'income'),
+    'archived_daily': ('cost', 'income'),
+}
+
+
+@migration('0005_money_paise')
+def money_paise(conn):
+    """Money columns from float rupees to integer paise (models.Money)."""
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            to_paise(conn, table, column)
+
+
+@migration('0006_crop_cascade')
+def crop_cascade(conn):
+    """Crop children ON DELETE CASCADE, so a crop delete is one statement."""
+    for table in ('expenses', 'labours', 'harvests', 'crop_photos', 'crop_photo_index'):
+        cascade_foreign_key(conn, table, 'crop_id', 'crops')
+
+
+@migration('0007_archived_crop_id')
+def archived_crop_id(conn):
+    """archived_crops gets its own ids; the crop's id moves to crop_id.
+    Existing rows keep their id, which archived_daily already refers to."""
+    add_column(conn, 'archived_crops', 'crop_id', 'INTEGER')
+    conn.execute(text('UPDATE archived_crops SET crop_id = id WHERE crop_id IS NULL'))
+    create_index(conn, 'archived_crops', 'ix_archived_crops_crop_id', 'crop_id')
+
+
+@migration('0008_sync_seq')
+def sync_seq(conn):
+    """Commit-ordered sync positions (models.change_counter). Existing rows
+    and tombstones start at 0, before anything written from now on."""
+    for table in ('crops', 'expenses', 'labours', 'harvests', 'sync_tombstones'):
+        add_column(conn, table, 'sync_seq', 'BIGINT')
+        conn.execute(text(f'UPDATE {table} SET sync_seq = 0 WHERE sync_seq IS NULL'))
+        create_index(conn, table, f'ix_{table}_sync_seq', 'sync_seq')
+
+
+@migration('0009_crop_versions')
+def crop_versions(conn):
+    """data_versions keyed by (table_name, crop_id). The table is rebuilt;
+    table-wide counters carry over as crop 0, so sync_seq keeps growing."""
+    if has_column(conn, 'data_versions', 'crop_id'):
+        return
+    from models import DataVersion
+    rows = conn.execute(text('SELECT table_name, version, updated_at FROM data_versions')).all()
+    conn.execute(text('DROP TABLE data_versions'))
+    DataVersion.__table__.create(conn)
+    if rows:
+        conn.execute(DataVersion.__table__.insert(),
+                     [{'table_name': name, 'crop_id': 0, 'version': version, 'updated_at': at}
+                      for name, version, at in rows])
+
+
+# ─────────────────────────────────────────────────────────────
+#  Runner
+# ─────────────────────────────────────────────────────────────
+
+def upgrade():
+    """Create missing tables, then apply pending steps. Returns names applied."""
+    import models  # noqa: F401  (register all tables with the metadata)
+
+    db.create_all()
+    with db.engine.begin() as conn:
+        conn.execute(text('CREATE TABLE IF NOT EXISTS schema_migrations ('
+                          'name VARCHAR(100) PRIMARY KEY, applied_at DATETIME)'))
+        done = {r[0] for r in conn.execute(text('SELECT name FROM schema_migrations'))}
+
+    applied = []
+    for name, fn in MIGRATIONS:
+        if name in done:
+            continue
+        with db.engine.begin() as conn:
+            fn(conn)
+            conn.execute(text('INSERT INTO schema_migrations (name, applied_at) '
+                              'VALUES (:n, :t)'), {'n': name, 't': datetime.utcnow()})
+        applied.append(name)
+
+    from changes import VERSIONED, bump, new_epoch
+    with db.engine.begin() as conn:
+        new_epoch(conn, replace=False)
+        if applied:
+            # Data fixes bypass the change feed; start every cached version over.
+            bump(conn, {(table, None) for table in VERSIONED})
+    return applied
@@ -1,13 +1,32 @@
 """
 KrishiTrack – Database Models
-Tables: Crop, Expense, Labour, Harvest, CropPhoto,
+Tables: Crop, Expense, Labour, Worker, Harvest, CropPhoto, CropPhotoIndex,
+        ImageHash, ArchivedCrop, ArchivedDaily, SyncTombstone, DataVersion,
         CropRecommendation, FertilizerRec, PesticideRec, SeasonalAlert
 """
 
+import json
+import math
 from datetime import datetime
+from functools import lru_cache
+
+from flask import current_app
+from sqlalchemy import column, func, select, table, union_all
 from extensions import db
+from money import Money, to_paise, to_rupees
 from werkzeug.security import generate_password_hash, check_password_hash
 
+
+def change_counter(name):
+    """The table's data_versions counter, as the default and onupdate of a
+    sync_seq column. changes.py bumps the counter before the rows are
+    written, in the same transaction, so sync_seq follows commit order."""
+    versions = table('data_versions', column('table_name'), column('crop_id'), column('version'))
+    return func.coalesce(select(versions.c.version)
+                         .where(versions.c.table_name == name, versions.c.crop_id == 0)
+                         .scalar_subquery(), 0)
+
+
 class Crop(db.Model):
     __tablename__ = 'crops'
     id               = db.Column(db.Integer, primary_key=True)
@@ -22,35 +41,47 @@ class Crop(db.Model):
     image_path       = db.Column(db.String(255))
     notes            = db.Column(db.Text)
     created_at       = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at       = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    expenses  = db.relationship('Expense',   backref='crop', lazy=True, cascade='all, delete-orphan')
-    labours   = db.relationship('Labour',    backref='crop', lazy=True, cascade='all, delete-orphan')
-    harvests  = db.relationship('Harvest',   backref='crop', lazy=True, cascade='all, delete-orphan')
+    updated_at       = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    sync_seq         = db.Column(db.BigInteger, default=change_counter('crops'),
+                                 onupdate=change_counter('crops'), index=True)   # offline sync order
+
+    # Children go with the crop through ON DELETE CASCADE; passive_deletes
+    # stops the ORM loading them just to delete them one by one (writes.py).
+    expenses  = db.relationship('Expense',   backref='crop', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
+    labours   = db.relationship('Labour',    backref='crop', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
+    harvests  = db.relationship('Harvest',   backref='crop', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
     photos    = db.relationship('CropPhoto', backref='crop', lazy=True, cascade='all, delete-orphan',
-                                order_by='CropPhoto.taken_date')
+                                order_by='CropPhoto.taken_date', passive_deletes=True)
+    photo_index = db.relationship('CropPhotoIndex', uselist=False, lazy=True,
+                                  cascade='all, delete-orphan', passive_deletes=True)
 
+    # Exact per-crop sums of the loaded rows; pages listing many crops
+    # use money.crop_rows() (grouped SQL) instead.
     @property
     def total_investment(self):
-        return sum(e.total for e in self.expenses)
+        return to_rupees(sum(to_paise(e.total) for e in self.expenses))
 
     @property
     def total_income(self):
-        return sum(h.total_income for h in self.harvests)
+        return to_rupees(sum(to_paise(h.total_income or 0) for h in self.harvests))
 
     @property
     def profit_loss(self):
-        return self.total_income - self.total_investment
+        return to_rupees(to_paise(self.total_income) - to_paise(self.total_investment))
 
     @property
     def latest_photo(self):
-        if self.photos:
-            return sorted(self.photos, key=lambda p: p.taken_date, reverse=True)[0]
+        index = self.photo_index
+        if index and index.latest_photo_id:
+            return db.session.get(CropPhoto, index.latest_photo_id)
         return None
 
     @property
     def total_photos(self):
-        return len(self.photos)
+        return self.photo_index.photo_count if self.photo_index else 0
 
     def __repr__(self):
         return f'<Crop {self.name}>'
@@ -58,51 +89,92 @@ class Crop(db.Model):
 
 class Expense(db.Model):
     __tablename__ = 'expenses'
+    __table_args__ = (db.Index('ix_expenses_crop_date', 'crop_id', 'date'),)
     id               = db.Column(db.Integer, primary_key=True)
-    crop_id          = db.Column(db.Integer, db.ForeignKey('crops.id'), nullable=False)
-    date             = db.Column(db.Date, default=datetime.utcnow)
-    seeds_cost       = db.Column(db.Float, default=0.0)
-    fertilizer_cost  = db.Column(db.Float, default=0.0)
-    equipment_cost   = db.Column(db.Float, default=0.0)
-    labour_cost      = db.Column(db.Float, default=0.0)
-    other_expenses   = db.Column(db.Float, default=0.0)
+    crop_id          = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'), nullable=False)
+    date             = db.Column(db.Date, default=datetime.utcnow, index=True)
+    seeds_cost       = db.Column(Money, default=0.0)
+    fertilizer_cost  = db.Column(Money, default=0.0)
+    equipment_cost   = db.Column(Money, default=0.0)
+    labour_cost      = db.Column(Money, default=0.0)
+    other_expenses   = db.Column(Money, default=0.0)
     notes            = db.Column(db.Text)
+    client_id        = db.Column(db.String(36), unique=True, index=True)   # offline sync id
     created_at       = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at       = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    sync_seq         = db.Column(db.BigInteger, default=change_counter('expenses'),
+                                 onupdate=change_counter('expenses'), index=True)   # offline sync order
 
     @property
     def total(self):
-        return (self.seeds_cost + self.fertilizer_cost +
-                self.equipment_cost + self.labour_cost + self.other_expenses)
+        return to_rupees(sum(to_paise(v or 0) for v in (
+            self.seeds_cost, self.fertilizer_cost, self.equipment_cost,
+            self.labour_cost, self.other_expenses)))
 
 
 class Labour(db.Model):
     __tablename__ = 'labours'
+    __table_args__ = (db.Index('ix_labours_crop_date', 'crop_id', 'date'),
+                      db.Index('ix_labours_worker_date', 'worker_id', 'date'),
+                      # Part-paid rows only (partial where supported), for unpaid-wage totals.
+                      db.Index('ix_labours_unpaid', 'worker_id', 'amount_paid',
+                               sqlite_where=db.text('amount_paid IS NOT NULL'),
+                               postgresql_where=db.text('amount_paid IS NOT NULL')))
     id              = db.Column(db.Integer, primary_key=True)
-    crop_id         = db.Column(db.Integer, db.ForeignKey('crops.id'), nullable=False)
+    crop_id         = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'), nullable=False)
+    worker_id       = db.Column(db.Integer, db.ForeignKey('workers.id'))   # set from name (workforce.py)
     name            = db.Column(db.String(120), nullable=False)
     work_type       = db.Column(db.String(120))
     days_worked     = db.Column(db.Float, default=1.0)
-    payment_per_day = db.Column(db.Float, default=0.0)
-    date            = db.Column(db.Date, default=datetime.utcnow)
+    payment_per_day = db.Column(Money, default=0.0)
+    amount_paid     = db.Column(Money)                                     # NULL = paid in full
+    date            = db.Column(db.Date, default=datetime.utcnow, index=True)
     notes           = db.Column(db.Text)
+    client_id       = db.Column(db.String(36), unique=True, index=True)    # offline sync id
     created_at      = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at      = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    sync_seq        = db.Column(db.BigInteger, default=change_counter('labours'),
+                                onupdate=change_counter('labours'), index=True)   # offline sync order
+
+    worker = db.relationship('Worker', lazy=True)
 
     @property
     def total_payment(self):
-        return self.days_worked * self.payment_per_day
+        # Rounded half-up to the paisa, as money.labour_paise() does in SQL.
+        return to_rupees(math.floor((self.days_worked or 0) * to_paise(self.payment_per_day or 0) + 0.5))
+
+    @property
+    def amount_owed(self):
+        if self.amount_paid is None:
+            return 0.0
+        return to_rupees(max(0, to_paise(self.total_payment) - to_paise(self.amount_paid)))
+
+
+class Worker(db.Model):
+    """One person behind the free-text Labour.name spellings."""
+    __tablename__ = 'workers'
+    id         = db.Column(db.Integer, primary_key=True)
+    name       = db.Column(db.String(120), nullable=False)
+    name_key   = db.Column(db.String(120), nullable=False, unique=True)   # workforce.name_key()
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
 class Harvest(db.Model):
     __tablename__ = 'harvests'
+    __table_args__ = (db.Index('ix_harvests_crop_date', 'crop_id', 'harvest_date'),)
     id               = db.Column(db.Integer, primary_key=True)
-    crop_id          = db.Column(db.Integer, db.ForeignKey('crops.id'), nullable=False)
-    harvest_date     = db.Column(db.Date, nullable=False)
+    crop_id          = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'), nullable=False)
+    harvest_date     = db.Column(db.Date, nullable=False, index=True)
     total_production = db.Column(db.Float, default=0.0)
     unit             = db.Column(db.String(20), default='kg')
-    selling_price    = db.Column(db.Float, default=0.0)
-    total_income     = db.Column(db.Float, default=0.0)
+    selling_price    = db.Column(Money, default=0.0)
+    total_income     = db.Column(Money, default=0.0)
     notes            = db.Column(db.Text)
+    client_id        = db.Column(db.String(36), unique=True, index=True)   # offline sync id
     created_at       = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at       = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    sync_seq         = db.Column(db.BigInteger, default=change_counter('harvests'),
+                                 onupdate=change_counter('harvests'), index=True)   # offline sync order
 
     def calculate_income(self):
         self.total_income = self.total_production * self.selling_price
@@ -110,19 +182,121 @@ class Harvest(db.Model):
 
 class CropPhoto(db.Model):
     __tablename__ = 'crop_photos'
+    __table_args__ = (db.Index('ix_crop_photos_crop_taken', 'crop_id', 'taken_date'),)
     id           = db.Column(db.Integer, primary_key=True)
-    crop_id      = db.Column(db.Integer, db.ForeignKey('crops.id'), nullable=False)
+    crop_id      = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'), nullable=False)
     photo_path   = db.Column(db.String(255), nullable=False)
     caption      = db.Column(db.String(255))
     week_number  = db.Column(db.Integer)
     growth_stage = db.Column(db.String(100))
-    taken_date   = db.Column(db.Date, nullable=False)
+    taken_date   = db.Column(db.Date, nullable=False, index=True)
     created_at   = db.Column(db.DateTime, default=datetime.utcnow)
 
     GROWTH_STAGES = ['Germination','Seedling','Vegetative Growth',
                      'Flowering','Fruiting','Harvest Ready','Post Harvest']
 
 
+class CropPhotoIndex(db.Model):
+    """Per-crop photo timeline summary, maintained by photo_index.py."""
+    __tablename__ = 'crop_photo_index'
+    crop_id         = db.Column(db.Integer, db.ForeignKey('crops.id', ondelete='CASCADE'), primary_key=True)
+    photo_count     = db.Column(db.Integer, nullable=False, default=0)
+    latest_photo_id = db.Column(db.Integer)          # newest by taken_date, then id
+    week_counts     = db.Column(db.Text)             # JSON {"week": photos}
+    stage_changes   = db.Column(db.Text)             # JSON [[stage, week, date, photo_id], …]
+    updated_at      = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def weeks(self):
+        """{week_number: photo count}, in week order (0 = unknown week)."""
+        return {int(k): v for k, v in json.loads(self.week_counts or '{}').items()}
+
+    @property
+    def transitions(self):
+        return [{'stage': s, 'week': w, 'date': d, 'photo_id': p}
+                for s, w, d, p in json.loads(self.stage_changes or '[]')]
+
+
+class ImageHash(db.Model):
+    """64-bit perceptual hash (dHash) of one uploaded image file, see image_hash.py.
+
+    Keyed by file, not by row: after storage is reclaimed several
+    CropPhoto rows can point at the same file.
+    """
+    __tablename__ = 'image_hashes'
+    __table_args__ = (db.UniqueConstraint('kind', 'path', name='uq_image_hashes_kind_path'),)
+    id          = db.Column(db.Integer, primary_key=True)
+    kind        = db.Column(db.String(10), nullable=False)     # 'photo' or 'crop'
+    path        = db.Column(db.String(255), nullable=False)
+    phash       = db.Column(db.BigInteger)                     # signed; NULL if unreadable
+    size_bytes  = db.Column(db.Integer, default=0)
+    created_at  = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ArchivedCrop(db.Model):
+    """A finished crop moved out of the hot tables by `flask archive-season`.
+
+    The rollup columns feed the profit history; payload is the zlib-
+    compressed JSON of the crop and all of its ledger and photo rows,
+    enough for archive.restore() to put them back.
+    """
+    __tablename__ = 'archived_crops'
+    id             = db.Column(db.Integer, primary_key=True)
+    crop_id        = db.Column(db.Integer, index=True)            # original crops.id; may recur
+    name           = db.Column(db.String(120), nullable=False)
+    variety        = db.Column(db.String(120))
+    field_area     = db.Column(db.Float, default=0.0)
+    seeding_date   = db.Column(db.Date, nullable=False)
+    season         = db.Column(db.String(20), nullable=False, index=True)  # e.g. 'Kharif 2024'
+    last_activity  = db.Column(db.Date)
+    investment     = db.Column(Money, default=0.0)
+    labour_cost    = db.Column(Money, default=0.0)
+    income         = db.Column(Money, default=0.0)
+    production_qtl = db.Column(db.Float, default=0.0)
+    expense_count  = db.Column(db.Integer, default=0)
+    labour_count   = db.Column(db.Integer, default=0)
+    harvest_count  = db.Column(db.Integer, default=0)
+    photo_count    = db.Column(db.Integer, default=0)
+    payload        = db.Column(db.LargeBinary(length=2 ** 24), nullable=False)
+    archived_at    = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def profit_loss(self):
+        return to_rupees(to_paise(self.income or 0) - to_paise(self.investment or 0))
+
+
+class ArchivedDaily(db.Model):
+    """Daily cost / income / yield of archived crops, so analytics keeps
+    their history without the ledger rows."""
+    __tablename__ = 'archived_daily'
+    crop_id        = db.Column(db.Integer, db.ForeignKey('archived_crops.id', ondelete='CASCADE'),
+                               primary_key=True)                # archived_crops.id, not crops.id
+    day            = db.Column(db.Date, primary_key=True, index=True)
+    cost           = db.Column(Money, default=0.0)
+    income         = db.Column(Money, default=0.0)
+    production_qtl = db.Column(db.Float, default=0.0)
+
+
+class SyncTombstone(db.Model):
+    """Deleted ledger rows, so offline devices can drop them on next sync."""
+    __tablename__ = 'sync_tombstones'
+    id          = db.Column(db.Integer, primary_key=True)
+    table_name  = db.Column(db.String(50), nullable=False)
+    row_id      = db.Column(db.Integer, nullable=False)
+    client_id   = db.Column(db.String(36))
+    deleted_at  = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    sync_seq    = db.Column(db.BigInteger, index=True)      # change_counter(table_name) at delete
+
+
+class DataVersion(db.Model):
+    """Change counters per table and per crop, see changes.py."""
+    __tablename__ = 'data_versions'
+    table_name  = db.Column(db.String(50), primary_key=True)
+    crop_id     = db.Column(db.Integer, primary_key=True, autoincrement=False)   # 0 = whole table
+    version     = db.Column(db.BigInteger, nullable=False, default=1)
+    updated_at  = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 # ─────────────────────────────────────────────────────────────
 #  NEW FEATURE MODELS
 # ─────────────────────────────────────────────────────────────
@@ -200,6 +374,12 @@ class SeasonalAlert(db.Model):
 
 from werkzeug.security import generate_password_hash, check_password_hash
 
+@lru_cache(maxsize=8)
+def _hash_prefix(method):
+    """'scrypt' -> 'scrypt:32768:8:1', exactly as werkzeug writes it."""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
 class User(db.Model):
     """Multi-user login — stored in MySQL."""
     __tablename__ = 'users'
@@ -219,11 +399,26 @@ class User(db.Model):
     last_login   = db.Column(db.DateTime)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, current_app.config['PASSWORD_HASH_METHOD'])
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    @property
+    def password_needs_rehash(self):
+        """True when the stored hash used other parameters than configured."""
+        stored = (self.password_hash or '').split('$', 1)[0]
+        return stored != _hash_prefix(current_app.config['PASSWORD_HASH_METHOD'])
+
+    @classmethod
+    def find_by_login(cls, login):
+        """User by username or email. Two unique-index lookups in one
+        statement, instead of an OR that may scan."""
+        stmt = union_all(select(cls).where(cls.username == login),
+                         select(cls).where(cls.email == login)).limit(1)
+        return db.session.scalars(select(cls).from_statement(stmt)).first()
+
     def __repr__(self):
         return f'<User {self.username}>'
         content = content.rstrip() + '\n' + user_model + '\n'
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+KrishiTrack – Money
+Amounts are stored as whole paise in BIGINT columns (the Money type), so
+sums are exact on every database instead of drifting with float
+addition over thousands of ledger rows.
+
+  • Python keeps seeing rupees: Money converts each value on the way in
+    and out, so forms, templates, JSON and sync are unchanged
+  • SQL arithmetic on Money columns happens in paise: build the
+    expression from paise() / expense_paise() / labour_paise() and wrap
+    the finished aggregate in rupees() – never add rupee floats
+  • crop_totals() – per-crop investment, labour and income from three
+    grouped queries into int64 NumPy arrays; crop_rows() turns them
+    into the rows the dashboard, profit page, exports and API show.
+    NumPy is imported on first use, so importing models stays cheap
+"""
+
+import math
+
+from sqlalchemy import BigInteger, func, select, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+# Above this many crops the rollup groups the whole farm instead of an IN list.
+IN_LIMIT = 500
+
+
+def to_paise(rupees):
+    """Rupees (float, int, Decimal or numeric string) -> int paise."""
+    return math.floor(float(rupees) * 100 + 0.5)
+
+
+def to_rupees(paise):
+    return paise / 100
+
+
+class Money(TypeDecorator):
+    """Rupees in Python, integer paise in the database."""
+    impl     = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_paise(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else round(value) / 100
+
+
+# ─────────────────────────────────────────────────────────────
+#  SQL expressions
+# ─────────────────────────────────────────────────────────────
+
+def paise(expr):
+    """A Money column (or expression) as raw paise for SQL arithmetic."""
+    return type_coerce(expr, BigInteger())
+
+
+def rupees(expr):
+    """A paise expression, fetched as rupees."""
+    return type_coerce(expr, Money())
+
+
+def expense_paise():
+    from models import Expense
+    return (paise(Expense.seeds_cost) + paise(Expense.fertilizer_cost) +
+            paise(Expense.equipment_cost) + paise(Expense.labour_cost) +
+            paise(Expense.other_expenses))
+
+
+def labour_paise():
+    """days × rate per row, rounded to the paisa like Labour.total_payment."""
+    from models import Labour
+    return func.round(Labour.days_worked * paise(Labour.payment_per_day))
+
+
+# ─────────────────────────────────────────────────────────────
+#  Per-crop rollups
+# ─────────────────────────────────────────────────────────────
+
+def _scatter(ids, rows):
+    """(crop_id, paise) rows -> int64 array aligned on ids."""
+    import numpy as np
+    out = np.zeros(len(ids), dtype=np.int64)
+    if rows and len(ids):
+        keys = np.array([r[0] for r in rows], dtype=np.int64)
+        vals = np.array([round(r[1] or 0) for r in rows], dtype=np.int64)
+        pos  = np.searchsorted(ids, keys).clip(max=len(ids) - 1)
+        hit  = ids[pos] == keys
+        out[pos[hit]] = vals[hit]
+    return out
+
+
+def crop_totals(s, crop_ids=None):
+    """{'ids', 'investment', 'labour', 'income'} as int64 arrays (paise),
+    aligned on ascending crop id. One grouped query per ledger table."""
+    import numpy as np
+    from models import Crop, Expense, Harvest, Labour
+
+    stmt = select(Crop.id).order_by(Crop.id)
+    if crop_ids is not None:
+        stmt = stmt.where(Crop.id.in_(crop_ids))
+    ids    = np.array(s.scalars(stmt).all(), dtype=np.int64)
+    totals = {'ids': ids}
+    for key, model, amount in (('investment', Expense, expense_paise()),
+                               ('labour',     Labour,  labour_paise()),
+                               ('income',     Harvest, paise(Harvest.total_income))):
+        q = select(model.crop_id, func.sum(amount)).group_by(model.crop_id)
+        if crop_ids is not None:
+            q = q.where(model.crop_id.in_(crop_ids))
+        totals[key] = _scatter(ids, s.execute(q).all())
+    return totals
+
+
+def crop_rows(s, crops):
+    """([{'crop', 'investment', 'labour', 'income', 'profit', 'pct'}], grand)
+    in rupees for crops (in the caller's order); grand holds the exact
+    sums over them."""
+    import numpy as np
+    ids    = [c.id for c in crops]
+    totals = crop_totals(s, ids if len(ids) <= IN_LIMIT else None)
+    pos    = np.searchsorted(totals['ids'], np.array(ids, dtype=np.int64))
+    pos    = pos.clip(max=max(len(totals['ids']) - 1, 0))
+    inv, lab, inc = (totals[k][pos] for k in ('investment', 'labour', 'income'))
+    profit = inc - inv
+    pct    = np.round(np.divide(profit * 100.0, inv, out=np.zeros(len(inv)), where=inv != 0), 1)
+
+    rows = [{'crop': c, 'investment': i / 100, 'labour': l / 100, 'income': n / 100,
+             'profit': p / 100, 'pct': float(r)}
+            for c, i, l, n, p, r in zip(crops, inv.tolist(), lab.tolist(), inc.tolist(),
+                                        profit.tolist(), pct)]
+    grand = {'investment': int(inv.sum()) / 100, 'labour': int(lab.sum()) / 100,
+             'income': int(inc.sum()) / 100, 'profit': int(profit.sum()) / 100}
+    return rows, grand
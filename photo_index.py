@@ -0,0 +1,84 @@
+"""
+KrishiTrack – Crop Photo Timeline Index
+One crop_photo_index row per crop that has photos: photo count, latest
+photo id, photos per week and growth-stage transitions. Pages read this
+instead of loading and sorting every CropPhoto.
+
+The row is rebuilt from that crop's photos (one indexed query) in the
+same flush that adds or deletes a photo, so it can never drift. Bulk
+Core inserts skip the ORM; run rebuild() afterwards, or
+`flask rebuild-photo-index`.
+"""
+
+import json
+from datetime import datetime
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+
+
+def summarise(photos):
+    """Index values for one crop's (id, week_number, growth_stage,
+    taken_date) rows, given in (taken_date, id) order."""
+    weeks, changes, stage = {}, [], None
+    for photo_id, week, growth_stage, taken in photos:
+        weeks[week or 0] = weeks.get(week or 0, 0) + 1
+        if growth_stage and growth_stage != stage:
+            changes.append([growth_stage, week, taken.isoformat(), photo_id])
+            stage = growth_stage
+    return {
+        'photo_count':     len(photos),
+        'latest_photo_id': photos[-1][0] if photos else None,
+        'week_counts':     json.dumps({str(k): v for k, v in sorted(weeks.items())}),
+        'stage_changes':   json.dumps(changes),
+    }
+
+
+def rebuild(conn, crop_ids=None):
+    """Recompute index rows for crop_ids (all crops if None). Returns rows written."""
+    from models import CropPhoto, CropPhotoIndex
+
+    stmt = (select(CropPhoto.crop_id, CropPhoto.id, CropPhoto.week_number,
+                   CropPhoto.growth_stage, CropPhoto.taken_date)
+            .order_by(CropPhoto.crop_id, CropPhoto.taken_date, CropPhoto.id))
+    wipe = delete(CropPhotoIndex)
+    if crop_ids is not None:
+        crop_ids = list(crop_ids)
+        stmt = stmt.where(CropPhoto.crop_id.in_(crop_ids))
+        wipe = wipe.where(CropPhotoIndex.crop_id.in_(crop_ids))
+
+    grouped = {}
+    for crop_id, *photo in conn.execute(stmt):
+        grouped.setdefault(crop_id, []).append(photo)
+
+    now  = datetime.utcnow()
+    rows = [dict(summarise(photos), crop_id=crop_id, updated_at=now)
+            for crop_id, photos in grouped.items()]
+    conn.execute(wipe)
+    if rows:
+        conn.execute(insert(CropPhotoIndex), rows)
+    return len(rows)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Keep it current on every flush
+# ─────────────────────────────────────────────────────────────
+
+def _after_flush(sess, flush_context):
+    # new/dirty/deleted still list what was just flushed, with ids assigned.
+    from models import Crop, CropPhoto
+
+    touched, gone = set(), set()
+    for obj in (*sess.new, *sess.dirty, *sess.deleted):
+        if isinstance(obj, CropPhoto) and obj.crop_id is not None:
+            touched.add(obj.crop_id)
+    for obj in sess.deleted:
+        if isinstance(obj, Crop):
+            gone.add(obj.id)            # its index row went with it (cascade)
+    if touched - gone:
+        rebuild(sess.connection(), touched - gone)
+
+
+def init_photo_index(app):
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1,220 @@
+"""
+KrishiTrack – Crop Mix Planner
+Splits a farm's area (or a cooperative's plots) between the crop guide's
+crops for one season to maximise expected profit within budgets:
+
+  • area     – total acres, or a list of plots that each take one crop
+  • water    – acre-inches; per-acre need from the guide's water class
+  • labour   – worker-days; per-acre need from our own labour ledger
+               (harvested crops), else estimated from the crop duration
+  • capital  – rupees of cost_per_acre
+  • max share – no crop on more than this fraction of the area
+
+Profit and cost per acre come from the trained forecast where it has
+them (forecast.py), else from the guide.
+
+The continuous plan is a small linear programme solved exactly with a
+dense simplex (crops × budgets, well under a millisecond). With plots,
+each plot then gets one crop: largest plots first, towards the crops
+the LP wants most of, never past a budget – vectorised over crops, so
+hundreds of plots take milliseconds. The LP profit is reported as the
+bound the plot plan is measured against.
+"""
+
+import math
+import re
+
+import numpy as np
+from sqlalchemy import func, select
+
+# Seasonal irrigation need per acre, in acre-inches, by CropRecommendation.water_req.
+WATER_ACRE_INCHES = {'Low': 12.0, 'Medium': 24.0, 'High': 40.0}
+
+# Worker-days per acre per growing day, when our ledger has no history for a crop.
+LABOUR_DAYS_PER_ACRE_DAY = 0.3
+
+RESOURCES = ('area', 'water', 'labour', 'capital')
+
+
+class PlanError(ValueError):
+    """Planner input that parses but cannot be planned; the message is for the form."""
+
+
+def parse_plots(text, max_plots=2000):
+    """'2.5, 1 3' or '40 x 2.5' (40 plots of 2.5 acres) -> [acres].
+
+    The plot count is checked before the list is built, so a huge
+    'N x size' cannot exhaust memory.
+    """
+    spec = []
+    for token in re.split(r'[,;\s]+', re.sub(r'\s*[x*×]\s*', 'x', (text or '').strip().lower())):
+        if token:
+            count, _, size = token.rpartition('x')
+            count, size = (int(count) if count else 1), float(size)
+            if count < 1 or not math.isfinite(size) or size <= 0:
+                raise PlanError('Plot areas and counts must be positive.')
+            spec.append((count, size))
+    if sum(count for count, _ in spec) > max_plots:
+        raise PlanError(f'At most {max_plots} plots per plan.')
+    return [size for count, size in spec for _ in range(count)]
+
+
+# ─────────────────────────────────────────────────────────────
+#  Candidates
+# ─────────────────────────────────────────────────────────────
+
+def labour_history(s):
+    """{crop name (lower): worker-days per acre} over harvested crops."""
+    from models import Crop, Labour
+
+    per_crop = (select(Labour.crop_id, func.sum(Labour.days_worked).label('days'))
+                .group_by(Labour.crop_id).subquery())
+    stmt = (select(func.lower(Crop.name), func.sum(per_crop.c.days), func.sum(Crop.field_area))
+            .join(per_crop, per_crop.c.crop_id == Crop.id)
+            .where(Crop.status == 'Harvested', Crop.field_area > 0)
+            .group_by(func.lower(Crop.name)))
+    return {name: days / area for name, days, area in s.execute(stmt) if area}
+
+
+def candidates(s, season, soil=None, model=None):
+    """Guide crops for the season and soil, best-profit row per crop, with
+    per-acre profit, cost, water and labour as arrays."""
+    from models import CropRecommendation as R
+
+    stmt = select(R).where(R.season.in_([season, 'All']))
+    if soil and soil != 'Any':
+        stmt = stmt.where(R.soil_type.in_([soil, 'Any']))
+    best = {}
+    for rec in s.scalars(stmt):
+        if (rec.crop_name not in best or
+                rec.expected_profit_per_acre > best[rec.crop_name].expected_profit_per_acre):
+            best[rec.crop_name] = rec
+    recs = sorted(best.values(), key=lambda r: r.crop_name)
+
+    profit = np.array([r.expected_profit_per_acre for r in recs], dtype=float)
+    cost   = np.array([r.cost_per_acre or 0.0 for r in recs], dtype=float)
+    if model is not None and recs:
+        for i, est in enumerate(model.predict_many([(r.crop_name, '', 1.0) for r in recs])):
+            if est and est['samples'] and est['profit'] is not None:
+                profit[i], cost[i] = est['profit'], est['cost']
+
+    history = labour_history(s) if recs else {}
+    return {
+        'recs':    recs,
+        'profit':  profit,
+        'cost':    cost,
+        'water':   np.array([WATER_ACRE_INCHES.get(r.water_req, WATER_ACRE_INCHES['Medium'])
+                             for r in recs], dtype=float),
+        'labour':  np.array([history.get(r.crop_name.lower(),
+                                         (r.duration_days or 90) * LABOUR_DAYS_PER_ACRE_DAY)
+                             for r in recs], dtype=float),
+        'history': np.array([r.crop_name.lower() in history for r in recs]),
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+#  Solvers
+# ─────────────────────────────────────────────────────────────
+
+def simplex(c, A, b, max_iter=1000):
+    """max c·x subject to A·x <= b, x >= 0, for b >= 0 (the origin is
+    feasible, so no phase one). Bland's rule, dense tableau."""
+    m, n = A.shape
+    T = np.zeros((m + 1, n + m + 1))
+    T[:m, :n], T[:m, n:n + m], T[:m, -1] = A, np.eye(m), b
+    T[m, :n] = -c
+    basis = np.arange(n, n + m)
+    for _ in range(max_iter):
+        entering = np.flatnonzero(T[m, :-1] < -1e-9)
+        if not len(entering):
+            break
+        j     = entering[0]
+        col   = T[:m, j]
+        ratio = np.where(col > 1e-12, T[:m, -1] / np.where(col > 1e-12, col, 1), np.inf)
+        best  = np.flatnonzero(ratio <= ratio.min() + 1e-12)
+        i     = best[np.argmin(basis[best])]
+        T[i] /= T[i, j]
+        other = np.arange(m + 1) != i
+        T[other] -= np.outer(T[other, j], T[i])
+        basis[i] = j
+    x = np.zeros(n + m)
+    x[basis] = T[:m, -1]
+    return x[:n]
+
+
+def _assign(plots, target, use, spare, profit):
+    """One crop (or none, -1) per plot. use: (resources, crops) per acre."""
+    order   = np.argsort(-plots, kind='stable')
+    left    = target.copy()
+    crop_of = np.full(len(plots), -1)
+    for p in order:
+        need = use * plots[p]
+        fits = (need <= spare[:, None] + 1e-9).all(axis=0) & (profit > 0)
+        if not fits.any():
+            continue
+        wanted = np.where(fits, left, -np.inf)             # the LP's areas still open
+        if wanted.max() <= 1e-9:
+            wanted = np.where(fits, profit, -np.inf)       # all met: best profit that fits
+        c = int(np.argmax(wanted))
+        crop_of[p] = c
+        left[c]   -= plots[p]
+        spare     -= need[:, c]
+    return crop_of
+
+
+def plan(cands, area, plots=None, water=None, labour=None, capital=None, max_share=1.0):
+    """Best crop mix. Returns {'rows', 'totals', 'budgets', 'bound', 'plots'}.
+
+    Budgets left as None are unlimited; plots (acres each) make every
+    plot a single crop, otherwise any split of `area` is allowed.
+    The simplex needs every limit ≥ 0, so negative or non-finite area and
+    budgets raise ValueError.
+    """
+    for value in (area, water, labour, capital):
+        if value is not None and not (math.isfinite(value) and value >= 0):
+            raise ValueError('Area and budgets must be finite and not negative.')
+    plots  = np.asarray(plots or [], dtype=float)
+    area   = float(plots.sum()) if len(plots) else float(area)
+    n      = len(cands['recs'])
+    use    = np.vstack([np.ones(n), cands['water'], cands['labour'], cands['cost']])
+    limits = np.array([area, water, labour, capital], dtype=float)   # None -> nan
+    limits = np.where(np.isnan(limits), np.inf, limits)
+    cap    = np.full(n, max_share * area)
+
+    keep   = np.isfinite(limits)
+    A      = np.vstack([use[keep], np.eye(n)])
+    b      = np.concatenate([limits[keep], cap])
+    x      = simplex(cands['profit'], A, b) if n else np.zeros(0)
+    bound  = float(cands['profit'] @ x)
+
+    if len(plots):
+        # The share cap is a budget of its own per crop.
+        use_p   = np.vstack([use, np.eye(n)])
+        spare   = np.concatenate([limits, cap])
+        crop_of = _assign(plots, x, use_p, spare, cands['profit'])
+        x       = np.bincount(crop_of[crop_of >= 0], plots[crop_of >= 0], n) if n else x
+        counts  = np.bincount(crop_of[crop_of >= 0], minlength=n)
+    else:
+        x       = np.floor(x * 100 + 1e-6) / 100           # whole cents of an acre
+        counts  = None
+
+    used = use @ x
+    rows = []
+    for i in np.flatnonzero(x > 0):
+        water_i, labour_i, cost_i = use[1:, i] * x[i]
+        rows.append({'rec': cands['recs'][i], 'area': float(x[i]),
+                     'plots': int(counts[i]) if counts is not None else None,
+                     'profit': float(cands['profit'][i] * x[i]),
+                     'profit_acre': float(cands['profit'][i]),
+                     'water': float(water_i), 'labour': float(labour_i), 'cost': float(cost_i),
+                     'history': bool(cands['history'][i])})
+    rows.sort(key=lambda r: -r['area'])
+    return {
+        'rows':    rows,
+        'totals':  {'area': float(used[0]), 'profit': float(cands['profit'] @ x),
+                    'fallow': max(area - float(used[0]), 0.0)},
+        'budgets': [{'name': name, 'used': float(u), 'limit': float(l) if np.isfinite(l) else None}
+                    for name, u, l in zip(RESOURCES, used, limits)],
+        'bound':   bound,
+        'plots':   {'count': len(plots), 'fallow': int((crop_of < 0).sum())} if len(plots) else None,
+    }
@@ -0,0 +1,278 @@
+"""
+KrishiTrack – Full-Text Search
+A SQLite FTS5 index beside the main database (SEARCH_INDEX_PATH), so
+search works the same on MySQL and SQLite and never scans the live
+tables:
+
+  • crops          – name, variety, notes
+  • expenses       – notes
+  • labour         – worker name, work type, notes
+  • recommendations – crop / fertilizer / pesticide advice and seasonal
+                     alert descriptions
+
+Documents are collected from every ORM flush and written after the
+commit (dropped on rollback), so the index follows the data – including
+the ledger rows a crop delete cascades to in the database. Core bulk
+inserts skip the ORM: run `flask rebuild-search-index` afterwards.
+
+Results are ranked with BM25 (title hits weigh more) and paginated;
+suggest() completes a prefix against titles using the prefix indexes.
+"""
+
+import html
+import os
+import re
+import sqlite3
+import threading
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+# kind -> small code packed into the FTS rowid (ref_id * 16 + code), so a
+# document is replaced or deleted by rowid instead of a scan.
+KINDS = {'crop': 1, 'expense': 2, 'labour': 3, 'crop_rec': 4,
+         'fertilizer': 5, 'pesticide': 6, 'alert': 7}
+
+KIND_LABELS = {'crop': 'Crop', 'expense': 'Expense', 'labour': 'Labour',
+               'crop_rec': 'Crop guide', 'fertilizer': 'Fertilizer',
+               'pesticide': 'Pesticide', 'alert': 'Seasonal alert'}
+
+TITLE_WEIGHT = 10.0
+
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+
+
+def _join(*parts):
+    return ' '.join(str(p) for p in parts if p)
+
+
+def document(obj):
+    """(kind, ref_id, crop_id, tag, title, body) for a model instance,
+    None for models that are not indexed, or with title None if the
+    row has nothing worth finding."""
+    from models import (Crop, CropRecommendation, Expense, FertilizerRecommendation,
+                        Labour, PesticideRecommendation, SeasonalAlert)
+
+    if isinstance(obj, Crop):
+        return ('crop', obj.id, obj.id, obj.status, obj.name,
+                _join(obj.variety, obj.notes))
+    if isinstance(obj, Expense):
+        return ('expense', obj.id, obj.crop_id, obj.date and obj.date.isoformat(),
+                'Expense' if obj.notes else None, obj.notes)
+    if isinstance(obj, Labour):
+        return ('labour', obj.id, obj.crop_id, obj.date and obj.date.isoformat(),
+                obj.name, _join(obj.work_type, obj.notes))
+    if isinstance(obj, CropRecommendation):
+        return ('crop_rec', obj.id, None, obj.season, obj.crop_name,
+                _join(obj.description, obj.soil_type, obj.state))
+    if isinstance(obj, FertilizerRecommendation):
+        return ('fertilizer', obj.id, None, obj.growth_stage,
+                _join(obj.crop_name, obj.fertilizer_name),
+                _join(obj.timing, obj.method, obj.notes))
+    if isinstance(obj, PesticideRecommendation):
+        return ('pesticide', obj.id, None, obj.pest_type,
+                _join(obj.crop_name, obj.pest_name),
+                _join(obj.pesticide_name, obj.spray_interval, obj.notes))
+    if isinstance(obj, SeasonalAlert):
+        return ('alert', obj.id, None, str(obj.month),
+                _join(obj.crop_name, obj.activity), obj.description)
+    return None
+
+
+def match_expression(text, prefix_last=True):
+    """User text -> FTS5 query: every word must match, the last as a prefix.
+
+    Words are quoted, so FTS5 operators typed by the user are literal.
+    """
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    if prefix_last:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    """Escape an FTS snippet and turn its markers into <mark> tags."""
+    return (html.escape(snippet)
+            .replace(MARK_OPEN, '<mark>').replace(MARK_CLOSE, '</mark>'))
+
+
+class SearchIndex:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path  = path
+        self.local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5("
+                         "title, body, kind UNINDEXED, ref_id UNINDEXED, "
+                         "crop_id UNINDEXED, tag UNINDEXED, "
+                         "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')")
+
+    def reopen(self):
+        """Use new connections after a fork (see sessions.SQLiteStore.reopen)."""
+        self.inherited = self.local
+        self.local     = threading.local()
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    # ── writes ──
+
+    def apply(self, docs):
+        """docs: {(kind, ref_id): document tuple, or None to delete}."""
+        conn = self._conn()
+        with conn:
+            self._write(conn, docs.items())
+
+    @staticmethod
+    def _write(conn, items):
+        drop, add = [], []
+        for (kind, ref_id), doc in items:
+            rowid = ref_id * 16 + KINDS[kind]
+            drop.append((rowid,))
+            if doc is not None and doc[4]:
+                add.append((rowid, doc[4], doc[5] or '', kind, ref_id, doc[2], doc[3]))
+        conn.executemany('DELETE FROM docs WHERE rowid = ?', drop)
+        conn.executemany('INSERT INTO docs (rowid, title, body, kind, ref_id, crop_id, tag) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?)', add)
+
+    def rebuild(self, s, batch=2000):
+        """Re-index every searchable row of the main database. Returns documents written."""
+        from models import (Crop, CropRecommendation, Expense, FertilizerRecommendation,
+                            Labour, PesticideRecommendation, SeasonalAlert)
+
+        conn, n = self._conn(), 0
+        with conn:
+            conn.execute('DELETE FROM docs')
+            for model in (Crop, Expense, Labour, CropRecommendation,
+                          FertilizerRecommendation, PesticideRecommendation, SeasonalAlert):
+                result = s.execute(select(model).execution_options(yield_per=batch))
+                for chunk in result.scalars().partitions():
+                    docs = [document(obj) for obj in chunk]
+                    self._write(conn, [((d[0], d[1]), d) for d in docs])
+                    n += sum(1 for d in docs if d[4])
+            conn.execute("INSERT INTO docs (docs) VALUES ('optimize')")
+        return n
+
+    # ── reads ──
+
+    def search(self, text, kinds=None, page=1, per_page=20):
+        """(total, hits) for page `page`; hits are dicts, best first."""
+        expr = match_expression(text)
+        if expr is None:
+            return 0, []
+        where, args = 'docs MATCH ?', [expr]
+        if kinds:
+            where += f" AND kind IN ({','.join('?' * len(kinds))})"
+            args  += list(kinds)
+        conn  = self._conn()
+        total = conn.execute(f'SELECT count(*) FROM docs WHERE {where}', args).fetchone()[0]
+        rows  = conn.execute(
+            f"SELECT kind, ref_id, crop_id, tag, "
+            f"highlight(docs, 0, ?, ?), snippet(docs, 1, ?, ?, '…', 16) "
+            f"FROM docs WHERE {where} "
+            f"ORDER BY bm25(docs, {TITLE_WEIGHT}, 1.0) LIMIT ? OFFSET ?",
+            [MARK_OPEN, MARK_CLOSE, MARK_OPEN, MARK_CLOSE, *args,
+             per_page, (page - 1) * per_page]).fetchall()
+        return total, [{'kind': kind, 'label': KIND_LABELS[kind], 'ref_id': ref_id,
+                        'crop_id': crop_id, 'tag': tag,
+                        'title': highlight(title), 'snippet': highlight(body)}
+                       for kind, ref_id, crop_id, tag, title, body in rows]
+
+    def ids(self, kind, text, limit=1000):
+        """Best-matching ref ids of one kind (e.g. to filter a list page)."""
+        expr = match_expression(text)
+        if expr is None:
+            return []
+        return [r[0] for r in self._conn().execute(
+            f'SELECT ref_id FROM docs WHERE docs MATCH ? AND kind = ? '
+            f'ORDER BY bm25(docs, {TITLE_WEIGHT}, 1.0) LIMIT ?', (expr, kind, limit))]
+
+    def suggest(self, prefix, limit=8):
+        """Distinct titles containing the typed words, shortest first.
+
+        Not BM25-ranked: ranking a common prefix scores thousands of
+        rows, while LIMIT without ORDER BY stops at the first matches.
+        """
+        expr = match_expression(prefix)
+        if expr is None:
+            return []
+        titles = {}
+        for title, kind in self._conn().execute(
+                'SELECT title, kind FROM docs WHERE docs MATCH ? LIMIT ?',
+                (f'title : ({expr})', limit * 8)):
+            titles.setdefault(' '.join(title.split()).lower(), (' '.join(title.split()), kind))
+        best = sorted(titles.values(), key=lambda t: (len(t[0]), t[0]))[:limit]
+        return [{'text': text, 'kind': kind} for text, kind in best]
+
+
+# ─────────────────────────────────────────────────────────────
+#  Keep it current: collect on flush, write after commit
+# ─────────────────────────────────────────────────────────────
+
+def _before_flush(sess, flush_context, instances):
+    # ON DELETE CASCADE removes a crop's ledger rows without the session
+    # seeing them; note their documents while the rows still exist.
+    from models import Crop, Expense, Labour
+
+    crop_ids = [obj.id for obj in sess.deleted if isinstance(obj, Crop)]
+    if not crop_ids:
+        return
+    pending = sess.info.setdefault('search_docs', {})
+    with sess.no_autoflush:
+        for kind, model in (('expense', Expense), ('labour', Labour)):
+            for ref_id in sess.scalars(select(model.id).where(model.crop_id.in_(crop_ids))):
+                pending[(kind, ref_id)] = None
+
+
+def _after_flush(sess, flush_context):
+    pending = sess.info.setdefault('search_docs', {})
+    for obj in (*sess.new, *sess.dirty):
+        doc = document(obj)
+        if doc is not None:
+            pending[doc[:2]] = doc
+    for obj in sess.deleted:
+        doc = document(obj)
+        if doc is not None:
+            pending[doc[:2]] = None
+
+
+def _after_commit(sess):
+    docs = sess.info.pop('search_docs', None)
+    if docs and has_app_context():
+        index = current_app.extensions.get('search')
+        if index is not None:
+            index.apply(docs)
+
+
+def _after_rollback(sess):
+    sess.info.pop('search_docs', None)
+
+
+def refresh(s, model, *criteria):
+    """Re-index the rows of model matching criteria, e.g. after Core inserts."""
+    index = current_app.extensions.get('search')
+    if index is None:
+        return
+    docs = {}
+    for obj in s.scalars(select(model).where(*criteria)):
+        doc = document(obj)
+        docs[doc[:2]] = doc
+    index.apply(docs)
+
+
+def init_search(app):
+    app.extensions['search'] = SearchIndex(app.config['SEARCH_INDEX_PATH'])
+    for name, fn in (('before_flush', _before_flush), ('after_flush', _after_flush),
+                     ('after_commit', _after_commit), ('after_rollback', _after_rollback)):
+        if not event.contains(Session, name, fn):
+            event.listen(Session, name, fn)
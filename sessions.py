@@ -0,0 +1,427 @@
+"""
+KrishiTrack – Server-Side Sessions
+The cookie carries only a random session id. Session data lives in a
+store with a Redis-style interface (get / setex / delete / sadd / srem /
+smembers):
+
+  • SQLiteStore  – local file, shared by all workers on the host (default)
+  • redis.Redis  – SESSION_BACKEND = 'redis', SESSION_REDIS_URL = ...
+  • MemoryFront  – per-process LRU in front of SQLiteStore. When another
+                   connection has written the database (PRAGMA
+                   data_version) it reads the keys written since it last
+                   looked from the store's change log and drops just those,
+                   so one user's login or flash leaves every other cached
+                   session in place
+
+Sessions of a user are indexed under "user:<id>", so deactivating the
+account deletes them at once (revoke_user_sessions). Expired rows are
+purged by a background thread in each process every SESSION_PURGE_SECONDS,
+or with `flask purge-sessions`.
+SESSION_BACKEND = 'cookie' keeps Flask's signed-cookie sessions.
+"""
+
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from metrics import registry
+
+log = logging.getLogger('krishitrack.sessions')
+
+SESSION_PREFIX = 'session:'
+USER_PREFIX    = 'user:'
+
+# Change log entries older than this are trimmed; a front that hasn't
+# looked for that long drops everything instead.
+CHANGE_LOG_SECONDS = 3600
+
+
+# ─────────────────────────────────────────────────────────────
+#  Stores
+# ─────────────────────────────────────────────────────────────
+
+class SQLiteStore:
+    """The subset of the redis-py client used here, on a local SQLite file."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path  = path
+        self.local = threading.local()
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS kv ('
+                         'key TEXT PRIMARY KEY, value BLOB, expires_at REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS sets ('
+                         'key TEXT, member BLOB, PRIMARY KEY (key, member))')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_kv_expires ON kv (expires_at)')
+            # Keys written or deleted, in order, for MemoryFront. REPLACE's
+            # implicit delete fires no trigger, but its insert does.
+            conn.execute('CREATE TABLE IF NOT EXISTS changes ('
+                         'seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, at REAL)')
+            for name, when, row in (('ins', 'INSERT', 'new'), ('upd', 'UPDATE', 'new'),
+                                    ('del', 'DELETE', 'old')):
+                conn.execute(f'CREATE TRIGGER IF NOT EXISTS kv_{name} AFTER {when} ON kv BEGIN '
+                             f"INSERT INTO changes (key, at) VALUES ({row}.key, "
+                             "(julianday('now') - 2440587.5) * 86400.0); END")
+        # Only ever reads PRAGMA data_version, so it sees every write.
+        self.watch      = sqlite3.connect(path, check_same_thread=False)
+        self.watch_lock = threading.Lock()
+
+    def reopen(self):
+        """Use new connections after a fork. The inherited ones are kept
+        open, not closed: closing them in the child can drop the parent's
+        file locks."""
+        self.inherited = (self.local, self.watch)
+        self.local     = threading.local()
+        self.watch     = sqlite3.connect(self.path, check_same_thread=False)
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def get(self, name):
+        row = self._conn().execute('SELECT value, expires_at FROM kv WHERE key = ?',
+                                   (name,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def setex(self, name, seconds, value):
+        if isinstance(value, str):
+            value = value.encode()
+        self._conn().execute('INSERT OR REPLACE INTO kv VALUES (?, ?, ?)',
+                             (name, value, time.time() + seconds))
+        return True
+
+    def delete(self, *names):
+        if not names:
+            return 0
+        marks = ','.join('?' * len(names))
+        conn  = self._conn()
+        with conn:
+            n  = conn.execute(f'DELETE FROM kv WHERE key IN ({marks})', names).rowcount
+            n += conn.execute(f'DELETE FROM sets WHERE key IN ({marks})', names).rowcount
+        return n
+
+    def sadd(self, name, *values):
+        # Members can outlive their session; purge() drops them later.
+        self._conn().executemany('INSERT OR IGNORE INTO sets VALUES (?, ?)',
+                                 [(name, _bytes(v)) for v in values])
+        return len(values)
+
+    def srem(self, name, *values):
+        return self._conn().executemany('DELETE FROM sets WHERE key = ? AND member = ?',
+                                        [(name, _bytes(v)) for v in values]).rowcount
+
+    def smembers(self, name):
+        return {r[0] for r in self._conn().execute(
+            'SELECT member FROM sets WHERE key = ?', (name,))}
+
+    # ── not part of the Redis interface ──
+
+    def changed(self):
+        """Token that moves whenever anyone writes the file."""
+        with self.watch_lock:
+            return self.watch.execute('PRAGMA data_version').fetchone()[0]
+
+    def changes_since(self, seq):
+        """(last seq, keys written after seq). Keys is None when the log
+        no longer reaches back to seq (trimmed by purge())."""
+        conn = self._conn()
+        rows = conn.execute('SELECT seq, key FROM changes WHERE seq > ? ORDER BY seq',
+                            (seq,)).fetchall()
+        if not rows:
+            return seq, set()
+        first = conn.execute('SELECT MIN(seq) FROM changes').fetchone()[0]
+        keys  = {key for _, key in rows} if first <= seq + 1 else None
+        return rows[-1][0], keys
+
+    def last_change(self):
+        return self._conn().execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+
+    def purge(self, batch=500):
+        """Delete up to `batch` expired keys. Returns how many went."""
+        now  = time.time()
+        conn = self._conn()
+        with conn:
+            n = conn.execute('DELETE FROM kv WHERE rowid IN (SELECT rowid FROM kv '
+                             'WHERE expires_at < ? LIMIT ?)', (now, batch)).rowcount
+            # Index entries whose session is gone (expired or logged out).
+            conn.execute('DELETE FROM sets WHERE rowid IN (SELECT s.rowid FROM sets s '
+                         "LEFT JOIN kv ON kv.key = 'session:' || CAST(s.member AS TEXT) "
+                         'WHERE kv.key IS NULL LIMIT ?)', (batch,))
+            # Fronts that fell this far behind start over (changes_since -> None).
+            conn.execute('DELETE FROM changes WHERE rowid IN (SELECT rowid FROM changes '
+                         'WHERE at < ? LIMIT ?)', (now - CHANGE_LOG_SECONDS, batch * 10))
+        return n
+
+
+def _bytes(value):
+    return value.encode() if isinstance(value, str) else value
+
+
+class MemoryFront:
+    """LRU read cache in front of a store with changed() and changes_since().
+
+    Writes go through to the store. When the store reports a write (from
+    any thread or process) the keys written since the last check are
+    dropped; the whole cache only when the change log was trimmed past
+    that point. A value read from the store is kept only if nothing was
+    written while it was being read, so a session revoked meanwhile is
+    never cached after its eviction ran.
+    """
+
+    def __init__(self, store, max_entries=2048):
+        self.store       = store
+        self.max_entries = max_entries
+        self.entries     = OrderedDict()              # name -> (value, expires_at)
+        self.seen        = store.changed()            # last changed() token
+        self.seq         = store.last_change()        # last change log entry applied
+        self.lock        = threading.Lock()
+        self.hits        = 0
+        self.misses      = 0
+
+    def _check(self):
+        """Apply the store's changes; returns the changed() token seen."""
+        token = self.store.changed()
+        if token == self.seen:
+            return token
+        with self.lock:
+            seq, keys = self.store.changes_since(self.seq)
+            if keys is None:
+                self.entries.clear()
+            else:
+                for key in keys:
+                    self.entries.pop(key, None)
+            self.seq, self.seen = seq, token
+        return token
+
+    def get(self, name):
+        token = self._check()
+        with self.lock:
+            hit = self.entries.get(name)
+            if hit is not None and hit[1] > time.time():
+                self.entries.move_to_end(name)
+                self.hits += 1
+                return hit[0]
+            self.misses += 1
+        value = self.store.get(name)
+        if value is not None:
+            self._remember(name, value, time.time() + 60, token)
+        return value
+
+    def setex(self, name, seconds, value):
+        # The write itself drops the key on the next get(); no point
+        # remembering the value here.
+        return self.store.setex(name, seconds, value)
+
+    def delete(self, *names):
+        with self.lock:
+            for name in names:
+                self.entries.pop(name, None)
+        return self.store.delete(*names)
+
+    def _remember(self, name, value, expires_at, token):
+        with self.lock:
+            # Checked under the lock _check() evicts with: either this runs
+            # first and the eviction follows, or the write is seen here.
+            if self.store.changed() != token:
+                return
+            self.entries[name] = (value, expires_at)
+            self.entries.move_to_end(name)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __getattr__(self, name):                      # sadd, srem, smembers, purge
+        return getattr(self.store, name)
+
+    def metric_lines(self):
+        return [
+            '# TYPE krishitrack_session_cache_hits_total counter',
+            f'krishitrack_session_cache_hits_total {self.hits}',
+            '# TYPE krishitrack_session_cache_misses_total counter',
+            f'krishitrack_session_cache_misses_total {self.misses}',
+            '# TYPE krishitrack_session_cache_entries gauge',
+            f'krishitrack_session_cache_entries {len(self.entries)}',
+        ]
+
+
+# ─────────────────────────────────────────────────────────────
+#  Flask session interface
+# ─────────────────────────────────────────────────────────────
+
+class ServerSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, written_at=0.0):
+        super().__init__(initial)
+        self.sid        = sid
+        self.written_at = written_at
+        self.old_sid    = None
+
+    def regenerate(self):
+        """New id for the same data (call on login against fixation)."""
+        if self.sid and self.old_sid is None:
+            self.old_sid = self.sid
+        self.sid      = None
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, config):
+        self.store       = store
+        self.lifetime    = config['SESSION_LIFETIME']
+        self.touch_after = config['SESSION_TOUCH_SECONDS']
+        self.purge_every = config['SESSION_PURGE_SECONDS']
+        self.purger_pid  = None
+        self.purger_lock = threading.Lock()
+
+    def start_purger(self):
+        """Purge expired sessions off the request path: a daemon thread per
+        process. Started on the first request, so CLI commands skip it and
+        each forked worker starts its own."""
+        if not hasattr(self.store, 'purge'):
+            self.purger_pid = os.getpid()
+            return
+        with self.purger_lock:
+            if self.purger_pid == os.getpid():
+                return
+            self.purger_pid = os.getpid()
+        threading.Thread(target=self._purge_loop, name='session-purge', daemon=True).start()
+
+    def _purge_loop(self):
+        while True:
+            time.sleep(self.purge_every)
+            try:
+                while self.store.purge():
+                    pass
+            except sqlite3.Error:
+                log.exception('Session purge failed')
+
+    def open_session(self, app, request):
+        if self.purger_pid != os.getpid():
+            self.start_purger()
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            raw = self.store.get(SESSION_PREFIX + sid)
+            if raw is not None:
+                data = self.serializer.loads(raw.decode())
+                return ServerSession(data['d'], sid, data['t'])
+        return ServerSession()
+
+    def ttl(self, app, session):
+        if session.permanent:
+            return int(app.permanent_session_lifetime.total_seconds())
+        return self.lifetime
+
+    def save_session(self, app, session, response):
+        name   = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path   = self.get_cookie_path(app)
+
+        if session.old_sid:
+            self.store.delete(SESSION_PREFIX + session.old_sid)
+
+        if not session:
+            if session.sid and session.modified:
+                self.store.delete(SESSION_PREFIX + session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        now   = time.time()
+        stale = now - session.written_at > self.touch_after
+        if not (session.modified or stale or session.sid is None):
+            return
+
+        is_new = session.sid is None
+        if is_new:
+            session.sid = secrets.token_urlsafe(32)
+        ttl = self.ttl(app, session)
+        self.store.setex(SESSION_PREFIX + session.sid, ttl,
+                         self.serializer.dumps({'d': dict(session), 't': now}))
+        if session.get('user_id') and (is_new or session.modified):
+            self.store.sadd(f"{USER_PREFIX}{session['user_id']}", session.sid)
+
+        response.set_cookie(name, session.sid,
+                            expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app),
+                            domain=domain, path=path,
+                            secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
+        response.vary.add('Cookie')
+
+
+def revocable(app):
+    """Whether deactivating a user ends their sessions. Signed-cookie
+    sessions live in the browser and stay valid until they expire."""
+    return isinstance(app.session_interface, ServerSessionInterface)
+
+
+def revoke_user_sessions(store, user_id):
+    """Log a user out everywhere. Returns the number of sessions removed."""
+    key  = f'{USER_PREFIX}{user_id}'
+    sids = [m.decode() if isinstance(m, bytes) else m for m in store.smembers(key)]
+    if sids:
+        store.delete(*(SESSION_PREFIX + s for s in sids))
+    store.delete(key)
+    return len(sids)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Revocation on deactivation
+# ─────────────────────────────────────────────────────────────
+
+@event.listens_for(Session, 'after_commit')
+def _revoke_after_commit(sess):
+    ids = sess.info.pop('revoke_users', None)
+    if not ids or not has_app_context():
+        return
+    interface = current_app.session_interface
+    if isinstance(interface, ServerSessionInterface):
+        for user_id in ids:
+            revoke_user_sessions(interface.store, user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_on_rollback(sess):
+    sess.info.pop('revoke_users', None)
+
+
+def _on_active_set(target, value, oldvalue, initiator):
+    sess = object_session(target)
+    if value is False and oldvalue is not False and sess is not None and target.id:
+        sess.info.setdefault('revoke_users', set()).add(target.id)
+
+
+def init_sessions(app):
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'cookie':
+        return
+    if backend == 'redis':
+        import redis
+        store = redis.Redis.from_url(app.config['SESSION_REDIS_URL'])
+    elif backend == 'sqlite':
+        store = MemoryFront(SQLiteStore(app.config['SESSION_SQLITE_PATH']),
+                            app.config['SESSION_MEMORY_ENTRIES'])
+        registry.collectors['sessions'] = store.metric_lines
+    else:
+        raise ValueError(f'Unknown SESSION_BACKEND {backend!r}')
+    app.session_interface = ServerSessionInterface(store, app.config)
+
+    from models import User
+    if not event.contains(User.is_active, 'set', _on_active_set):
+        event.listen(User.is_active, 'set', _on_active_set)
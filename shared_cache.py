@@ -0,0 +1,267 @@
+"""
+KrishiTrack – Host-wide Shared Cache
+Each gunicorn worker has its own fragment cache, so a cold dashboard,
+market-price page or recommendation lookup used to be rendered once per
+worker. SharedCache is a local SQLite file (WAL) that every worker on
+the host reads and writes:
+
+  • LRU        – bounded by SHARED_CACHE_MAX_ENTRIES / _MAX_BYTES; a hit
+                 refreshes the entry's last-use time at most once a minute
+  • TTL        – every entry expires after SHARED_CACHE_TTL seconds (or
+                 the ttl given to set())
+  • single-flight – get_or_compute() takes a lease row for the key before
+                 computing. Other workers asking for the same key poll for
+                 the value instead of computing it again, and other threads
+                 of the same worker wait on the computing thread's Event;
+                 a lease older than SHARED_CACHE_LEASE_SECONDS is taken
+                 over (its holder died or hung). Nothing is held while
+                 waiting, so other keys are never blocked
+
+Entry count and total size are kept in a one-row `totals` table by
+triggers, so a write checks the limits without scanning the cache.
+
+The fragment cache (fragment_cache.py) sits in front of it as a
+per-process LRU: keys carry data_version() stamps, so an entry never
+changes once written and both layers can keep it until it ages out.
+Every key is stored under a namespace – config.database_id(), the hash
+of the database URL – and the stamps carry the database's epoch
+(changes.py), so two databases pointed at one cache file, or one
+database re-created or restored, never read each other's entries.
+
+    flask clear-cache       # drop every shared entry
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from config import database_id
+from metrics import registry
+
+TOUCH_SECONDS = 60                # refresh an entry's last-use time at most this often
+WAIT_STEP     = 0.02              # seconds between polls while another worker computes
+
+
+class SharedCache:
+    """Bytes values under string keys, shared by every process on the host."""
+
+    def __init__(self, path, max_entries=8192, max_bytes=64 * 1024 * 1024,
+                 ttl=3600, lease_seconds=30, namespace=''):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path          = path
+        self.prefix        = f'{namespace}:' if namespace else ''
+        self.max_entries   = max_entries
+        self.max_bytes     = max_bytes
+        self.ttl           = ttl
+        self.lease_seconds = lease_seconds
+        self.local         = threading.local()
+        self.lock          = threading.Lock()
+        self.flights       = {}                     # key -> Event, computes in this process
+        self.hits          = 0
+        self.misses        = 0
+        self.computes      = 0
+        self.waits         = 0
+        self.evictions     = 0
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS entries ('
+                         'key TEXT PRIMARY KEY, value BLOB, size INTEGER, '
+                         'expires_at REAL, used_at REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_entries_used ON entries (used_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_entries_expires ON entries (expires_at)')
+            conn.execute('CREATE TABLE IF NOT EXISTS leases ('
+                         'key TEXT PRIMARY KEY, expires_at REAL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS totals ('
+                         'id INTEGER PRIMARY KEY CHECK (id = 1), entries INTEGER, bytes INTEGER)')
+            conn.execute('INSERT OR IGNORE INTO totals SELECT 1, COUNT(*), TOTAL(size) FROM entries')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS entries_ins AFTER INSERT ON entries BEGIN '
+                         'UPDATE totals SET entries = entries + 1, bytes = bytes + new.size; END')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS entries_del AFTER DELETE ON entries BEGIN '
+                         'UPDATE totals SET entries = entries - 1, bytes = bytes - old.size; END')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS entries_upd AFTER UPDATE OF size ON entries '
+                         'BEGIN UPDATE totals SET bytes = bytes - old.size + new.size; END')
+
+    def reopen(self):
+        """Use new connections and counters after a fork (see SQLiteStore.reopen)."""
+        self.inherited = self.local
+        self.local     = threading.local()
+        self.lock      = threading.Lock()
+        self.flights   = {}
+        self.hits = self.misses = self.computes = self.waits = self.evictions = 0
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')        # a lost entry is only a miss
+            self.local.conn = conn
+        return conn
+
+    # ── entries ──
+
+    def _read(self, key):
+        conn = self._conn()
+        row  = conn.execute('SELECT value, expires_at, used_at FROM entries WHERE key = ?',
+                            (key,)).fetchone()
+        now  = time.time()
+        if row is None or row[1] < now:
+            return None
+        if now - row[2] > TOUCH_SECONDS:
+            conn.execute('UPDATE entries SET used_at = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def get(self, key):
+        return self._get(self.prefix + key)
+
+    def _get(self, key):
+        value = self._read(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self._set(self.prefix + key, value, ttl)
+
+    def _set(self, key, value, ttl=None):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        now  = time.time()
+        conn = self._conn()
+        # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete skips
+        # the triggers that keep `totals` right.
+        conn.execute('INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE '
+                     'SET value = excluded.value, size = excluded.size, '
+                     'expires_at = excluded.expires_at, used_at = excluded.used_at',
+                     (key, value, size, now + (ttl or self.ttl), now))
+        self._evict(conn, now)
+
+    def _totals(self, conn):
+        return conn.execute('SELECT entries, bytes FROM totals').fetchone()
+
+    def _evict(self, conn, now):
+        count, total = self._totals(conn)
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        with conn:
+            gone = conn.execute('DELETE FROM entries WHERE expires_at < ?', (now,)).rowcount
+            while True:
+                count, total = self._totals(conn)
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                # Oldest tenth first, so a full cache isn't trimmed on every set().
+                batch = max(1, self.max_entries // 10, count - self.max_entries)
+                n = conn.execute('DELETE FROM entries WHERE key IN (SELECT key FROM entries '
+                                 'ORDER BY used_at LIMIT ?)', (batch,)).rowcount
+                if not n:
+                    break
+                gone += n
+        self.evictions += gone
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM entries')
+            conn.execute('DELETE FROM leases')
+
+    # ── single-flight ──
+
+    def _lease(self, key):
+        """Take the key's lease unless a live one exists. True if taken."""
+        now = time.time()
+        return self._conn().execute(
+            'INSERT INTO leases VALUES (?, ?) ON CONFLICT (key) DO UPDATE '
+            'SET expires_at = excluded.expires_at WHERE leases.expires_at < ?',
+            (key, now + self.lease_seconds, now)).rowcount == 1
+
+    def _release(self, key):
+        self._conn().execute('DELETE FROM leases WHERE key = ?', (key,))
+
+    def _compute(self, key, compute, ttl):
+        self.computes += 1
+        value = compute()
+        self._set(key, value, ttl)
+        return value
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """The cached bytes for `key`, else compute() – run by one caller on
+        the host while the others wait for its result."""
+        key   = self.prefix + key
+        value = self._get(key)
+        if value is not None:
+            return value
+        deadline = time.time() + self.lease_seconds
+
+        # One thread per process goes on; the rest wait for its Event.
+        while True:
+            with self.lock:
+                flight = self.flights.get(key)
+                if flight is None:
+                    flight = self.flights[key] = threading.Event()
+                    break
+            self.waits += 1
+            flight.wait(max(deadline - time.time(), 0))
+            value = self._read(key)
+            if value is not None:
+                return value
+            if time.time() >= deadline:
+                return self._compute(key, compute, ttl)   # holder is stuck; don't queue behind it
+
+        try:
+            # Across processes: whoever takes the lease computes, the others poll.
+            waited = False
+            while True:
+                value = self._read(key)
+                if value is not None:
+                    return value
+                if self._lease(key):
+                    break
+                if time.time() >= deadline:
+                    return self._compute(key, compute, ttl)
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                time.sleep(WAIT_STEP)
+            try:
+                return self._compute(key, compute, ttl)
+            finally:
+                self._release(key)
+        finally:
+            with self.lock:
+                self.flights.pop(key, None)
+            flight.set()
+
+    def metric_lines(self):
+        count, total = self._totals(self._conn())
+        return [
+            '# TYPE krishitrack_shared_cache_hits_total counter',
+            f'krishitrack_shared_cache_hits_total {self.hits}',
+            '# TYPE krishitrack_shared_cache_misses_total counter',
+            f'krishitrack_shared_cache_misses_total {self.misses}',
+            '# TYPE krishitrack_shared_cache_computes_total counter',
+            f'krishitrack_shared_cache_computes_total {self.computes}',
+            '# TYPE krishitrack_shared_cache_waits_total counter',
+            f'krishitrack_shared_cache_waits_total {self.waits}',
+            '# TYPE krishitrack_shared_cache_evictions_total counter',
+            f'krishitrack_shared_cache_evictions_total {self.evictions}',
+            '# TYPE krishitrack_shared_cache_entries gauge',
+            f'krishitrack_shared_cache_entries {count}',
+            '# TYPE krishitrack_shared_cache_bytes gauge',
+            f'krishitrack_shared_cache_bytes {int(total)}',
+        ]
+
+
+def init_shared_cache(app):
+    if not app.config.get('SHARED_CACHE_ENABLED', True):
+        return
+    cache = SharedCache(app.config['SHARED_CACHE_PATH'],
+                        app.config['SHARED_CACHE_MAX_ENTRIES'],
+                        app.config['SHARED_CACHE_MAX_BYTES'],
+                        app.config['SHARED_CACHE_TTL'],
+                        app.config['SHARED_CACHE_LEASE_SECONDS'],
+                        database_id(app.config))
+    app.extensions['shared_cache'] = cache
+    registry.collectors['shared_cache'] = cache.metric_lines
@@ -0,0 +1,51 @@
+// All photos for lightbox
+const allPhotos = [...document.querySelectorAll('.gallery-card')].map(card => ({
+  src    : card.querySelector('img').getAttribute('src'),
+  crop   : card.dataset.crop,
+  caption: card.dataset.caption,
+  cropId : card.dataset.cropId,
+}));
+
+let currentIdx = 0;
+let visibleCards = [...document.querySelectorAll('.gallery-card')];
+
+function openLightbox(idx) {
+  currentIdx = idx;
+  showLightboxPhoto();
+  document.getElementById('lightbox').classList.add('open');
+  document.body.style.overflow = 'hidden';
+}
+function closeLightbox() {
+  document.getElementById('lightbox').classList.remove('open');
+  document.body.style.overflow = '';
+}
+function showLightboxPhoto() {
+  if (!allPhotos.length) return;
+  currentIdx = ((currentIdx % allPhotos.length) + allPhotos.length) % allPhotos.length;
+  document.getElementById('lightboxImg').src        = allPhotos[currentIdx].src;
+  document.getElementById('lightboxCrop').textContent    = '🌿 ' + allPhotos[currentIdx].crop;
+  document.getElementById('lightboxCaption').textContent = allPhotos[currentIdx].caption;
+}
+function navLightbox(dir) { currentIdx += dir; showLightboxPhoto(); }
+
+// Filter by crop
+function filterCrop(cropId, btn) {
+  document.querySelectorAll('.filter-chip').forEach(c => c.classList.remove('active'));
+  btn.classList.add('active');
+
+  document.querySelectorAll('.gallery-card').forEach(card => {
+    if (cropId === 'all' || card.dataset.cropId === cropId) {
+      card.style.display = '';
+    } else {
+      card.style.display = 'none';
+    }
+  });
+}
+
+// Keyboard nav
+document.addEventListener('keydown', e => {
+  if (!document.getElementById('lightbox').classList.contains('open')) return;
+  if (e.key === 'ArrowRight') navLightbox(1);
+  if (e.key === 'ArrowLeft')  navLightbox(-1);
+  if (e.key === 'Escape')     closeLightbox();
+});
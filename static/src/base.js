@@ -0,0 +1,41 @@
+function toggleSidebar() {
+  document.getElementById('sidebar').classList.toggle('open');
+  document.getElementById('sidebarOverlay').classList.toggle('open');
+}
+function closeSidebar() {
+  document.getElementById('sidebar').classList.remove('open');
+  document.getElementById('sidebarOverlay').classList.remove('open');
+}
+
+// Search box suggestions (prefix autocomplete)
+let suggestTimer;
+document.querySelectorAll('input[list="searchSuggest"]').forEach(box => {
+  box.addEventListener('input', () => {
+    clearTimeout(suggestTimer);
+    if (box.value.trim().length < 2) return;
+    suggestTimer = setTimeout(async () => {
+      const res = await fetch(box.dataset.suggestUrl + '?q=' + encodeURIComponent(box.value));
+      if (!res.ok) return;
+      const list = document.getElementById('searchSuggest');
+      list.replaceChildren(...(await res.json()).map(s => {
+        const opt = document.createElement('option');
+        opt.value = s.text;
+        return opt;
+      }));
+    }, 150);
+  });
+});
+
+// Auto-dismiss flash alerts after 4.5 seconds
+setTimeout(() => {
+  document.querySelectorAll('.alert').forEach(el => {
+    el.classList.remove('show');
+    setTimeout(() => el.remove(), 300);
+  });
+}, 4500);
+
+// Values a page hands to its script: <script type="application/json" id="pageData">
+function pageData() {
+  const el = document.getElementById('pageData');
+  return el ? JSON.parse(el.textContent) : {};
+}
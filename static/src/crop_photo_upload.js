@@ -0,0 +1,158 @@
+const uploadForm  = document.getElementById('uploadForm');
+const seedingDate = new Date(uploadForm.dataset.seedingDate);
+
+function updateWeekDisplay() {
+  const takenDate = new Date(document.getElementById('takenDate').value);
+  if (isNaN(takenDate.getTime())) return;
+  const diffMs   = takenDate - seedingDate;
+  const diffDays = Math.floor(diffMs / (1000 * 60 * 60 * 24));
+  const week     = Math.max(1, Math.floor(diffDays / 7) + 1);
+  document.getElementById('weekDisplay').textContent = week;
+}
+
+// Chunked, resumable upload when the browser can do it; otherwise the
+// form posts as usual (and is limited to the per-request size).
+const canResume  = !!(window.fetch && window.Blob && Blob.prototype.slice);
+const maxBytes   = Number(canResume ? uploadForm.dataset.maxPhotoBytes : uploadForm.dataset.maxRequestBytes);
+const chunkBytes = Number(uploadForm.dataset.chunkBytes);
+const createUrl  = uploadForm.dataset.createUrl;
+
+function previewPhoto(input) {
+  if (!input.files || !input.files[0]) return;
+  const file = input.files[0];
+  if (file.size > maxBytes) {
+    alert('File is too large. Max size is ' + Math.floor(maxBytes / 1048576) + 'MB.');
+    input.value = '';
+    return;
+  }
+  const reader = new FileReader();
+  reader.onload = e => {
+    document.getElementById('previewImg').src = e.target.result;
+    document.getElementById('previewBox').style.display = 'block';
+    document.getElementById('uploadZone').style.display = 'none';
+  };
+  reader.readAsDataURL(file);
+}
+
+function clearPhoto() {
+  document.getElementById('photoInput').value = '';
+  document.getElementById('previewBox').style.display = 'none';
+  document.getElementById('uploadZone').style.display = 'block';
+}
+
+function selectStage(btn, stage) {
+  document.querySelectorAll('.stage-btn').forEach(b => b.classList.remove('selected'));
+  btn.classList.add('selected');
+  document.getElementById('growthStageInput').value = stage;
+}
+
+// Drag & drop visual feedback
+const zone = document.getElementById('uploadZone');
+zone.addEventListener('dragover',  e => { e.preventDefault(); zone.classList.add('drag-over'); });
+zone.addEventListener('dragleave', () => zone.classList.remove('drag-over'));
+zone.addEventListener('drop', e => {
+  e.preventDefault();
+  zone.classList.remove('drag-over');
+  const file = e.dataTransfer.files[0];
+  if (file) {
+    const dt = new DataTransfer();
+    dt.items.add(file);
+    document.getElementById('photoInput').files = dt.files;
+    previewPhoto(document.getElementById('photoInput'));
+  }
+});
+
+function b64(str) {
+  return btoa(unescape(encodeURIComponent(str)));
+}
+
+async function digest(blob) {
+  if (!(window.crypto && crypto.subtle)) return null;      // plain http: no checksum
+  const hash = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+  return 'sha256 ' + btoa(String.fromCharCode(...new Uint8Array(hash)));
+}
+
+function setProgress(done, total, text) {
+  document.getElementById('uploadProgress').style.display = 'flex';
+  document.getElementById('uploadBar').style.width = (100 * done / total).toFixed(1) + '%';
+  document.getElementById('uploadStatus').textContent = text;
+}
+
+async function send(url, opts, tries = 5) {
+  for (let i = 0; ; i++) {
+    try {
+      const res = await fetch(url, Object.assign({credentials: 'same-origin'}, opts));
+      if (res.status < 500 || i >= tries) return res;
+    } catch (err) {
+      if (i >= tries) throw err;
+    }
+    await new Promise(r => setTimeout(r, 1000 * 2 ** i));  // back off, then retry
+  }
+}
+
+async function resumableUpload(form, file) {
+  const key  = 'upload:' + form.dataset.cropId + ':' + [file.name, file.size, file.lastModified].join(':');
+  const sum  = await digest(file);
+  let   url  = localStorage.getItem(key);
+  let   offset = null;
+
+  if (url) {                                             // resume an earlier attempt
+    const head = await send(url, {method: 'HEAD'});
+    offset = head.ok ? parseInt(head.headers.get('Upload-Offset'), 10) : null;
+  }
+  if (offset === null) {
+    const meta = ['filename', 'taken_date', 'caption', 'growth_stage'].map(k =>
+      k + ' ' + b64(k === 'filename' ? file.name : (form.elements[k].value || ''))).join(',');
+    const headers = {'Tus-Resumable': '1.0.0', 'Upload-Length': String(file.size),
+                     'Upload-Metadata': meta};
+    if (sum) headers['Upload-Checksum'] = sum;
+    const res = await send(createUrl, {method: 'POST', headers});
+    if (res.status !== 201) throw new Error((await res.json()).error);
+    url = res.headers.get('Location');
+    offset = 0;
+    localStorage.setItem(key, url);
+  }
+
+  while (true) {
+    setProgress(offset, file.size, 'Uploading… ' + Math.floor(offset / 1024) + ' of ' +
+                Math.floor(file.size / 1024) + ' KB');
+    const chunk = file.slice(offset, offset + chunkBytes);
+    const res = await send(url, {method: 'PATCH', body: chunk, headers: {
+      'Tus-Resumable': '1.0.0', 'Upload-Offset': String(offset),
+      'Content-Type': 'application/offset+octet-stream'}});
+    if (res.status === 201) {
+      localStorage.removeItem(key);
+      return (await res.json()).next;
+    }
+    if (res.status === 204) {
+      offset = parseInt(res.headers.get('Upload-Offset'), 10);
+      continue;
+    }
+    if (res.status === 409) {                             // out of step: ask the server
+      const head = await send(url, {method: 'HEAD'});
+      offset = parseInt(head.headers.get('Upload-Offset'), 10);
+      continue;
+    }
+    localStorage.removeItem(key);
+    throw new Error((await res.json()).error || 'Upload failed.');
+  }
+}
+
+uploadForm.addEventListener('submit', async e => {
+  const form = e.target;
+  const file = document.getElementById('photoInput').files[0];
+  if (!canResume || !file) return;                       // plain form post
+  e.preventDefault();
+  const btn = document.getElementById('uploadBtn');
+  btn.disabled = true;
+  try {
+    window.location = await resumableUpload(form, file);
+  } catch (err) {
+    document.getElementById('uploadStatus').textContent =
+      (err.message || 'Upload interrupted') + ' — press Upload again to resume.';
+    btn.disabled = false;
+  }
+});
+
+// Init week display
+updateWeekDisplay();
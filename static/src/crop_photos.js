@@ -0,0 +1,48 @@
+// Build all photos array for lightbox, in page order
+const allPhotos = [...document.querySelectorAll('.photo-card')].map(card => ({
+  src    : card.querySelector('img').getAttribute('src'),
+  caption: card.dataset.caption,
+}));
+
+let currentIdx = 0;
+
+function openLightbox(idx) {
+  currentIdx = parseInt(idx) || 0;
+  showLightboxPhoto();
+  document.getElementById('lightbox').classList.add('open');
+  document.body.style.overflow = 'hidden';
+}
+
+function closeLightbox() {
+  document.getElementById('lightbox').classList.remove('open');
+  document.body.style.overflow = '';
+}
+
+function showLightboxPhoto() {
+  if (!allPhotos.length) return;
+  currentIdx = ((currentIdx % allPhotos.length) + allPhotos.length) % allPhotos.length;
+  document.getElementById('lightboxImg').src        = allPhotos[currentIdx].src;
+  document.getElementById('lightboxCaption').textContent = allPhotos[currentIdx].caption;
+}
+
+function navLightbox(dir) {
+  currentIdx += dir;
+  showLightboxPhoto();
+}
+
+// Keyboard navigation
+document.addEventListener('keydown', e => {
+  if (!document.getElementById('lightbox').classList.contains('open')) return;
+  if (e.key === 'ArrowRight') navLightbox(1);
+  if (e.key === 'ArrowLeft')  navLightbox(-1);
+  if (e.key === 'Escape')     closeLightbox();
+});
+
+// Make each photo card open lightbox with correct index
+document.querySelectorAll('.photo-card').forEach((card, i) => {
+  card.onclick = (e) => {
+    // Don't open lightbox if delete form was clicked
+    if (e.target.closest('form') || e.target.closest('button[type="submit"]')) return;
+    openLightbox(i);
+  };
+});
@@ -0,0 +1,9 @@
+const data = pageData();
+new Chart(document.getElementById('mixChart').getContext('2d'), {
+  type: 'doughnut',
+  data: {
+    labels: data.crops,
+    datasets: [{ data: data.areas }]
+  },
+  options: { responsive: true, maintainAspectRatio: false, plugins: { legend: { position: 'bottom' } } }
+});
@@ -0,0 +1,12 @@
+function submitForm() {
+  const season = document.getElementById('fSeason').value;
+  if (!season) { alert('Please select a season first.'); return; }
+  const soil  = document.getElementById('fSoil').value;
+  const water = document.getElementById('fWater').value;
+  const f = document.createElement('form');
+  f.method = 'POST'; f.action = window.location.href;
+  [['season',season],['soil_type',soil],['water_req',water]].forEach(([n,v]) => {
+    const i = document.createElement('input'); i.type='hidden'; i.name=n; i.value=v; f.appendChild(i);
+  });
+  document.body.appendChild(f); f.submit();
+}
@@ -0,0 +1,59 @@
+const data         = pageData();
+const chartLabels  = data.labels;
+const chartExpense = data.expense;
+const cropNames    = data.crops;
+const cropProfits  = data.profits;
+
+// ── Monthly Expense Bar Chart ──
+const expCtx = document.getElementById('expenseChart').getContext('2d');
+new Chart(expCtx, {
+  type: 'bar',
+  data: {
+    labels: chartLabels.length ? chartLabels : ['No data'],
+    datasets: [{
+      label: 'Expenses (₹)',
+      data: chartExpense.length ? chartExpense : [0],
+      backgroundColor: 'rgba(74,124,47,.75)',
+      borderColor: 'rgba(74,124,47,1)',
+      borderWidth: 2, borderRadius: 6,
+    }]
+  },
+  options: {
+    responsive: true, maintainAspectRatio: false,
+    plugins: { legend: { display: false } },
+    scales: {
+      y: {
+        beginAtZero: true,
+        ticks: { callback: v => '₹' + v.toLocaleString() }
+      }
+    }
+  }
+});
+
+// ── Crop Profit Doughnut Chart ──
+const profCtx = document.getElementById('profitChart').getContext('2d');
+const colors  = ['#4a7c2f','#7ab648','#e8a020','#6b4226','#c8956c','#27ae60','#e74c3c'];
+
+new Chart(profCtx, {
+  type: 'doughnut',
+  data: {
+    labels: cropNames.length ? cropNames : ['No data'],
+    datasets: [{
+      data: cropProfits.length ? cropProfits.map(v => Math.max(v, 0)) : [1],
+      backgroundColor: colors,
+      borderWidth: 3, borderColor: '#fff',
+    }]
+  },
+  options: {
+    responsive: true, maintainAspectRatio: false,
+    plugins: {
+      legend: { position: 'bottom', labels: { padding: 16, font: { size: 12 } } },
+      tooltip: {
+        callbacks: {
+          label: ctx => ' ₹' + ctx.raw.toLocaleString('en-IN')
+        }
+      }
+    },
+    cutout: '65%'
+  }
+});
@@ -0,0 +1,11 @@
+const inputs = document.querySelectorAll('.cost-input');
+const total  = document.getElementById('totalDisplay');
+
+function calcTotal() {
+  let sum = 0;
+  inputs.forEach(inp => sum += parseFloat(inp.value || 0));
+  total.value = '₹' + sum.toLocaleString('en-IN', {minimumFractionDigits: 2});
+}
+
+inputs.forEach(inp => inp.addEventListener('input', calcTotal));
+calcTotal();  // Initial render
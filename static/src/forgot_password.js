@@ -0,0 +1,27 @@
+function togglePwd() {
+  const input = document.getElementById('newPwd');
+  const icon  = document.getElementById('eyeNew');
+  input.type  = input.type === 'password' ? 'text' : 'password';
+  icon.className = input.type === 'password' ? 'bi bi-eye' : 'bi bi-eye-slash';
+}
+function checkStrength(pw) {
+  const bar = document.getElementById('pwdStrength');
+  const lbl = document.getElementById('pwdStrengthLabel');
+  if (!pw) { bar.className='password-strength'; lbl.textContent=''; return; }
+  const strong = pw.length >= 8 && /[A-Z]/.test(pw) && /[0-9]/.test(pw);
+  const medium = pw.length >= 6;
+  if (strong)       { bar.className='password-strength strength-strong'; lbl.textContent='✅ Strong'; lbl.style.color='#16a34a'; }
+  else if (medium)  { bar.className='password-strength strength-medium'; lbl.textContent='⚠️ Medium'; lbl.style.color='#ca8a04'; }
+  else              { bar.className='password-strength strength-weak';   lbl.textContent='❌ Too short'; lbl.style.color='#dc2626'; }
+}
+const confPwd = document.getElementById('confPwd');
+if (confPwd) {
+  confPwd.addEventListener('input', function() {
+    const match = document.getElementById('pwdMatch');
+    if (this.value === document.getElementById('newPwd').value) {
+      match.textContent='✅ Passwords match'; match.style.color='#16a34a';
+    } else {
+      match.textContent='❌ Does not match'; match.style.color='#dc2626';
+    }
+  });
+}
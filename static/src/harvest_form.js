@@ -0,0 +1,16 @@
+const prod   = document.getElementById('prodInput');
+const price  = document.getElementById('priceInput');
+const income = document.getElementById('incomeDisplay');
+const unitS  = document.getElementById('unitSelect');
+const unitL  = document.getElementById('unitLabel');
+
+function calc() {
+  const total = (parseFloat(prod.value)||0) * (parseFloat(price.value)||0);
+  income.value = '₹' + total.toLocaleString('en-IN', {minimumFractionDigits: 2});
+  unitL.textContent = '/ ' + unitS.value;
+}
+
+prod.addEventListener('input',  calc);
+price.addEventListener('input', calc);
+unitS.addEventListener('change',calc);
+calc();
@@ -0,0 +1,12 @@
+const days = document.getElementById('daysInput');
+const pay  = document.getElementById('payInput');
+const tot  = document.getElementById('totalPay');
+
+function calc() {
+  const total = (parseFloat(days.value)||0) * (parseFloat(pay.value)||0);
+  tot.value = '₹' + total.toLocaleString('en-IN', {minimumFractionDigits: 2});
+}
+
+days.addEventListener('input', calc);
+pay.addEventListener('input', calc);
+calc();
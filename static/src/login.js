@@ -0,0 +1,64 @@
+function showTab(tab) {
+  document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
+  document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
+  document.getElementById('tab-' + tab).classList.add('active');
+  document.getElementById('tab-' + tab + '-btn').classList.add('active');
+}
+
+function togglePwd(inputId, iconId) {
+  const input = document.getElementById(inputId);
+  const icon  = document.getElementById(iconId);
+  if (input.type === 'password') {
+    input.type = 'text'; icon.className = 'bi bi-eye-slash';
+  } else {
+    input.type = 'password'; icon.className = 'bi bi-eye';
+  }
+}
+
+function checkStrength(pw) {
+  const bar = document.getElementById('pwdStrength');
+  const lbl = document.getElementById('pwdStrengthLabel');
+  if (!pw) { bar.className = 'password-strength'; lbl.textContent = ''; return; }
+  const strong = pw.length >= 8 && /[A-Z]/.test(pw) && /[0-9]/.test(pw);
+  const medium = pw.length >= 6;
+  if (strong) {
+    bar.className = 'password-strength strength-strong';
+    lbl.textContent = '✅ Strong password'; lbl.style.color = '#16a34a';
+  } else if (medium) {
+    bar.className = 'password-strength strength-medium';
+    lbl.textContent = '⚠️ Medium — add uppercase & numbers'; lbl.style.color = '#ca8a04';
+  } else {
+    bar.className = 'password-strength strength-weak';
+    lbl.textContent = '❌ Too weak — min 6 characters'; lbl.style.color = '#dc2626';
+  }
+}
+
+document.getElementById('confPwd').addEventListener('input', function() {
+  const match = document.getElementById('pwdMatch');
+  if (this.value === document.getElementById('regPwd').value) {
+    match.textContent = '✅ Passwords match'; match.style.color = '#16a34a';
+  } else {
+    match.textContent = '❌ Passwords do not match'; match.style.color = '#dc2626';
+  }
+});
+
+function validateReg() {
+  const pw   = document.getElementById('regPwd').value;
+  const conf = document.getElementById('confPwd').value;
+  if (pw !== conf) { alert('Passwords do not match.'); return false; }
+  if (pw.length < 6) { alert('Password must be at least 6 characters.'); return false; }
+  return true;
+}
+
+// If there are flash messages and they seem like registration errors, show register tab
+window.addEventListener('DOMContentLoaded', () => {
+  const url = window.location.pathname;
+  if (url.includes('register')) showTab('register');
+  // Auto-switch if flash msg from registration
+  const flash = document.getElementById('flashMessages');
+  if (flash && flash.textContent.includes('Username already') ||
+      flash && flash.textContent.includes('Email already') ||
+      flash && flash.textContent.includes('Passwords')) {
+    showTab('register');
+  }
+});
@@ -0,0 +1,272 @@
+// ── My Growing Crops Data (from Flask) ──────────────────────
+const myCrops = pageData().crops;
+
+// ── Demo Data ────────────────────────────────────────────────
+const demoData = [
+  { commodity:'Wheat',  market:'Bhopal Mandi',    state:'Madhya Pradesh', min:2100, max:2400, modal:2280, date:'Today' },
+  { commodity:'Wheat',  market:'Indore Mandi',    state:'Madhya Pradesh', min:2050, max:2350, modal:2250, date:'Today' },
+  { commodity:'Tomato', market:'Nashik APMC',     state:'Maharashtra',    min:800,  max:1600, modal:1200, date:'Today' },
+  { commodity:'Tomato', market:'Pune Market',     state:'Maharashtra',    min:900,  max:1800, modal:1400, date:'Today' },
+  { commodity:'Rice',   market:'Amritsar Mandi',  state:'Punjab',         min:2100, max:2500, modal:2300, date:'Today' },
+  { commodity:'Onion',  market:'Lasalgaon APMC',  state:'Maharashtra',    min:1200, max:2200, modal:1800, date:'Today' },
+];
+
+// ── Render Demo Cards ────────────────────────────────────────
+function renderDemo() {
+  const container = document.getElementById('demoPriceCards');
+  const grouped = {};
+  demoData.forEach(d => {
+    if (!grouped[d.commodity]) grouped[d.commodity] = [];
+    grouped[d.commodity].push(d);
+  });
+
+  let html = '';
+  Object.entries(grouped).forEach(([crop, records]) => {
+    records.forEach(r => {
+      html += buildPriceCard(r.market, r.state, '', r.commodity, r.modal, r.min, r.max, r.date, true);
+    });
+  });
+  container.innerHTML = html;
+}
+
+// ── Build a Price Card ───────────────────────────────────────
+function buildPriceCard(market, state, district, commodity, modal, min, max, date, isDemo=false) {
+  const maxPossible = 5000;
+  const pct = Math.min((modal / maxPossible) * 100, 100);
+  const demoTag = isDemo ? '<span style="font-size:.65rem;background:#fff3cd;color:#856404;padding:1px 6px;border-radius:10px;margin-left:6px;">Demo</span>' : '';
+  return `
+    <div class="col-sm-6 col-lg-4">
+      <div class="price-card">
+        <div class="location-badge">📍 ${state}${district ? ' · ' + district : ''}</div>
+        <div class="market-name">${market} ${demoTag}</div>
+        <div style="margin-top:10px;">
+          <div style="font-size:.75rem;color:var(--text-muted);text-transform:uppercase;letter-spacing:.8px;">Modal Price</div>
+          <div class="modal-price-val">₹${Number(modal).toLocaleString('en-IN')}<span style="font-size:.9rem;opacity:.6">/q</span></div>
+          <div class="price-range">Min: ₹${Number(min).toLocaleString('en-IN')} &nbsp;|&nbsp; Max: ₹${Number(max).toLocaleString('en-IN')}</div>
+        </div>
+        <div class="trend-bar"><div class="trend-fill" style="width:${pct}%"></div></div>
+        <div class="date-badge mt-2"><i class="bi bi-calendar3"></i> ${date}</div>
+      </div>
+    </div>`;
+}
+
+// ── Fetch Live Prices ────────────────────────────────────────
+async function fetchPrices() {
+  const commodity = document.getElementById('cropInput').value.trim();
+  const state     = document.getElementById('stateInput').value.trim();
+  const apiKey    = document.getElementById('apiKeyInput').value.trim();
+
+  if (!commodity) {
+    alert('Please enter a crop name to search.');
+    document.getElementById('cropInput').focus();
+    return;
+  }
+  if (!apiKey) {
+    alert('Please enter your data.gov.in API key.\nGet it free from: https://api.data.gov.in');
+    document.getElementById('apiKeyInput').focus();
+    return;
+  }
+
+  // Hide demo, show spinner
+  document.getElementById('demoSection').style.display   = 'none';
+  document.getElementById('resultsSection').style.display = 'none';
+  document.getElementById('noResults').style.display      = 'none';
+  document.getElementById('errorBox').style.display       = 'none';
+  document.getElementById('spinner').style.display        = 'block';
+
+  try {
+    const params = new URLSearchParams({ commodity, api_key: apiKey });
+    if (state) params.append('state', state);
+
+    const resp = await fetch(`/api/market-price?${params}`);
+    const data = await resp.json();
+
+    document.getElementById('spinner').style.display = 'none';
+
+    if (!resp.ok || data.error) {
+      document.getElementById('errorMsg').textContent = data.error || 'Unknown error occurred.';
+      document.getElementById('errorBox').style.display = 'block';
+      document.getElementById('demoSection').style.display = 'block';
+      return;
+    }
+
+    if (!data.records || data.records.length === 0) {
+      document.getElementById('noResultsMsg').textContent =
+        data.message || 'No prices found. Try a different crop name or remove the state filter.';
+      document.getElementById('noResults').style.display = 'block';
+      return;
+    }
+
+    renderResults(data.records, commodity);
+
+  } catch (err) {
+    document.getElementById('spinner').style.display  = 'none';
+    document.getElementById('errorMsg').textContent   = 'Network error: ' + err.message;
+    document.getElementById('errorBox').style.display = 'block';
+    document.getElementById('demoSection').style.display = 'block';
+  }
+}
+
+// ── Render Live Results ──────────────────────────────────────
+function renderResults(records, searchedCrop) {
+  // Header
+  document.getElementById('resultCropName').textContent = searchedCrop;
+  document.getElementById('fetchTime').textContent = new Date().toLocaleTimeString('en-IN');
+  document.getElementById('totalRecords').textContent = records.length;
+
+  // Calculate stats
+  const modals = records.map(r => parseFloat(r.modal_price) || 0).filter(v => v > 0);
+  const minAll  = Math.min(...records.map(r => parseFloat(r.min_price)||0));
+  const maxAll  = Math.max(...records.map(r => parseFloat(r.max_price)||0));
+  const avgModal = modals.length ? Math.round(modals.reduce((a,b)=>a+b,0) / modals.length) : 0;
+
+  // Summary cards
+  document.getElementById('priceSummary').innerHTML = `
+    <div class="price-summary-item">
+      <div class="val" style="color:var(--soil);">₹${minAll.toLocaleString('en-IN')}</div>
+      <div class="lbl">Lowest Price /q</div>
+    </div>
+    <div class="price-summary-item">
+      <div class="val" style="color:var(--green-mid);">₹${avgModal.toLocaleString('en-IN')}</div>
+      <div class="lbl">Average Modal /q</div>
+    </div>
+    <div class="price-summary-item">
+      <div class="val" style="color:#27ae60;">₹${maxAll.toLocaleString('en-IN')}</div>
+      <div class="lbl">Highest Price /q</div>
+    </div>
+  `;
+
+  // Harvest Recommendation
+  const recBox = document.getElementById('recommendation');
+  const avgPerKg = avgModal / 100; // quintal → kg
+  let recHtml = '';
+
+  if (avgModal > 0) {
+    // Find matching crop in my farm
+    const matchedCrop = myCrops.find(c =>
+      c.name.toLowerCase().includes(searchedCrop.toLowerCase()) ||
+      searchedCrop.toLowerCase().includes(c.name.toLowerCase())
+    );
+
+    if (matchedCrop && matchedCrop.investment > 0) {
+      // Estimate cost per kg (rough: investment / assumed 1000kg per acre)
+      const estProductionKg = matchedCrop.field_area * 1000;
+      const costPerKg       = matchedCrop.investment / estProductionKg;
+      const profitPerKg     = avgPerKg - costPerKg;
+      const profitPct       = ((profitPerKg / costPerKg) * 100).toFixed(1);
+
+      if (profitPerKg > 0) {
+        recHtml = `
+          <div class="rec-box rec-sell">
+            <strong>✅ Good Time to Sell!</strong> — Current avg market price is
+            <strong>₹${avgPerKg.toFixed(2)}/kg</strong>.
+            Your estimated cost per kg is <strong>₹${costPerKg.toFixed(2)}</strong>.
+            Expected profit: <strong>+₹${profitPerKg.toFixed(2)}/kg (~${profitPct}% return)</strong>
+            on your <strong>${matchedCrop.name}</strong> crop.
+          </div>`;
+      } else {
+        recHtml = `
+          <div class="rec-box rec-wait">
+            <strong>⏳ Consider Waiting</strong> — Current avg market price is
+            <strong>₹${avgPerKg.toFixed(2)}/kg</strong>, which is below your estimated cost of
+            <strong>₹${costPerKg.toFixed(2)}/kg</strong> for <strong>${matchedCrop.name}</strong>.
+            If possible, store the crop and wait for prices to rise.
+          </div>`;
+      }
+
+      // Comparison section
+      const compareBox = document.getElementById('myCropCompare');
+      const compareBody = document.getElementById('compareBody');
+      compareBox.style.display = 'block';
+      compareBody.innerHTML = `
+        <div class="crop-compare-row">
+          <div>
+            <div style="font-size:.78rem;color:var(--text-muted);font-weight:700;text-transform:uppercase;">My Crop</div>
+            <div style="font-weight:700;font-size:1rem;color:var(--green-dark);">
+              ${matchedCrop.name} ${matchedCrop.variety ? '('+matchedCrop.variety+')' : ''}
+            </div>
+            <div style="font-size:.82rem;color:var(--text-muted);">${matchedCrop.field_area} acres
+              ${matchedCrop.expected_harvest ? ' · Harvest by ' + matchedCrop.expected_harvest : ''}
+            </div>
+          </div>
+          <div class="text-center">
+            <div style="font-size:.75rem;color:var(--text-muted);">My Cost/kg (est.)</div>
+            <div style="font-family:'Lora',serif;font-size:1.3rem;font-weight:700;color:var(--soil);">
+              ₹${costPerKg.toFixed(2)}
+            </div>
+          </div>
+          <div class="compare-arrow">→</div>
+          <div class="text-center">
+            <div style="font-size:.75rem;color:var(--text-muted);">Avg Market/kg</div>
+            <div style="font-family:'Lora',serif;font-size:1.3rem;font-weight:700;color:var(--green-mid);">
+              ₹${avgPerKg.toFixed(2)}
+            </div>
+          </div>
+          <div class="compare-arrow">→</div>
+          <div class="text-center">
+            <div style="font-size:.75rem;color:var(--text-muted);">Expected Profit/kg</div>
+            <div style="font-family:'Lora',serif;font-size:1.3rem;font-weight:700;
+                        color:${profitPerKg >= 0 ? '#27ae60' : '#e74c3c'};">
+              ${profitPerKg >= 0 ? '+' : ''}₹${profitPerKg.toFixed(2)}
+            </div>
+          </div>
+        </div>
+        <div style="font-size:.76rem;color:var(--text-muted);padding:4px 8px;">
+          ⚠️ Estimated based on ₹${matchedCrop.investment.toLocaleString('en-IN')} total investment
+          over ${matchedCrop.field_area} acres (~${estProductionKg.toLocaleString()} kg assumed production).
+          Actual profit depends on real harvest quantity.
+        </div>
+      `;
+    } else {
+      recHtml = `
+        <div class="rec-box rec-neutral">
+          <strong>ℹ️ Price Info:</strong> Average modal price across ${records.length} markets is
+          <strong>₹${avgModal.toLocaleString('en-IN')}/quintal (₹${avgPerKg.toFixed(2)}/kg)</strong>.
+          Add this crop to your farm records to get a personalised harvest recommendation.
+        </div>`;
+      document.getElementById('myCropCompare').style.display = 'none';
+    }
+  }
+  recBox.innerHTML = recHtml;
+
+  // Sort by modal price descending (best market first)
+  records.sort((a, b) => parseFloat(b.modal_price||0) - parseFloat(a.modal_price||0));
+
+  // Price cards
+  let cardsHtml = '';
+  records.forEach(r => {
+    cardsHtml += buildPriceCard(
+      r.market, r.state, r.district, r.commodity,
+      r.modal_price, r.min_price, r.max_price, r.date
+    );
+  });
+  document.getElementById('priceCards').innerHTML = cardsHtml;
+
+  document.getElementById('resultsSection').style.display = 'block';
+  document.getElementById('resultsSection').scrollIntoView({ behavior: 'smooth', block: 'start' });
+}
+
+// ── Quick Search from chip click ─────────────────────────────
+function quickSearch(cropName) {
+  document.getElementById('cropInput').value = cropName;
+  // Highlight active chip
+  document.querySelectorAll('.state-chip').forEach(c => {
+    c.classList.toggle('active', c.textContent.trim().includes(cropName));
+  });
+  // Auto-search if API key is already entered
+  if (document.getElementById('apiKeyInput').value.trim()) {
+    fetchPrices();
+  } else {
+    document.getElementById('apiKeyInput').focus();
+    document.getElementById('apiKeyInput').style.borderColor = 'var(--amber)';
+    setTimeout(() => document.getElementById('apiKeyInput').style.borderColor = '', 2000);
+  }
+}
+
+// ── Enter key to search ───────────────────────────────────────
+document.getElementById('cropInput').addEventListener('keydown', e => {
+  if (e.key === 'Enter') fetchPrices();
+});
+
+// ── Init ──────────────────────────────────────────────────────
+renderDemo();
@@ -0,0 +1,40 @@
+const { labels, profits, invest, incomes } = pageData();
+
+const ctx = document.getElementById('profitBar').getContext('2d');
+new Chart(ctx, {
+  type: 'bar',
+  data: {
+    labels,
+    datasets: [
+      {
+        label: 'Investment (₹)',
+        data: invest,
+        backgroundColor: 'rgba(107,66,38,.7)',
+        borderRadius: 4,
+      },
+      {
+        label: 'Income (₹)',
+        data: incomes,
+        backgroundColor: 'rgba(232,160,32,.7)',
+        borderRadius: 4,
+      },
+      {
+        label: 'Profit/Loss (₹)',
+        data: profits,
+        backgroundColor: profits.map(v => v >= 0 ? 'rgba(39,174,96,.8)' : 'rgba(231,76,60,.8)'),
+        borderRadius: 4,
+        type: 'bar',
+      }
+    ]
+  },
+  options: {
+    responsive: true, maintainAspectRatio: false,
+    plugins: { legend: { position: 'bottom' } },
+    scales: {
+      y: {
+        beginAtZero: true,
+        ticks: { callback: v => '₹' + v.toLocaleString('en-IN') }
+      }
+    }
+  }
+});
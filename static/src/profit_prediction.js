@@ -0,0 +1,39 @@
+const data = pageData();
+const ctx  = document.getElementById('profitChart').getContext('2d');
+new Chart(ctx, {
+  type: 'bar',
+  data: {
+    labels: data.labels,
+    datasets: [
+      {
+        label: 'Income (₹)',
+        data: data.income,
+        backgroundColor: 'rgba(74,124,47,.7)',
+        borderColor: '#4a7c2f', borderWidth: 2, borderRadius: 6,
+      },
+      {
+        label: 'Cost (₹)',
+        data: data.cost,
+        backgroundColor: 'rgba(107,66,38,.6)',
+        borderColor: '#6b4226', borderWidth: 2, borderRadius: 6,
+      },
+      {
+        label: 'Profit (₹)',
+        data: data.profit,
+        backgroundColor: data.profit.map(v =>
+          v >= 0 ? 'rgba(22,163,74,.7)' : 'rgba(220,38,38,.7)'),
+        borderColor: data.profit.map(v =>
+          v >= 0 ? '#16a34a' : '#dc2626'),
+        borderWidth: 2, borderRadius: 6,
+        type: 'bar',
+      }
+    ]
+  },
+  options: {
+    responsive: true, maintainAspectRatio: false,
+    plugins: { legend: { position: 'top' } },
+    scales: {
+      y: { ticks: { callback: v => '₹' + v.toLocaleString('en-IN') }, grid: { color: 'rgba(0,0,0,.05)' } }
+    }
+  }
+});
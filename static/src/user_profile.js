@@ -0,0 +1,8 @@
+document.getElementById('confPwd').addEventListener('input', function() {
+  const m = document.getElementById('matchMsg');
+  if (this.value === document.getElementById('newPwd').value) {
+    m.textContent = '✅ Passwords match'; m.style.color = '#16a34a';
+  } else {
+    m.textContent = '❌ Does not match'; m.style.color = '#dc2626';
+  }
+});
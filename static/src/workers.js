@@ -0,0 +1,33 @@
+const data = pageData();
+new Chart(document.getElementById('demandChart').getContext('2d'), {
+  type: 'bar',
+  data: {
+    labels: data.weeks,
+    datasets: [
+      {
+        label: 'Worker-days',
+        data: data.days,
+        backgroundColor: 'rgba(26,107,138,.7)',
+        borderRadius: 4,
+      },
+      {
+        label: 'Workers',
+        data: data.workers,
+        type: 'line',
+        borderColor: 'rgba(232,160,32,1)',
+        backgroundColor: 'rgba(232,160,32,.2)',
+        yAxisID: 'y1',
+        tension: .3,
+      }
+    ]
+  },
+  options: {
+    responsive: true, maintainAspectRatio: false,
+    plugins: { legend: { position: 'bottom' } },
+    scales: {
+      y:  { beginAtZero: true, title: { display: true, text: 'Worker-days' } },
+      y1: { beginAtZero: true, position: 'right', grid: { drawOnChartArea: false },
+            title: { display: true, text: 'Workers' } }
+    }
+  }
+});
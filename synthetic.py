@@ -0,0 +1,269 @@
+"""
+KrishiTrack – Synthetic Large-Farm Data
+Bulk-generates a realistic dataset for benchmarking. The same seed
+always produces the same rows.
+
+    flask gen-synthetic --crops 10000 --expenses 1000000 --seed 42
+
+Rows are written with Core executemany inserts in chunks, with ids
+assigned up front, so millions of rows load without building ORM
+objects. Photo rows are metadata only (no image files are written).
+The Core inserts skip the ORM hooks, so generate() finishes the way the
+app would have: photo timeline index, labour rows linked to workers,
+and a rebuilt search index.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+
+from extensions import db
+
+CROPS = {
+    'Wheat':     ['GW-322', 'HD-2967', 'Lok-1', 'Sharbati'],
+    'Rice':      ['Basmati-1121', 'IR-64', 'Swarna', 'Sona Masuri'],
+    'Cotton':    ['Bt-Bollgard II', 'Suraj', 'RCH-2'],
+    'Soybean':   ['JS-335', 'JS-9560', 'NRC-37'],
+    'Tomato':    ['Hybrid-100', 'Arka Rakshak', 'Pusa Ruby'],
+    'Onion':     ['Nasik Red', 'Agrifound Dark Red', 'Bhima Super'],
+    'Potato':    ['Kufri Jyoti', 'Kufri Pukhraj', 'Kufri Chipsona'],
+    'Maize':     ['DKC-9144', 'Ganga-11', 'HQPM-1'],
+    'Groundnut': ['TG-37A', 'GG-20', 'Kadiri-6'],
+    'Sugarcane': ['Co-86032', 'CoJ-64', 'Co-0238'],
+    'Chilli':    ['Teja', 'Byadgi', 'Pusa Jwala'],
+    'Mustard':   ['Pusa Bold', 'RH-749', 'Varuna'],
+}
+# kg per acre, ₹ per kg – rough Indian averages, used for harvest rows
+YIELD_PRICE = {
+    'Wheat': (1800, 23), 'Rice': (2200, 21), 'Cotton': (800, 66),
+    'Soybean': (1000, 45), 'Tomato': (10000, 12), 'Onion': (9000, 15),
+    'Potato': (10000, 11), 'Maize': (2400, 20), 'Groundnut': (1000, 58),
+    'Sugarcane': (35000, 3), 'Chilli': (1500, 90), 'Mustard': (700, 55),
+}
+FIRST_NAMES = ['Ramesh', 'Suresh', 'Mahesh', 'Ganesh', 'Rajesh', 'Sunita', 'Anita',
+               'Lakshmi', 'Kamla', 'Vijay', 'Ajay', 'Santosh', 'Manoj', 'Raju',
+               'Geeta', 'Savita', 'Prakash', 'Dinesh', 'Mohan', 'Sita']
+LAST_NAMES  = ['Kumar', 'Yadav', 'Patel', 'Singh', 'Sharma', 'Verma', 'Jadhav',
+               'Patil', 'Reddy', 'Naik', 'Gowda', 'Chauhan', 'Meena', 'Pawar']
+WORK_TYPES  = ['Sowing', 'Weeding', 'Irrigation', 'Spraying', 'Fertilizing',
+               'Harvesting', 'Transplanting', 'Ploughing']
+STAGES      = ['Germination', 'Seedling', 'Vegetative Growth',
+               'Flowering', 'Fruiting', 'Harvest Ready', 'Post Harvest']
+
+
+def _next_id(model):
+    return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _insert_chunks(model, rows, chunk):
+    """Insert an iterator of dicts in executemany chunks. Returns count."""
+    buf, n = [], 0
+    for row in rows:
+        buf.append(row)
+        if len(buf) >= chunk:
+            db.session.execute(insert(model), buf)
+            db.session.commit()
+            n += len(buf)
+            buf = []
+    if buf:
+        db.session.execute(insert(model), buf)
+        db.session.commit()
+        n += len(buf)
+    return n
+
+
+def generate(crops=10000, expenses=1000000, labours=500000, harvests=8000,
+             photos=50000, seed=42, years=5, chunk=5000, echo=print):
+    """Append a synthetic dataset. Returns {table: rows inserted}."""
+    from models import Crop, Expense, Labour, Harvest, CropPhoto
+
+    rng     = random.Random(seed)
+    today   = date.today()
+    start   = today - timedelta(days=365 * years)
+    now     = datetime.utcnow()
+    counts  = {}
+
+    # ── Crops ─────────────────────────────────────────────────
+    first_crop = _next_id(Crop)
+    crop_meta  = []     # (id, name, area, seeding_date, harvest_date, status)
+
+    def crop_rows():
+        for i in range(crops):
+            name    = rng.choice(list(CROPS))
+            sown    = start + timedelta(days=rng.randrange(365 * years))
+            grow    = rng.randint(90, 180) if name != 'Sugarcane' else rng.randint(300, 360)
+            harvest = sown + timedelta(days=grow)
+            status  = 'Harvested' if harvest < today else 'Growing'
+            area    = round(rng.choice([0.5, 1, 1.5, 2, 2.5, 3, 4, 5, 8]) *
+                            rng.uniform(0.9, 1.1), 2)
+            crop_meta.append((first_crop + i, name, area, sown, harvest, status))
+            yield {
+                'id': first_crop + i, 'name': name, 'variety': rng.choice(CROPS[name]),
+                'field_area': area, 'seeding_date': sown, 'expected_harvest': harvest,
+                'fertilizer_details': 'DAP 50kg, Urea 30kg per acre',
+                'water_schedule': rng.choice(['Every 7 days', 'Every 10 days',
+                                              'Daily drip irrigation', 'Rain-fed']),
+                'status': status, 'notes': f'Plot {rng.randint(1, 400)}',
+                'created_at': datetime.combine(sown, datetime.min.time()),
+                'updated_at': now,
+            }
+
+    counts['crops'] = _insert_chunks(Crop, crop_rows(), chunk)
+    echo(f"   crops      {counts['crops']:>10,}")
+
+    def pick_day(meta):
+        _, _, _, sown, harvest, _ = meta
+        span = max(1, min((harvest - sown).days, (today - sown).days))
+        return sown + timedelta(days=rng.randrange(span))
+
+    # ── Expenses ──────────────────────────────────────────────
+    def expense_rows():
+        for _ in range(expenses):
+            meta = rng.choice(crop_meta)
+            area = meta[2]
+            d    = pick_day(meta)
+            yield {
+                'crop_id': meta[0], 'date': d,
+                'seeds_cost':      round(rng.choice([0, 0, 0, 1]) * area * rng.uniform(800, 4000)),
+                'fertilizer_cost': round(rng.choice([0, 1]) * area * rng.uniform(500, 2500)),
+                'equipment_cost':  round(rng.choice([0, 0, 1]) * area * rng.uniform(300, 1500)),
+                'labour_cost':     round(rng.choice([0, 1]) * area * rng.uniform(400, 2000)),
+                'other_expenses':  round(rng.choice([0, 0, 0, 1]) * rng.uniform(50, 800)),
+                'notes': '', 'created_at': now, 'updated_at': now,
+            }
+
+    counts['expenses'] = _insert_chunks(Expense, expense_rows(), chunk)
+    echo(f"   expenses   {counts['expenses']:>10,}")
+
+    # ── Labour – a stable worker pool with messy spellings ────
+    pool = [f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}' for _ in range(300)]
+
+    def labour_rows():
+        for _ in range(labours):
+            meta = rng.choice(crop_meta)
+            name = rng.choice(pool)
+            if rng.random() < 0.05:
+                name = name.lower()
+            elif rng.random() < 0.05:
+                name = f' {name}  '
+            yield {
+                'crop_id': meta[0], 'name': name, 'work_type': rng.choice(WORK_TYPES),
+                'days_worked': rng.choice([0.5, 1, 1, 2, 3, 5]),
+                'payment_per_day': rng.choice([300, 350, 400, 450, 500, 600]),
+                'date': pick_day(meta), 'notes': '',
+                'created_at': now, 'updated_at': now,
+            }
+
+    counts['labours'] = _insert_chunks(Labour, labour_rows(), chunk)
+    echo(f"   labours    {counts['labours']:>10,}")
+
+    # ── Harvests – for harvested crops only ───────────────────
+    harvested = [m for m in crop_meta if m[5] == 'Harvested']
+
+    def harvest_rows():
+        if not harvested:
+            return
+        for _ in range(harvests):
+            crop_id, name, area, _, harvest, _ = rng.choice(harvested)
+            kg_acre, price = YIELD_PRICE[name]
+            qty   = round(area * kg_acre * rng.uniform(0.6, 1.3) / rng.choice([1, 2, 3]))
+            price = round(price * rng.uniform(0.7, 1.4), 2)
+            yield {
+                'crop_id': crop_id,
+                'harvest_date': harvest + timedelta(days=rng.randint(0, 20)),
+                'total_production': qty, 'unit': 'kg', 'selling_price': price,
+                'total_income': round(qty * price, 2), 'notes': '',
+                'created_at': now, 'updated_at': now,
+            }
+
+    counts['harvests'] = _insert_chunks(Harvest, harvest_rows(), chunk)
+    echo(f"   harvests   {counts['harvests']:>10,}")
+
+    # ── Photo metadata ────────────────────────────────────────
+    def photo_rows():
+        for i in range(photos):
+            meta  = rng.choice(crop_meta)
+            taken = pick_day(meta)
+            week  = max(1, (taken - meta[3]).days // 7 + 1)
+            yield {
+                'crop_id': meta[0],
+                'photo_path': f'synthetic/crop{meta[0]}_{i}.jpg',
+                'caption': f'Week {week}', 'week_number': week,
+                'growth_stage': STAGES[min(len(STAGES) - 1, week // 4)],
+                'taken_date': taken, 'created_at': now,
+            }
+
+    counts['crop_photos'] = _insert_chunks(CropPhoto, photo_rows(), chunk)
+    echo(f"   photos     {counts['crop_photos']:>10,}")
+
+    # Core inserts bypass the flush hooks that maintain these.
+    from photo_index import rebuild
+    from workforce import assign_workers
+    rebuild(db.session.connection())
+    assign_workers(db.session.connection())
+    db.session.commit()
+
+    counts.update(seed_reference_data(rng))
+    current_app.extensions['search'].rebuild(db.session)
+    return counts
+
+
+def seed_reference_data(rng):
+    """Recommendation / fertilizer / pesticide / alert rows, if empty."""
+    from models import (CropRecommendation, FertilizerRecommendation,
+                        PesticideRecommendation, SeasonalAlert)
+
+    counts = {}
+    if not db.session.scalar(select(func.count(CropRecommendation.id))):
+        rows = []
+        for name, (kg_acre, price) in YIELD_PRICE.items():
+            for season in ('Kharif', 'Rabi', 'Summer'):
+                for soil in ('Loamy', 'Clay', 'Sandy', 'Black', 'Red'):
+                    rows.append({
+                        'crop_name': name, 'season': season, 'soil_type': soil,
+                        'water_req': rng.choice(['Low', 'Medium', 'High']),
+                        'state': 'All India',
+                        'avg_yield_acre': round(kg_acre / 100 * rng.uniform(0.8, 1.2), 1),
+                        'avg_price_quintal': round(price * 100 * rng.uniform(0.9, 1.1)),
+                        'cost_per_acre': round(rng.uniform(12000, 45000)),
+                        'duration_days': rng.randint(90, 180),
+                        'description': f'{name} suits {soil.lower()} soil in {season}.',
+                    })
+        db.session.execute(insert(CropRecommendation), rows)
+        counts['crop_recommendations'] = len(rows)
+
+    if not db.session.scalar(select(func.count(FertilizerRecommendation.id))):
+        rows = [{'crop_name': name, 'growth_stage': stage, 'fertilizer_name': fert,
+                 'quantity_acre': f'{rng.randint(10, 60)} kg', 'timing': 'As per stage',
+                 'method': rng.choice(['Broadcast', 'Drip', 'Foliar']), 'priority': p}
+                for name in CROPS
+                for stage in ('Seedling', 'Vegetative', 'Flowering', 'Fruiting')
+                for p, fert in enumerate(('Urea', 'DAP', 'MOP'), start=1)]
+        db.session.execute(insert(FertilizerRecommendation), rows)
+        counts['fertilizer_recommendations'] = len(rows)
+
+    if not db.session.scalar(select(func.count(PesticideRecommendation.id))):
+        rows = [{'crop_name': name, 'pest_name': pest, 'pest_type': kind,
+                 'pesticide_name': chem, 'quantity_acre': '200 ml',
+                 'spray_interval': 'Every 10-15 days', 'safety_days': rng.randint(3, 21)}
+                for name in CROPS
+                for pest, kind, chem in (('Aphids', 'Insect', 'Imidacloprid'),
+                                         ('Leaf Blight', 'Disease', 'Mancozeb'),
+                                         ('Mites', 'Mite', 'Dicofol'))]
+        db.session.execute(insert(PesticideRecommendation), rows)
+        counts['pesticide_recommendations'] = len(rows)
+
+    if not db.session.scalar(select(func.count(SeasonalAlert.id))):
+        rows = [{'month': m, 'crop_name': name,
+                 'activity': rng.choice(['Sow', 'Irrigate', 'Harvest', 'Spray',
+                                         'Apply Fertilizer']),
+                 'description': f'{name}: routine work for month {m}.',
+                 'priority': rng.choice(['High', 'Normal', 'Low'])}
+                for m in range(1, 13) for name in CROPS]
+        db.session.execute(insert(SeasonalAlert), rows)
+        counts['seasonal_alerts'] = len(rows)
+
+    db.session.commit()
+    return counts
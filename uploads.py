@@ -0,0 +1,184 @@
+"""
+KrishiTrack – Resumable Uploads
+tus-style chunked uploads for large growth photos over patchy rural
+connections. An upload is two files in UPLOAD_TMP_FOLDER:
+
+  <id>.json  – what the client declared (length, checksum, form fields)
+  <id>.part  – the bytes received so far; its size *is* the offset
+
+Chunks are streamed from the request straight onto the end of the
+.part file in small blocks, so a 25 MB original never sits in memory
+and an interrupted upload resumes from whatever reached the disk.
+Abandoned uploads are removed after UPLOAD_EXPIRE_SECONDS.
+"""
+
+import base64
+import fcntl
+import hashlib
+import json
+import os
+import secrets
+import time
+
+BLOCK_SIZE = 64 * 1024
+
+CHECKSUM_ALGORITHMS = {'sha1', 'sha256', 'md5'}
+
+
+class UploadError(Exception):
+    """Raised for a request the upload cannot accept; status is the HTTP code."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status  = status
+
+
+def parse_metadata(header):
+    """Decode a tus Upload-Metadata header ("key b64value,key b64value")."""
+    meta = {}
+    for pair in filter(None, (p.strip() for p in (header or '').split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            meta[key] = base64.b64decode(value).decode() if value else ''
+        except ValueError:
+            raise UploadError(f'Bad Upload-Metadata value for {key!r}.')
+    return meta
+
+
+def parse_checksum(header):
+    """'sha256 <base64 digest>' -> ('sha256', digest bytes), or None."""
+    if not header:
+        return None
+    algorithm, _, value = header.strip().partition(' ')
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadError(f'Unsupported checksum algorithm {algorithm!r}.')
+    try:
+        return algorithm, base64.b64decode(value, validate=True)
+    except ValueError:
+        raise UploadError('Bad checksum value.')
+
+
+class UploadStore:
+    def __init__(self, folder, max_bytes, expire_seconds):
+        os.makedirs(folder, exist_ok=True)
+        self.folder         = folder
+        self.max_bytes      = max_bytes
+        self.expire_seconds = expire_seconds
+
+    def _path(self, upload_id, ext):
+        if not upload_id.isalnum():
+            raise UploadError('Unknown upload.', 404)
+        return os.path.join(self.folder, f'{upload_id}.{ext}')
+
+    def create(self, length, info, checksum=None):
+        """Start an upload of `length` bytes. Returns its id."""
+        if length <= 0:
+            raise UploadError('Upload-Length must be positive.')
+        if length > self.max_bytes:
+            raise UploadError(f'File is larger than {self.max_bytes // (1024 * 1024)} MB.', 413)
+        self.purge()
+        upload_id = secrets.token_hex(16)
+        state = dict(info, length=length, created=time.time(),
+                     checksum=[checksum[0], base64.b64encode(checksum[1]).decode()]
+                              if checksum else None)
+        with open(self._path(upload_id, 'json'), 'w') as f:
+            json.dump(state, f)
+        open(self._path(upload_id, 'part'), 'wb').close()
+        return upload_id
+
+    def state(self, upload_id):
+        """The declared info plus the current 'offset'."""
+        try:
+            with open(self._path(upload_id, 'json')) as f:
+                state = json.load(f)
+            state['offset'] = os.path.getsize(self._path(upload_id, 'part'))
+        except FileNotFoundError:
+            raise UploadError('Unknown upload.', 404)
+        return state
+
+    def append(self, upload_id, offset, stream, length, checksum=None):
+        """Write `length` bytes from stream at `offset`. Returns the new offset.
+
+        A chunk cut short by a dropped connection is kept as far as it got,
+        unless it carried an Upload-Checksum: then the whole chunk is
+        dropped (as is one that fails the check) and the client resends it.
+        """
+        state = self.state(upload_id)
+        if offset != state['offset']:
+            raise UploadError('Upload-Offset does not match.', 409)
+        if offset + length > state['length']:
+            raise UploadError('Chunk runs past Upload-Length.', 413)
+
+        digest = hashlib.new(checksum[0]) if checksum else None
+        with open(self._path(upload_id, 'part'), 'ab') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Another request is writing this upload.', 423)
+            if f.tell() != offset:                    # raced with a finished PATCH
+                raise UploadError('Upload-Offset does not match.', 409)
+            remaining = length
+            while remaining:
+                block = stream.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                f.write(block)
+                if digest is not None:
+                    digest.update(block)
+                remaining -= len(block)
+            f.flush()
+            if digest is not None and (remaining or digest.digest() != checksum[1]):
+                f.truncate(offset)                    # a partial chunk cannot be verified
+                if not remaining:
+                    raise UploadError('Chunk checksum mismatch.', 460)
+            os.fsync(f.fileno())
+        return os.path.getsize(self._path(upload_id, 'part'))
+
+    def verify(self, upload_id):
+        """Hash the complete file against the checksum declared at creation."""
+        state = self.state(upload_id)
+        if not state['checksum']:
+            return True
+        algorithm, expected = state['checksum']
+        digest = hashlib.new(algorithm)
+        with open(self._path(upload_id, 'part'), 'rb') as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.digest() == base64.b64decode(expected)
+
+    def finish(self, upload_id, dest):
+        """Move the completed file to `dest` and forget the upload."""
+        os.replace(self._path(upload_id, 'part'), dest)
+        self.discard(upload_id)
+
+    def discard(self, upload_id):
+        for ext in ('part', 'json'):
+            try:
+                os.remove(self._path(upload_id, ext))
+            except FileNotFoundError:
+                pass
+
+    def purge(self):
+        """Drop uploads untouched for expire_seconds. Returns how many went."""
+        cutoff, n = time.time() - self.expire_seconds, 0
+        for name in os.listdir(self.folder):
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.json':
+                continue
+            part = os.path.join(self.folder, upload_id + '.part')
+            try:
+                touched = max(os.path.getmtime(os.path.join(self.folder, name)),
+                              os.path.getmtime(part) if os.path.exists(part) else 0)
+            except FileNotFoundError:
+                continue
+            if touched < cutoff:
+                self.discard(upload_id)
+                n += 1
+        return n
+
+
+def init_uploads(app):
+    app.extensions['uploads'] = UploadStore(app.config['UPLOAD_TMP_FOLDER'],
+                                            app.config['UPLOAD_MAX_PHOTO_BYTES'],
+                                            app.config['UPLOAD_EXPIRE_SECONDS'])
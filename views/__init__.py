@@ -0,0 +1,25 @@
+"""
+KrishiTrack – View Blueprints
+Each module defines one Blueprint named `bp` (the API modules keep their
+own names). Modules are imported on first use of the URL map, see
+register_blueprints() and KrishiTrack.create_url_adapter in app.py.
+"""
+
+from importlib import import_module
+
+BLUEPRINTS = (
+    ('views.auth',    'bp'),
+    ('views.crops',   'bp'),
+    ('views.ledger',  'bp'),
+    ('views.photos',  'bp'),
+    ('views.smart',   'bp'),
+    ('views.reports', 'bp'),
+    ('views.search',  'bp'),
+    ('views.api',     'api'),
+    ('views.sync',    'sync'),
+)
+
+
+def register_blueprints(app):
+    for module, attr in BLUEPRINTS:
+        app.register_blueprint(getattr(import_module(module), attr))
@@ -0,0 +1,376 @@
+"""
+KrishiTrack – JSON API (v1)
+Read-only endpoints for the mobile client: crops, ledger summary,
+crop recommendations, seasonal alerts, time-series analytics and batch
+yield / profit forecasts.
+
+Views are async. DB work runs in a worker thread with its own session,
+so several resources can be fetched concurrently (see /api/v1/screen).
+Every endpoint accepts ?fields=a,b,c and answers conditional GETs.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+from datetime import date, timedelta
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request, session
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from extensions import db
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+class ApiError(Exception):
+    """Raised inside a view to return a JSON error response."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status  = status
+
+
+@api.errorhandler(ApiError)
+def handle_api_error(err):
+    return jsonify({'error': err.message}), err.status
+
+
+# ─────────────────────────────────────────────────────────────
+#  Helpers
+# ─────────────────────────────────────────────────────────────
+
+def api_login_required(f):
+    """Like login_required, but answers 401 JSON instead of redirecting.
+    Works for both async and plain views."""
+    if inspect.iscoroutinefunction(f):
+        @wraps(f)
+        async def decorated(*args, **kwargs):
+            if not session.get('logged_in'):
+                return jsonify({'error': 'Authentication required.'}), 401
+            return await f(*args, **kwargs)
+    else:
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not session.get('logged_in'):
+                return jsonify({'error': 'Authentication required.'}), 401
+            return f(*args, **kwargs)
+    return decorated
+
+
+async def run_db(fn, *args):
+    """Run fn(session, *args) in a worker thread with a private Session."""
+    engine = db.engine
+
+    def work():
+        with Session(engine) as s:
+            return fn(s, *args)
+
+    return await asyncio.to_thread(work)
+
+
+def parse_fields(allowed):
+    """Return the requested ?fields= subset, or all allowed fields."""
+    raw = request.args.get('fields', '').strip()
+    if not raw:
+        return list(allowed)
+    fields  = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def pick(row, fields):
+    return {f: row[f] for f in fields}
+
+
+def json_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def conditional_json(payload):
+    """Serialise payload with an ETag and honour If-None-Match."""
+    body = json.dumps(payload, default=json_value, sort_keys=True,
+                      separators=(',', ':'))
+    resp = current_app.response_class(body, mimetype='application/json')
+    resp.set_etag(hashlib.sha1(body.encode()).hexdigest())
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp.make_conditional(request)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Loaders – run in a worker thread, return plain dicts
+# ─────────────────────────────────────────────────────────────
+
+CROP_FIELDS = ('id', 'name', 'variety', 'field_area', 'seeding_date',
+               'expected_harvest', 'status', 'image_path', 'notes',
+               'updated_at')
+
+SUMMARY_FIELDS = ('crop_id', 'name', 'status', 'investment', 'labour',
+                  'income', 'profit', 'pct')
+
+RECOMMENDATION_FIELDS = ('id', 'crop_name', 'season', 'soil_type', 'water_req',
+                         'state', 'avg_yield_acre', 'avg_price_quintal',
+                         'cost_per_acre', 'duration_days', 'description',
+                         'emoji', 'expected_profit_per_acre', 'roi_percent')
+
+ALERT_FIELDS = ('id', 'month', 'crop_name', 'activity', 'description',
+                'priority', 'emoji')
+
+
+def load_crops(s, status=None):
+    from models import Crop
+    stmt = select(Crop).order_by(Crop.created_at.desc())
+    if status:
+        stmt = stmt.where(Crop.status == status)
+    return [{f: json_value(getattr(c, f)) for f in CROP_FIELDS}
+            for c in s.scalars(stmt)]
+
+
+def load_crop(s, crop_id):
+    from models import Crop
+    crop = s.get(Crop, crop_id)
+    if crop is None:
+        return None
+    return {f: json_value(getattr(crop, f)) for f in CROP_FIELDS}
+
+
+def load_summary(s):
+    """Per-crop investment / labour / income, aggregated in SQL."""
+    from models import Crop
+    from money import crop_rows
+
+    crops   = s.execute(select(Crop.id, Crop.name, Crop.status).order_by(Crop.name)).all()
+    rows, _ = crop_rows(s, crops)
+    for r in rows:
+        crop = r.pop('crop')
+        r.update(crop_id=crop.id, name=crop.name, status=crop.status)
+    return rows
+
+
+def load_recommendations(s, season, soil, water):
+    from models import CropRecommendation
+    stmt = select(CropRecommendation)
+    if season:
+        stmt = stmt.where(CropRecommendation.season == season)
+    if soil and soil != 'Any':
+        stmt = stmt.where(CropRecommendation.soil_type == soil)
+    if water:
+        stmt = stmt.where(CropRecommendation.water_req == water)
+    # Deduplicate: keep first row per crop, best profit first
+    seen = {}
+    for r in s.scalars(stmt):
+        seen.setdefault(r.crop_name, r)
+    ranked = sorted(seen.values(),
+                    key=lambda x: x.expected_profit_per_acre, reverse=True)
+    return [{f: getattr(r, f) for f in RECOMMENDATION_FIELDS} for r in ranked]
+
+
+def load_timeseries(s, start, end, granularity, crop_ids, window):
+    from analytics import timeseries        # NumPy loads on first use
+    return timeseries(s, start, end, granularity, crop_ids, window)
+
+
+def load_alerts(s, month):
+    from models import SeasonalAlert
+    stmt = (select(SeasonalAlert)
+            .where(SeasonalAlert.month == month)
+            .order_by(SeasonalAlert.priority.desc(), SeasonalAlert.crop_name))
+    return [{f: getattr(a, f) for f in ALERT_FIELDS} for a in s.scalars(stmt)]
+
+
+# ─────────────────────────────────────────────────────────────
+#  Endpoints
+# ─────────────────────────────────────────────────────────────
+
+@api.route('/crops')
+@api_login_required
+async def crops():
+    fields = parse_fields(CROP_FIELDS)
+    rows   = await run_db(load_crops, request.args.get('status', ''))
+    return conditional_json({'crops': [pick(r, fields) for r in rows]})
+
+
+@api.route('/crops/<int:crop_id>')
+@api_login_required
+async def crop_detail(crop_id):
+    fields = parse_fields(CROP_FIELDS)
+    row    = await run_db(load_crop, crop_id)
+    if row is None:
+        raise ApiError('Crop not found.', 404)
+    return conditional_json({'crop': pick(row, fields)})
+
+
+@api.route('/ledger/summary')
+@api_login_required
+async def ledger_summary():
+    fields = parse_fields(SUMMARY_FIELDS)
+    rows   = await run_db(load_summary)
+    return conditional_json(summary_payload(rows, fields))
+
+
+@api.route('/recommendations')
+@api_login_required
+async def recommendations():
+    fields = parse_fields(RECOMMENDATION_FIELDS)
+    rows   = await run_db(load_recommendations,
+                          request.args.get('season', ''),
+                          request.args.get('soil_type', ''),
+                          request.args.get('water_req', ''))
+    return conditional_json({'recommendations': [pick(r, fields) for r in rows]})
+
+
+@api.route('/alerts')
+@api_login_required
+async def alerts():
+    fields = parse_fields(ALERT_FIELDS)
+    month  = alert_month()
+    rows   = await run_db(load_alerts, month)
+    return conditional_json({'month': month,
+                             'alerts': [pick(r, fields) for r in rows]})
+
+
+@api.route('/analytics/timeseries')
+@api_login_required
+async def analytics_timeseries():
+    """Cost, income, per-acre and cumulative cash-flow series.
+
+    ?start=&end= (ISO dates, default: the last 365 days),
+    ?granularity=day|week|month|season (default month),
+    ?crop_id= (repeatable) for per-crop series next to the farm totals,
+    ?window=N to add trailing N-bucket sums.
+    """
+    from analytics import GRANULARITIES
+
+    end   = parse_date('end',   date.today())
+    start = parse_date('start', end - timedelta(days=365))
+    if start > end:
+        raise ApiError('start must not be after end.')
+    if (end - start).days > current_app.config['ANALYTICS_MAX_DAYS']:
+        raise ApiError(f"Range is limited to {current_app.config['ANALYTICS_MAX_DAYS']} days.")
+
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        raise ApiError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+    crop_ids = sorted(set(request.args.getlist('crop_id', type=int)))
+    if len(crop_ids) > current_app.config['ANALYTICS_MAX_CROPS']:
+        raise ApiError(f"At most {current_app.config['ANALYTICS_MAX_CROPS']} crop_id values.")
+
+    window = request.args.get('window', type=int)
+    if window is not None and window < 1:
+        raise ApiError('window must be a positive integer.')
+
+    payload = await run_db(load_timeseries, start, end, granularity, crop_ids, window)
+    return conditional_json(payload)
+
+
+@api.route('/forecast', methods=['POST'])
+@api_login_required
+async def forecast_batch():
+    """Score many planting plans at once with the trained forecast model.
+
+    Body: {"items": [{"crop": "Wheat", "variety": "HD-2967", "area": 2.5,
+                      "date": "2026-11-01"}, ...]} – variety and date
+    (of sowing, default today) are optional. Unknown crops come back null.
+    """
+    import forecast
+
+    model = forecast.current()
+    if model is None:
+        raise ApiError('Forecast model not trained yet (flask train-forecast).', 503)
+    body  = request.get_json(silent=True)
+    items = body.get('items') if isinstance(body, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ApiError('Body must be {"items": [...]}.')
+    if len(items) > current_app.config['FORECAST_MAX_ITEMS']:
+        raise ApiError(f"At most {current_app.config['FORECAST_MAX_ITEMS']} items per request.")
+
+    plans, days = [], set()
+    for i, item in enumerate(items):
+        try:
+            area = float(item.get('area', 1))
+            day  = date.fromisoformat(item['date']) if item.get('date') else None
+            plans.append((str(item['crop']), str(item.get('variety') or ''), area, day))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise ApiError(f'items[{i}] needs "crop", a numeric "area" and an ISO "date".')
+        if not area > 0:
+            raise ApiError(f'items[{i}].area must be positive.')
+        days.add(day)
+
+    # One vectorised call per sowing date (usually one for the whole batch).
+    out = [None] * len(plans)
+    for day in days:
+        pos = [i for i, p in enumerate(plans) if p[3] == day]
+        for i, est in zip(pos, model.predict_many([plans[i][:3] for i in pos], day)):
+            out[i] = est
+    return jsonify({'forecasts': out})
+
+
+SCREEN_PARTS = ('crops', 'summary', 'alerts')
+
+
+@api.route('/screen')
+@api_login_required
+async def screen():
+    """Fetch several resources concurrently in one round-trip.
+
+    ?include=crops,summary,alerts selects the parts (default: all).
+    Field selection is not applied here; use the per-resource endpoints.
+    """
+    raw     = request.args.get('include', '')
+    include = [p.strip() for p in raw.split(',') if p.strip()] or list(SCREEN_PARTS)
+    unknown = [p for p in include if p not in SCREEN_PARTS]
+    if unknown:
+        raise ApiError(f"Unknown part(s): {', '.join(unknown)}")
+
+    month   = alert_month()
+    loaders = {
+        'crops':   lambda: run_db(load_crops, request.args.get('status', '')),
+        'summary': lambda: run_db(load_summary),
+        'alerts':  lambda: run_db(load_alerts, month),
+    }
+    results = await asyncio.gather(*(loaders[p]() for p in include))
+
+    payload = {}
+    for part, rows in zip(include, results):
+        if part == 'summary':
+            payload['summary'] = summary_payload(rows, SUMMARY_FIELDS)
+        else:
+            payload[part] = rows
+    return conditional_json(payload)
+
+
+def alert_month():
+    month = request.args.get('month', date.today().month, type=int)
+    if not 1 <= month <= 12:
+        raise ApiError('month must be between 1 and 12.')
+    return month
+
+
+def parse_date(name, default):
+    raw = request.args.get(name, '').strip()
+    if not raw:
+        return default
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ApiError(f'{name} must be an ISO date (YYYY-MM-DD).')
+
+
+def summary_payload(rows, fields):
+    from money import to_paise, to_rupees
+    grand_inv = sum(to_paise(r['investment']) for r in rows)
+    grand_inc = sum(to_paise(r['income'])     for r in rows)
+    return {
+        'crops':  [pick(r, fields) for r in rows],
+        'totals': {'investment': to_rupees(grand_inv),
+                   'income':     to_rupees(grand_inc),
+                   'profit':     to_rupees(grand_inc - grand_inv)},
+    }
@@ -0,0 +1,254 @@
+"""
+KrishiTrack – Auth Views
+Login, registration, password reset and the user profile page.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+from flask import (Blueprint, current_app, flash, redirect, render_template,
+                   request, session, url_for)
+from sqlalchemy import exists, select
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from extensions import db
+from helpers import login_required
+from models import User
+
+bp = Blueprint('auth', __name__)
+
+
+# ═════════════════════════════════════════════════════════
+#  THROTTLING
+# ═════════════════════════════════════════════════════════
+
+def guard():
+    return current_app.extensions['login_guard']
+
+def too_many_attempts(wait, template, **context):
+    wait = math.ceil(wait)
+    flash(f'Too many attempts. Please try again in {wait} seconds.', 'danger')
+    return render_template(template, **context), 429, {'Retry-After': str(wait)}
+
+def server_busy(template, **context):
+    flash('The server is busy. Please try again in a moment.', 'warning')
+    return render_template(template, **context), 503, {'Retry-After': '5'}
+
+# ═════════════════════════════════════════════════════════
+#  AUTH ROUTES
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if session.get('logged_in'):
+        return redirect(url_for('reports.dashboard'))
+
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip().lower()
+        password = request.form.get('password', '')
+        remember = request.form.get('remember')
+
+        wait = guard().blocked(request.remote_addr, username)
+        if wait:
+            return too_many_attempts(wait, 'login.html')
+
+        user = User.find_by_login(username)
+        ok   = False
+        if user and user.is_active:
+            with guard().hashing() as slot:
+                if not slot:
+                    return server_busy('login.html')
+                ok = user.check_password(password)
+                if ok and user.password_needs_rehash:
+                    user.set_password(password)
+
+        if ok:
+            if hasattr(session, 'regenerate'):
+                session.regenerate()
+            session['logged_in'] = True
+            session['user_id']   = user.id
+            session['username']  = user.username
+            session['full_name'] = user.full_name
+            session['user_role'] = user.role
+            if remember:
+                session.permanent = True
+                current_app.permanent_session_lifetime = timedelta(days=30)
+            user.last_login = datetime.utcnow()
+            db.session.commit()
+            flash(f'Welcome back, {user.full_name}! 🌾', 'success')
+            return redirect(url_for('reports.dashboard'))
+        elif user and not user.is_active:
+            flash('Your account is deactivated. Contact admin.', 'danger')
+        else:
+            guard().failed(username)
+            flash('Invalid username/email or password.', 'danger')
+
+    return render_template('login.html')
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if session.get('logged_in'):
+        return redirect(url_for('reports.dashboard'))
+
+    if request.method == 'POST':
+        full_name  = request.form.get('full_name', '').strip()
+        username   = request.form.get('username', '').strip().lower()
+        email      = request.form.get('email', '').strip().lower()
+        phone      = request.form.get('phone', '').strip()
+        password   = request.form.get('password', '')
+        confirm_pw = request.form.get('confirm_password', '')
+        security_q = request.form.get('security_q', '')
+        security_a = request.form.get('security_ans', '').strip().lower()
+
+        errors = []
+        if not full_name:         errors.append('Full name is required.')
+        if len(username) < 3:     errors.append('Username must be at least 3 characters.')
+        if '@' not in email:      errors.append('Enter a valid email address.')
+        if len(password) < 6:     errors.append('Password must be at least 6 characters.')
+        if password != confirm_pw: errors.append('Passwords do not match.')
+        if not security_q or not security_a:
+            errors.append('Security question and answer are required.')
+
+        form = dict(full_name=full_name, username=username, email=email, phone=phone)
+        wait = guard().blocked(request.remote_addr)
+        if wait:
+            return too_many_attempts(wait, 'register.html', **form)
+
+        is_first = False
+        if not errors:
+            # One round-trip for both uniqueness checks and "first user?"
+            name_taken, email_taken, any_user = db.session.execute(select(
+                exists().where(User.username == username),
+                exists().where(User.email == email),
+                exists().where(User.id.isnot(None)))).one()
+            if name_taken:
+                errors.append('Username already taken. Choose another.')
+            if email_taken:
+                errors.append('Email already registered. Try logging in.')
+            is_first = not any_user
+
+        if errors:
+            for e in errors:
+                flash(e, 'danger')
+            return render_template('register.html', **form)
+
+        new_user = User(
+            full_name    = full_name,
+            username     = username,
+            email        = email,
+            phone        = phone,
+            role         = 'admin' if is_first else 'farmer',
+            security_q   = security_q,
+        )
+        with guard().hashing() as slot:
+            if not slot:
+                return server_busy('register.html', **form)
+            new_user.security_ans = generate_password_hash(
+                security_a, current_app.config['PASSWORD_HASH_METHOD'])
+            new_user.set_password(password)
+        db.session.add(new_user)
+        db.session.commit()
+
+        role_msg = ' (Admin — first account)' if is_first else ''
+        flash(f'Account created{role_msg}! You can now login. 🎉', 'success')
+        return redirect(url_for('auth.login'))
+
+    return render_template('register.html')
+
+@bp.route('/forgot-password', methods=['GET', 'POST'])
+def forgot_password():
+    if session.get('logged_in'):
+        return redirect(url_for('reports.dashboard'))
+
+    step     = request.args.get('step', '1')
+    username = request.args.get('u', '')
+
+    if request.method == 'POST':
+        step = request.form.get('step', '1')
+
+        if step == '1':
+            username   = request.form.get('username', '').strip().lower()
+            security_a = request.form.get('security_ans', '').strip().lower()
+            wait = guard().blocked(request.remote_addr, username)
+            if wait:
+                return too_many_attempts(wait, 'forgot_password.html', step='1')
+            user = User.find_by_login(username)
+            ok   = False
+            if user and user.security_ans:
+                with guard().hashing() as slot:
+                    if not slot:
+                        return server_busy('forgot_password.html', step='1')
+                    ok = check_password_hash(user.security_ans, security_a)
+            if ok:
+                return redirect(url_for('auth.forgot_password', step='2', u=user.username))
+            guard().failed(username)
+            flash('Username or security answer is incorrect.', 'danger')
+            return render_template('forgot_password.html', step='1')
+
+        elif step == '2':
+            username   = request.form.get('username', '').strip().lower()
+            password   = request.form.get('password', '')
+            confirm_pw = request.form.get('confirm_password', '')
+            if len(password) < 6:
+                flash('Password must be at least 6 characters.', 'danger')
+                return render_template('forgot_password.html', step='2', username=username)
+            if password != confirm_pw:
+                flash('Passwords do not match.', 'danger')
+                return render_template('forgot_password.html', step='2', username=username)
+            wait = guard().blocked(request.remote_addr)
+            if wait:
+                return too_many_attempts(wait, 'forgot_password.html', step='2', username=username)
+            user = User.query.filter_by(username=username).first()
+            if user:
+                with guard().hashing() as slot:
+                    if not slot:
+                        return server_busy('forgot_password.html', step='2', username=username)
+                    user.set_password(password)
+                db.session.commit()
+                flash('Password reset successfully! Please login. ✅', 'success')
+                return redirect(url_for('auth.login'))
+            flash('User not found.', 'danger')
+
+    return render_template('forgot_password.html', step=step, username=username)
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Logged out successfully. See you soon! 👋', 'info')
+    return redirect(url_for('auth.login'))
+
+@bp.route('/profile', methods=['GET', 'POST'])
+@login_required
+def user_profile():
+    user = User.query.get(session.get('user_id'))
+    if not user:
+        session.clear()
+        return redirect(url_for('auth.login'))
+
+    if request.method == 'POST':
+        action = request.form.get('action')
+
+        if action == 'update_info':
+            user.full_name = request.form.get('full_name', user.full_name).strip()
+            user.phone     = request.form.get('phone', user.phone or '').strip()
+            db.session.commit()
+            session['full_name'] = user.full_name
+            flash('Profile updated successfully! ✅', 'success')
+
+        elif action == 'change_password':
+            old_pw  = request.form.get('old_password', '')
+            new_pw  = request.form.get('new_password', '')
+            conf_pw = request.form.get('confirm_password', '')
+            if not user.check_password(old_pw):
+                flash('Current password is incorrect.', 'danger')
+            elif len(new_pw) < 6:
+                flash('New password must be at least 6 characters.', 'danger')
+            elif new_pw != conf_pw:
+                flash('New passwords do not match.', 'danger')
+            else:
+                user.set_password(new_pw)
+                db.session.commit()
+                flash('Password changed successfully! ✅', 'success')
+
+    return render_template('user_profile.html', user=user)
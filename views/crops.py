@@ -0,0 +1,123 @@
+"""
+KrishiTrack – Crop Views
+Crop list, detail and add / edit / delete.
+"""
+
+import os
+from datetime import datetime
+
+from flask import (Blueprint, current_app, flash, redirect, render_template,
+                   request, url_for)
+from werkzeug.utils import secure_filename
+
+from extensions import db
+from fragment_cache import deferred
+from helpers import allowed_file, login_required
+from http_cache import not_modified
+from models import Crop
+from money import crop_rows
+
+bp = Blueprint('crops', __name__)
+
+
+# ═════════════════════════════════════════════════════════
+#  CROP ROUTES
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/crops')
+@login_required
+@not_modified('crops', 'expenses', 'harvests')
+def crops():
+    status_filter = request.args.get('status', '')
+    q             = request.args.get('q', '')
+    query         = Crop.query
+    if status_filter:
+        query = query.filter_by(status=status_filter)
+    if q:
+        # Full-text index (name, variety, notes) instead of a LIKE scan.
+        query = query.filter(Crop.id.in_(current_app.extensions['search'].ids('crop', q)))
+    # Totals from grouped queries (money.crop_rows), not each crop's
+    # expenses and harvests collections.
+    rows = deferred(lambda: crop_rows(db.session, query.order_by(Crop.created_at.desc()).all())[0])
+    return render_template('crops.html', rows=rows,
+                           status_filter=status_filter, q=q)
+
+@bp.route('/crops/add', methods=['GET', 'POST'])
+@login_required
+def crop_add():
+    if request.method == 'POST':
+        image_path = None
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and file.filename and allowed_file(file.filename):
+                filename   = secure_filename(file.filename)
+                filename   = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
+                file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+                image_path = filename
+
+        crop = Crop(
+            name               = request.form['name'],
+            variety            = request.form.get('variety', ''),
+            field_area         = float(request.form.get('field_area') or 0),
+            seeding_date       = datetime.strptime(request.form['seeding_date'], '%Y-%m-%d').date(),
+            expected_harvest   = (datetime.strptime(request.form['expected_harvest'], '%Y-%m-%d').date()
+                                  if request.form.get('expected_harvest') else None),
+            fertilizer_details = request.form.get('fertilizer_details', ''),
+            water_schedule     = request.form.get('water_schedule', ''),
+            status             = request.form.get('status', 'Growing'),
+            notes              = request.form.get('notes', ''),
+            image_path         = image_path,
+        )
+        db.session.add(crop)
+        db.session.commit()
+        flash(f'Crop "{crop.name}" added successfully! 🌱', 'success')
+        return redirect(url_for('crops.crops'))
+
+    return render_template('crop_form.html', crop=None)
+
+@bp.route('/crops/<int:crop_id>')
+@login_required
+@not_modified(per_crop=('crops', 'expenses', 'labours', 'harvests'))
+def crop_detail(crop_id):
+    crop = Crop.query.get_or_404(crop_id)
+    return render_template('crop_detail.html', crop=crop)
+
+@bp.route('/crops/<int:crop_id>/edit', methods=['GET', 'POST'])
+@login_required
+def crop_edit(crop_id):
+    crop = Crop.query.get_or_404(crop_id)
+    if request.method == 'POST':
+        crop.name               = request.form['name']
+        crop.variety            = request.form.get('variety', '')
+        crop.field_area         = float(request.form.get('field_area') or 0)
+        crop.seeding_date       = datetime.strptime(request.form['seeding_date'], '%Y-%m-%d').date()
+        crop.expected_harvest   = (datetime.strptime(request.form['expected_harvest'], '%Y-%m-%d').date()
+                                   if request.form.get('expected_harvest') else None)
+        crop.fertilizer_details = request.form.get('fertilizer_details', '')
+        crop.water_schedule     = request.form.get('water_schedule', '')
+        crop.status             = request.form.get('status', 'Growing')
+        crop.notes              = request.form.get('notes', '')
+
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and file.filename and allowed_file(file.filename):
+                filename        = secure_filename(file.filename)
+                filename        = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
+                file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+                crop.image_path = filename
+
+        db.session.commit()
+        flash(f'Crop "{crop.name}" updated! ✅', 'success')
+        return redirect(url_for('crops.crop_detail', crop_id=crop.id))
+
+    return render_template('crop_form.html', crop=crop)
+
+@bp.route('/crops/<int:crop_id>/delete', methods=['POST'])
+@login_required
+def crop_delete(crop_id):
+    crop = Crop.query.get_or_404(crop_id)
+    name = crop.name
+    db.session.delete(crop)             # one DELETE; the ledger rows cascade (writes.py)
+    db.session.commit()
+    flash(f'Crop "{name}" deleted.', 'info')
+    return redirect(url_for('crops.crops'))
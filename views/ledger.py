@@ -0,0 +1,292 @@
+"""
+KrishiTrack – Ledger Views
+Expenses, labour (with the per-worker report) and harvest records.
+"""
+
+from datetime import date, datetime, timedelta
+
+from flask import (Blueprint, current_app, flash, jsonify, redirect, render_template,
+                   request, url_for)
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+import workforce
+from extensions import db
+from helpers import login_required, page_args
+from http_cache import not_modified
+from models import Crop, Expense, Labour, Harvest, Worker
+from money import expense_paise, paise, rupees
+from writes import unit_of_work
+
+bp = Blueprint('ledger', __name__)
+
+
+# ═════════════════════════════════════════════════════════
+#  EXPENSE ROUTES
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/expenses')
+@login_required
+@not_modified('crops', per_crop=('expenses',))
+def expenses():
+    all_crops    = Crop.query.order_by(Crop.name).all()
+    crop_id      = request.args.get('crop_id', type=int)
+    query        = Expense.query
+    if crop_id:
+        query = query.filter_by(crop_id=crop_id)
+    all_expenses = query.order_by(Expense.date.desc()).all()
+    grand_total  = query.with_entities(
+        rupees(func.coalesce(func.sum(expense_paise()), 0))).scalar()
+    return render_template('expenses.html',
+                           expenses=all_expenses,
+                           crops=all_crops,
+                           selected_crop=crop_id,
+                           grand_total=grand_total)
+
+@bp.route('/expenses/add', methods=['GET', 'POST'])
+@login_required
+def expense_add():
+    crops = Crop.query.order_by(Crop.name).all()
+    if request.method == 'POST':
+        expense = Expense(
+            crop_id         = int(request.form['crop_id']),
+            date            = datetime.strptime(request.form['date'], '%Y-%m-%d').date(),
+            seeds_cost      = float(request.form.get('seeds_cost')      or 0),
+            fertilizer_cost = float(request.form.get('fertilizer_cost') or 0),
+            equipment_cost  = float(request.form.get('equipment_cost')  or 0),
+            labour_cost     = float(request.form.get('labour_cost')     or 0),
+            other_expenses  = float(request.form.get('other_expenses')  or 0),
+            notes           = request.form.get('notes', ''),
+        )
+        db.session.add(expense)
+        db.session.commit()
+        flash('Expense recorded! 💰', 'success')
+        return redirect(url_for('ledger.expenses'))
+    return render_template('expense_form.html', expense=None, crops=crops)
+
+@bp.route('/expenses/<int:exp_id>/edit', methods=['GET', 'POST'])
+@login_required
+def expense_edit(exp_id):
+    expense = Expense.query.get_or_404(exp_id)
+    crops   = Crop.query.order_by(Crop.name).all()
+    if request.method == 'POST':
+        expense.crop_id         = int(request.form['crop_id'])
+        expense.date            = datetime.strptime(request.form['date'], '%Y-%m-%d').date()
+        expense.seeds_cost      = float(request.form.get('seeds_cost')      or 0)
+        expense.fertilizer_cost = float(request.form.get('fertilizer_cost') or 0)
+        expense.equipment_cost  = float(request.form.get('equipment_cost')  or 0)
+        expense.labour_cost     = float(request.form.get('labour_cost')     or 0)
+        expense.other_expenses  = float(request.form.get('other_expenses')  or 0)
+        expense.notes           = request.form.get('notes', '')
+        db.session.commit()
+        flash('Expense updated! ✅', 'success')
+        return redirect(url_for('ledger.expenses'))
+    return render_template('expense_form.html', expense=expense, crops=crops)
+
+@bp.route('/expenses/<int:exp_id>/delete', methods=['POST'])
+@login_required
+def expense_delete(exp_id):
+    expense = Expense.query.get_or_404(exp_id)
+    db.session.delete(expense)
+    db.session.commit()
+    flash('Expense deleted.', 'info')
+    return redirect(url_for('ledger.expenses'))
+
+# ── JSON helper for live total ────────────────────────────
+@bp.route('/api/expense-total', methods=['POST'])
+@login_required
+def api_expense_total():
+    data  = request.json or {}
+    total = (float(data.get('seeds', 0)) + float(data.get('fertilizer', 0)) +
+             float(data.get('equipment', 0)) + float(data.get('labour', 0)) +
+             float(data.get('other', 0)))
+    return jsonify({'total': round(total, 2)})
+
+# ═════════════════════════════════════════════════════════
+#  LABOUR ROUTES
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/labour')
+@login_required
+@not_modified('crops', 'labours', 'workers')
+def labour():
+    crop_id   = request.args.get('crop_id', type=int)
+    worker_id = request.args.get('worker_id', type=int)
+    crops     = Crop.query.order_by(Crop.name).all()
+    query     = Labour.query
+    if crop_id:
+        query = query.filter_by(crop_id=crop_id)
+    if worker_id:
+        query = query.filter_by(worker_id=worker_id)
+
+    # Totals in SQL; only the current page of rows is loaded.
+    totals      = workforce.ledger_totals(db.session, crop_id=crop_id, worker_id=worker_id)
+    per_page    = current_app.config['LABOUR_PAGE_SIZE']
+    page, pages = page_args(totals['entries'], per_page)
+    labours     = (query.options(joinedload(Labour.crop))
+                   .order_by(Labour.date.desc(), Labour.id.desc())
+                   .offset((page - 1) * per_page).limit(per_page).all())
+    worker      = db.session.get(Worker, worker_id) if worker_id else None
+    return render_template('labour.html',
+                           labours=labours,
+                           crops=crops,
+                           selected_crop=crop_id,
+                           worker=worker,
+                           worker_crops=workforce.worker_crops(db.session, worker_id) if worker else [],
+                           total_payment=totals['payment'],
+                           total_owed=totals['owed'],
+                           total_entries=totals['entries'],
+                           page=page, pages=pages)
+
+def labour_fields(labour):
+    labour.crop_id         = int(request.form['crop_id'])
+    labour.name            = request.form['name']
+    labour.work_type       = request.form.get('work_type', '')
+    labour.days_worked     = float(request.form.get('days_worked') or 1)
+    labour.payment_per_day = float(request.form.get('payment_per_day') or 0)
+    labour.amount_paid     = (float(request.form['amount_paid'])
+                              if request.form.get('amount_paid', '').strip() else None)
+    labour.date            = datetime.strptime(request.form['date'], '%Y-%m-%d').date()
+    labour.notes           = request.form.get('notes', '')
+
+@bp.route('/labour/add', methods=['GET', 'POST'])
+@login_required
+def labour_add():
+    crops = Crop.query.order_by(Crop.name).all()
+    if request.method == 'POST':
+        labour = Labour()
+        labour_fields(labour)
+        db.session.add(labour)
+        db.session.commit()
+        flash(f'Labour "{labour.name}" added! 👷', 'success')
+        return redirect(url_for('ledger.labour'))
+    return render_template('labour_form.html', labour=None, crops=crops)
+
+@bp.route('/labour/<int:lab_id>/edit', methods=['GET', 'POST'])
+@login_required
+def labour_edit(lab_id):
+    labour = Labour.query.get_or_404(lab_id)
+    crops  = Crop.query.order_by(Crop.name).all()
+    if request.method == 'POST':
+        labour_fields(labour)
+        db.session.commit()
+        flash('Labour record updated! ✅', 'success')
+        return redirect(url_for('ledger.labour'))
+    return render_template('labour_form.html', labour=labour, crops=crops)
+
+@bp.route('/labour/<int:lab_id>/delete', methods=['POST'])
+@login_required
+def labour_delete(lab_id):
+    labour = Labour.query.get_or_404(lab_id)
+    db.session.delete(labour)
+    db.session.commit()
+    flash('Labour record deleted.', 'info')
+    return redirect(url_for('ledger.labour'))
+
+@bp.route('/labour/workers')
+@login_required
+@not_modified('crops', 'workers', per_crop=('labours',))
+def workers():
+    """Per-worker days and pay, unpaid wages and weekly labour demand."""
+    crop_id = request.args.get('crop_id', type=int)
+    end     = parse_day('end') or date.today()
+    start   = parse_day('start') or end - timedelta(days=current_app.config['LABOUR_DEMAND_DAYS'])
+    if start > end:
+        start, end = end, start
+
+    weeks = workforce.weekly_demand(db.session, start, end, crop_id)
+    return render_template('workers.html',
+                           crops=Crop.query.order_by(Crop.name).all(),
+                           selected_crop=crop_id,
+                           start=start, end=end,
+                           workers=workforce.worker_totals(db.session, start, end, crop_id),
+                           owed=workforce.outstanding(db.session, crop_id),
+                           weeks=weeks,
+                           peak=max(weeks, key=lambda w: w['days']) if weeks else None)
+
+@bp.route('/labour/workers/<int:worker_id>/settle', methods=['POST'])
+@login_required
+def worker_settle(worker_id):
+    worker = Worker.query.get_or_404(worker_id)
+    n      = workforce.settle(db.session, worker.id)
+    flash(f'{worker.name}: {n} entr{"y" if n == 1 else "ies"} marked paid. ✅', 'success')
+    return redirect(request.referrer or url_for('ledger.workers'))
+
+def parse_day(name):
+    try:
+        return date.fromisoformat(request.args.get(name, '').strip())
+    except ValueError:
+        return None
+
+# ═════════════════════════════════════════════════════════
+#  HARVEST ROUTES
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/harvest')
+@login_required
+@not_modified('crops', per_crop=('harvests',))
+def harvest():
+    crop_id          = request.args.get('crop_id', type=int)
+    crops            = Crop.query.order_by(Crop.name).all()
+    query            = Harvest.query
+    if crop_id:
+        query = query.filter_by(crop_id=crop_id)
+    harvests         = query.order_by(Harvest.harvest_date.desc()).all()
+    total_production, total_income = query.with_entities(
+        func.coalesce(func.sum(Harvest.total_production), 0.0),
+        rupees(func.coalesce(func.sum(paise(Harvest.total_income)), 0))).one()
+    return render_template('harvest.html',
+                           harvests=harvests,
+                           crops=crops,
+                           selected_crop=crop_id,
+                           total_production=total_production,
+                           total_income=total_income)
+
+@bp.route('/harvest/add', methods=['GET', 'POST'])
+@login_required
+def harvest_add():
+    crops = Crop.query.order_by(Crop.name).all()
+    if request.method == 'POST':
+        harvest = Harvest(
+            crop_id          = int(request.form['crop_id']),
+            harvest_date     = datetime.strptime(request.form['harvest_date'], '%Y-%m-%d').date(),
+            total_production = float(request.form.get('total_production') or 0),
+            unit             = request.form.get('unit', 'kg'),
+            selling_price    = float(request.form.get('selling_price') or 0),
+            notes            = request.form.get('notes', ''),
+        )
+        harvest.calculate_income()
+        with unit_of_work(db.session) as uow:
+            db.session.add(harvest)
+            uow.update(Crop, Crop.id == harvest.crop_id, Crop.status != 'Harvested',
+                       status='Harvested')
+        flash('Harvest recorded! 🌾', 'success')
+        return redirect(url_for('ledger.harvest'))
+    return render_template('harvest_form.html', harvest=None, crops=crops)
+
+@bp.route('/harvest/<int:h_id>/edit', methods=['GET', 'POST'])
+@login_required
+def harvest_edit(h_id):
+    harvest = Harvest.query.get_or_404(h_id)
+    crops   = Crop.query.order_by(Crop.name).all()
+    if request.method == 'POST':
+        harvest.crop_id          = int(request.form['crop_id'])
+        harvest.harvest_date     = datetime.strptime(request.form['harvest_date'], '%Y-%m-%d').date()
+        harvest.total_production = float(request.form.get('total_production') or 0)
+        harvest.unit             = request.form.get('unit', 'kg')
+        harvest.selling_price    = float(request.form.get('selling_price') or 0)
+        harvest.notes            = request.form.get('notes', '')
+        harvest.calculate_income()
+        db.session.commit()
+        flash('Harvest updated! ✅', 'success')
+        return redirect(url_for('ledger.harvest'))
+    return render_template('harvest_form.html', harvest=harvest, crops=crops)
+
+@bp.route('/harvest/<int:h_id>/delete', methods=['POST'])
+@login_required
+def harvest_delete(h_id):
+    harvest = Harvest.query.get_or_404(h_id)
+    db.session.delete(harvest)
+    db.session.commit()
+    flash('Harvest record deleted.', 'info')
+    return redirect(url_for('ledger.harvest'))
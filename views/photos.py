@@ -0,0 +1,303 @@
+"""
+KrishiTrack – Photo Views
+Crop growth photos and the upload file routes. Large originals go
+through the resumable upload endpoints (see uploads.py); the plain form
+POST stays as the fallback for browsers without fetch.
+"""
+
+import os
+import secrets
+from datetime import datetime, date
+
+from flask import (Blueprint, current_app, flash, jsonify, redirect, render_template,
+                   request, send_from_directory, session, url_for)
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from extensions import db
+from helpers import admin_required, allowed_file, login_required, page_args
+from models import Crop, CropPhoto, CropPhotoIndex, ImageHash
+from uploads import UploadError, parse_checksum, parse_metadata
+from views.api import api_login_required
+
+bp = Blueprint('photos', __name__)
+
+
+# ── Static File Helpers ──────────────────────────────────
+
+@bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+
+@bp.route('/static/uploads/<filename>')
+def static_upload(filename):
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+
+@bp.route('/uploads/crop_photos/<filename>')
+def serve_crop_photo(filename):
+    return send_from_directory(
+        os.path.join(current_app.config['UPLOAD_FOLDER'], 'crop_photos'), filename)
+
+# ═════════════════════════════════════════════════════════
+#  CROP GROWTH PHOTOS
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/crops/<int:crop_id>/photos')
+@login_required
+def crop_photos(crop_id):
+    crop     = Crop.query.get_or_404(crop_id)
+    index    = crop.photo_index
+    per_page = current_app.config['PHOTO_PAGE_SIZE']
+    page, pages = page_args(index.photo_count if index else 0, per_page)
+
+    # Only this page's photos; totals per week come from the index.
+    photos = (CropPhoto.query
+              .filter_by(crop_id=crop_id)
+              .order_by(CropPhoto.taken_date.asc(), CropPhoto.id.asc())
+              .offset((page - 1) * per_page)
+              .limit(per_page)
+              .all())
+    weeks = {}
+    for p in photos:
+        wk = p.week_number or 0
+        weeks.setdefault(wk, []).append(p)
+    return render_template('crop_photos.html',
+                           crop=crop, photos=photos,
+                           weeks=dict(sorted(weeks.items())),
+                           total_photos=index.photo_count if index else 0,
+                           week_counts=index.weeks if index else {},
+                           transitions=index.transitions if index else [],
+                           page=page, pages=pages)
+
+def growth_week(crop, taken_date):
+    return max(1, ((taken_date - crop.seeding_date).days // 7) + 1)
+
+def photo_filename(crop_id, original):
+    ext = original.rsplit('.', 1)[1].lower()
+    # Two uploads in the same second must not overwrite each other.
+    return f"crop{crop_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{secrets.token_hex(3)}.{ext}"
+
+def photo_dir():
+    save_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'crop_photos')
+    os.makedirs(save_dir, exist_ok=True)
+    return save_dir
+
+def parse_taken_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else date.today()
+
+def add_photo(crop, filename, fields):
+    """Create the CropPhoto row for a saved file; fields are the form values.
+    Returns (photo, near-duplicates of the file)."""
+    taken_date = parse_taken_date(fields.get('taken_date', ''))
+    photo = CropPhoto(
+        crop_id      = crop.id,
+        photo_path   = filename,
+        caption      = (fields.get('caption') or '').strip(),
+        week_number  = growth_week(crop, taken_date),
+        growth_stage = fields.get('growth_stage', ''),
+        taken_date   = taken_date,
+    )
+    db.session.add(photo)
+    db.session.commit()
+    flash(f'Photo uploaded! Week {photo.week_number} growth recorded. 📸', 'success')
+
+    from image_hash import record_upload
+    duplicates = record_upload(db.session, filename)
+    if duplicates:
+        flash(f'This photo looks like {len(duplicates)} photo(s) already uploaded '
+              f'(e.g. {duplicates[0][2]}). Admins can reclaim the space under '
+              f'Duplicate Photos.', 'warning')
+    return photo, duplicates
+
+@bp.route('/crops/<int:crop_id>/photos/upload', methods=['GET', 'POST'])
+@login_required
+def crop_photo_upload(crop_id):
+    crop = Crop.query.get_or_404(crop_id)
+
+    if request.method == 'POST':
+        if 'photo' not in request.files:
+            flash('No file selected.', 'danger')
+            return redirect(request.url)
+
+        file = request.files['photo']
+        if not file or not file.filename:
+            flash('No file selected.', 'danger')
+            return redirect(request.url)
+
+        if not allowed_file(file.filename):
+            flash('Only image files allowed (PNG, JPG, JPEG, GIF, WEBP).', 'danger')
+            return redirect(request.url)
+
+        filename = photo_filename(crop_id, file.filename)
+        file.save(os.path.join(photo_dir(), filename))
+        add_photo(crop, filename, request.form)
+        return redirect(url_for('photos.crop_photos', crop_id=crop_id))
+
+    return render_template('crop_photo_upload.html',
+                           crop=crop,
+                           suggested_week=growth_week(crop, date.today()),
+                           growth_stages=CropPhoto.GROWTH_STAGES,
+                           chunk_bytes=current_app.config['UPLOAD_CHUNK_BYTES'],
+                           max_photo_bytes=current_app.config['UPLOAD_MAX_PHOTO_BYTES'])
+
+# ── Resumable Uploads (tus-style) ────────────────────────
+#
+#   POST   /crops/<id>/photos/uploads        Upload-Length, Upload-Metadata,
+#                                            Upload-Checksum (whole file, optional)
+#   HEAD   /crops/<id>/photos/uploads/<uid>  -> Upload-Offset
+#   PATCH  /crops/<id>/photos/uploads/<uid>  Upload-Offset, Upload-Checksum (chunk)
+#   DELETE /crops/<id>/photos/uploads/<uid>
+#
+# The PATCH that brings the offset to Upload-Length verifies the file
+# and answers 201 with the new photo instead of 204.
+
+TUS_HEADERS = {'Tus-Resumable': '1.0.0', 'Cache-Control': 'no-store'}
+
+@bp.errorhandler(UploadError)
+def handle_upload_error(err):
+    return jsonify({'error': err.message}), err.status, TUS_HEADERS
+
+def upload_state(crop_id, upload_id):
+    state = current_app.extensions['uploads'].state(upload_id)
+    if state['crop_id'] != crop_id or state['user_id'] != session.get('user_id'):
+        raise UploadError('Unknown upload.', 404)
+    return state
+
+def header_int(name):
+    try:
+        return int(request.headers[name])
+    except (KeyError, ValueError):
+        raise UploadError(f'{name} header required.')
+
+@bp.route('/crops/<int:crop_id>/photos/uploads', methods=['POST'])
+@api_login_required
+def upload_create(crop_id):
+    Crop.query.get_or_404(crop_id)
+    meta = parse_metadata(request.headers.get('Upload-Metadata'))
+    if not allowed_file(meta.get('filename', '')):
+        raise UploadError('Only image files allowed (PNG, JPG, JPEG, GIF, WEBP).')
+    try:
+        parse_taken_date(meta.get('taken_date', ''))
+    except ValueError:
+        raise UploadError('taken_date must be YYYY-MM-DD.')
+
+    info = {k: meta.get(k, '') for k in ('filename', 'taken_date', 'caption', 'growth_stage')}
+    upload_id = current_app.extensions['uploads'].create(
+        header_int('Upload-Length'),
+        dict(info, crop_id=crop_id, user_id=session.get('user_id')),
+        parse_checksum(request.headers.get('Upload-Checksum')))
+    location = url_for('photos.upload_resume', crop_id=crop_id, upload_id=upload_id)
+    return '', 201, dict(TUS_HEADERS, Location=location, **{'Upload-Offset': '0'})
+
+@bp.route('/crops/<int:crop_id>/photos/uploads/<upload_id>',
+          methods=['HEAD', 'PATCH', 'DELETE'])
+@api_login_required
+def upload_resume(crop_id, upload_id):
+    uploads = current_app.extensions['uploads']
+    state   = upload_state(crop_id, upload_id)
+
+    if request.method == 'DELETE':
+        uploads.discard(upload_id)
+        return '', 204, TUS_HEADERS
+    if request.method == 'HEAD':
+        return '', 200, dict(TUS_HEADERS, **{'Upload-Offset':  str(state['offset']),
+                                             'Upload-Length': str(state['length'])})
+
+    if request.mimetype != 'application/offset+octet-stream':
+        raise UploadError('Content-Type must be application/offset+octet-stream.', 415)
+    if request.content_length is None:
+        raise UploadError('Content-Length required.', 411)
+    offset = uploads.append(upload_id, header_int('Upload-Offset'), request.stream,
+                            request.content_length,
+                            parse_checksum(request.headers.get('Upload-Checksum')))
+    if offset < state['length']:
+        return '', 204, dict(TUS_HEADERS, **{'Upload-Offset': str(offset)})
+
+    if not uploads.verify(upload_id):
+        uploads.discard(upload_id)
+        raise UploadError('File checksum mismatch; upload it again.', 460)
+    crop     = Crop.query.get_or_404(crop_id)
+    filename = photo_filename(crop_id, state['filename'])
+    uploads.finish(upload_id, os.path.join(photo_dir(), filename))
+    photo, duplicates = add_photo(crop, filename, state)
+    return jsonify({
+        'photo_id':    photo.id,
+        'week_number': photo.week_number,
+        'duplicates':  [{'distance': d, 'kind': k, 'path': p} for d, k, p in duplicates],
+        'next':        url_for('photos.crop_photos', crop_id=crop_id),
+    }), 201, dict(TUS_HEADERS, **{'Upload-Offset': str(offset)})
+
+@bp.route('/crops/<int:crop_id>/photos/<int:photo_id>/delete', methods=['POST'])
+@login_required
+def crop_photo_delete(crop_id, photo_id):
+    photo = CropPhoto.query.get_or_404(photo_id)
+    if photo.crop_id != crop_id:
+        flash('Invalid request.', 'danger')
+        return redirect(url_for('photos.crop_photos', crop_id=crop_id))
+    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'crop_photos', photo.photo_path)
+    # After a storage reclaim other photos may share the file.
+    shared = db.session.scalar(select(CropPhoto.id).where(
+        CropPhoto.photo_path == photo.photo_path, CropPhoto.id != photo.id).limit(1))
+    if shared is None:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        ImageHash.query.filter_by(kind='photo', path=photo.photo_path).delete()
+    db.session.delete(photo)
+    db.session.commit()
+    flash('Photo deleted.', 'info')
+    return redirect(url_for('photos.crop_photos', crop_id=crop_id))
+
+@bp.route('/crop-photos/all')
+@login_required
+def all_crop_photos():
+    crops        = (Crop.query
+                    .options(selectinload(Crop.photo_index))
+                    .order_by(Crop.name).all())
+    total_photos = db.session.scalar(
+        select(func.coalesce(func.sum(CropPhotoIndex.photo_count), 0)))
+    per_page     = current_app.config['GALLERY_PAGE_SIZE']
+    page, pages  = page_args(total_photos, per_page)
+    photos       = (CropPhoto.query
+                    .options(joinedload(CropPhoto.crop))
+                    .order_by(CropPhoto.taken_date.desc(), CropPhoto.id.desc())
+                    .offset((page - 1) * per_page)
+                    .limit(per_page).all())
+    latest_date  = db.session.scalar(select(func.max(CropPhoto.taken_date)))
+    return render_template('all_photos.html',
+                           crops=crops,
+                           photos=photos,
+                           total_photos=total_photos,
+                           latest_date=latest_date,
+                           page=page, pages=pages)
+
+# ── Near-Duplicate Photos (admin) ────────────────────────
+
+@bp.route('/crop-photos/duplicates', methods=['GET', 'POST'])
+@admin_required
+def photo_duplicates():
+    from image_hash import duplicate_groups, reclaim
+
+    if request.method == 'POST':
+        freed = groups = 0
+        for value in request.form.getlist('group'):
+            ids = [int(i) for i in value.split(',') if i.strip().isdigit()]
+            if len(ids) < 2:                    # nothing to reclaim in this group
+                continue
+            keep, *drop = ids
+            n = reclaim(db.session, keep, drop)
+            freed  += n
+            groups += bool(n)
+        flash(f'Reclaimed {freed / (1024 * 1024):.1f} MB from {groups} duplicate group(s).',
+              'success')
+        return redirect(url_for('photos.photo_duplicates'))
+
+    groups  = duplicate_groups(db.session)
+    ids     = [i for g in groups for i in (g['keep'], *g['drop'])]
+    hashes  = {h.id: h for h in ImageHash.query.filter(ImageHash.id.in_(ids))} if ids else {}
+    pending = db.session.scalar(
+        select(func.count(func.distinct(CropPhoto.photo_path)))
+        .where(~select(ImageHash.id).where(ImageHash.kind == 'photo',
+                                           ImageHash.path == CropPhoto.photo_path).exists()))
+    return render_template('photo_duplicates.html',
+                           groups=groups, hashes=hashes, pending=pending,
+                           total_bytes=sum(g['bytes'] for g in groups))
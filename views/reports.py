@@ -0,0 +1,159 @@
+"""
+KrishiTrack – Dashboard & Report Views
+Dashboard, profit summary, reports page and CSV exports.
+"""
+
+from datetime import date, timedelta
+
+from flask import Blueprint, render_template, request, send_file
+
+from extensions import db
+from fragment_cache import deferred
+from helpers import login_required
+from http_cache import not_modified
+from models import Crop, Expense, Labour, Harvest
+from money import crop_rows
+
+bp = Blueprint('reports', __name__)
+
+
+# ═════════════════════════════════════════════════════════
+#  DASHBOARD
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/dashboard')
+@login_required
+@not_modified('crops', 'expenses', 'labours', 'harvests')
+def dashboard():
+    # Runs only when the cached dashboard fragments miss.
+    def load():
+        all_crops     = Crop.query.order_by(Crop.id).all()
+        rows, grand   = crop_rows(db.session, all_crops)
+
+        # Monthly expenses chart (last 6 months), date-range scan
+        from analytics import timeseries
+        series = timeseries(db.session, date.today() - timedelta(days=180),
+                            date.today(), 'month')
+
+        return {
+            'total_crops':      Crop.query.count(),
+            'growing_crops':    Crop.query.filter_by(status='Growing').count(),
+            'harvested_crops':  Crop.query.filter_by(status='Harvested').count(),
+            'total_investment': grand['investment'],
+            'total_income':     grand['income'],
+            'profit_loss':      grand['profit'],
+            'recent_crops':     Crop.query.order_by(Crop.created_at.desc()).limit(5).all(),
+            'chart_labels':     series['labels'],
+            'chart_expense':    series['total']['cost'],
+            'crop_names':       [c.name for c in all_crops],
+            'crop_profits':     [r['profit'] for r in rows],
+            'upcoming':         (Crop.query
+                                 .filter(Crop.expected_harvest >= date.today(),
+                                         Crop.expected_harvest <= date.today() + timedelta(days=30),
+                                         Crop.status == 'Growing')
+                                 .order_by(Crop.expected_harvest)
+                                 .all()),
+        }
+
+    return render_template('dashboard.html', d=deferred(load))
+
+# ═════════════════════════════════════════════════════════
+#  PROFIT SUMMARY
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/profit')
+@login_required
+@not_modified('crops', 'expenses', 'labours', 'harvests')
+def profit():
+    # Runs only when the cached profit fragments miss.
+    def load():
+        summary, grand = crop_rows(db.session, Crop.query.order_by(Crop.name).all())
+        from archive import season_totals
+        return {
+            'summary':   summary,
+            'grand_inv': grand['investment'],
+            'grand_inc': grand['income'],
+            'grand_pl':  grand['profit'],
+            'archived':  season_totals(db.session),
+        }
+
+    return render_template('profit.html', p=deferred(load))
+
+# ═════════════════════════════════════════════════════════
+#  REPORTS & CSV EXPORT
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/reports')
+@login_required
+def reports():
+    crops = Crop.query.order_by(Crop.name).all()
+    return render_template('reports.html', crops=crops)
+
+def csv_download(header, rows, filename):
+    """Send rows as a CSV attachment. csv/io are only imported on export."""
+    import csv
+    import io
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return send_file(io.BytesIO(output.getvalue().encode()),
+                     mimetype='text/csv',
+                     download_name=filename,
+                     as_attachment=True)
+
+@bp.route('/reports/export/crops')
+@login_required
+def export_crops():
+    rows, _ = crop_rows(db.session, Crop.query.order_by(Crop.id).all())
+    return csv_download(
+        ['ID','Name','Variety','Area(acres)','Seeding Date',
+         'Expected Harvest','Status','Investment (₹)','Income (₹)','Profit/Loss (₹)'],
+        ([r['crop'].id, r['crop'].name, r['crop'].variety, r['crop'].field_area,
+          r['crop'].seeding_date, r['crop'].expected_harvest, r['crop'].status,
+          r['investment'], r['income'], r['profit']] for r in rows),
+        'crops_report.csv')
+
+@bp.route('/reports/export/expenses')
+@login_required
+def export_expenses():
+    month = request.args.get('month', type=int)
+    year  = request.args.get('year',  type=int)
+    query = Expense.query
+    if month and year and 1 <= month <= 12:
+        first = date(year, month, 1)
+        query = query.filter(Expense.date >= first,
+                             Expense.date <  date(year + month // 12, month % 12 + 1, 1))
+    expenses = query.order_by(Expense.date).all()
+    return csv_download(
+        ['ID','Crop','Date','Seeds','Fertilizer','Equipment',
+         'Labour','Other','Total (₹)','Notes'],
+        ([e.id, e.crop.name, e.date,
+          e.seeds_cost, e.fertilizer_cost,
+          e.equipment_cost, e.labour_cost,
+          e.other_expenses, e.total, e.notes] for e in expenses),
+        'expenses_report.csv')
+
+@bp.route('/reports/export/labour')
+@login_required
+def export_labour():
+    labours = Labour.query.order_by(Labour.date).all()
+    return csv_download(
+        ['ID','Crop','Name','Work Type','Days Worked',
+         'Pay/Day (₹)','Total Pay (₹)','Date','Notes'],
+        ([l.id, l.crop.name, l.name, l.work_type,
+          l.days_worked, l.payment_per_day,
+          l.total_payment, l.date, l.notes] for l in labours),
+        'labour_report.csv')
+
+@bp.route('/reports/export/harvest')
+@login_required
+def export_harvest():
+    harvests = Harvest.query.order_by(Harvest.harvest_date).all()
+    return csv_download(
+        ['ID','Crop','Harvest Date','Production','Unit',
+         'Price/Unit (₹)','Total Income (₹)','Notes'],
+        ([h.id, h.crop.name, h.harvest_date,
+          h.total_production, h.unit,
+          h.selling_price, h.total_income, h.notes] for h in harvests),
+        'harvest_report.csv')
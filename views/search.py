@@ -0,0 +1,62 @@
+"""
+KrishiTrack – Search Views
+Ranked full-text search across crops, ledger notes, workers and the
+advice tables, plus prefix suggestions for the search box (search.py).
+"""
+
+from flask import Blueprint, current_app, jsonify, render_template, request, url_for
+from sqlalchemy import select
+
+from extensions import db
+from helpers import login_required
+from models import Crop
+from search import KIND_LABELS
+
+bp = Blueprint('search', __name__)
+
+
+def result_url(hit):
+    kind = hit['kind']
+    if kind == 'crop':
+        return url_for('crops.crop_detail', crop_id=hit['ref_id'])
+    if kind == 'expense':
+        return url_for('ledger.expense_edit', exp_id=hit['ref_id'])
+    if kind == 'labour':
+        return url_for('ledger.labour_edit', lab_id=hit['ref_id'])
+    if kind == 'alert':
+        return url_for('smart.seasonal_alerts', month=hit['tag'])
+    return url_for({'crop_rec':   'smart.crop_recommendation',
+                    'fertilizer': 'smart.fertilizer_recommendation',
+                    'pesticide':  'smart.pesticide_recommendation'}[kind])
+
+
+@bp.route('/search')
+@login_required
+def search():
+    q        = request.args.get('q', '').strip()
+    kinds    = [k for k in request.args.getlist('kind') if k in KIND_LABELS]
+    per_page = current_app.config['SEARCH_PAGE_SIZE']
+    index    = current_app.extensions['search']
+
+    page        = max(1, request.args.get('page', 1, type=int))
+    total, hits = index.search(q, kinds, page=page, per_page=per_page)
+    pages       = max(1, -(-total // per_page))
+    if page > pages:                                  # stale link past the end
+        page        = pages
+        total, hits = index.search(q, kinds, page=page, per_page=per_page)
+
+    crop_ids   = {h['crop_id'] for h in hits if h['crop_id']}
+    crop_names = dict(db.session.execute(
+        select(Crop.id, Crop.name).where(Crop.id.in_(crop_ids))).all()) if crop_ids else {}
+    for hit in hits:
+        hit['url']  = result_url(hit)
+        hit['crop'] = crop_names.get(hit['crop_id']) if hit['kind'] != 'crop' else None
+    return render_template('search.html', q=q, kinds=kinds, kind_labels=KIND_LABELS,
+                           hits=hits, total=total, page=page, pages=pages)
+
+
+@bp.route('/search/suggest')
+@login_required
+def suggest():
+    q = request.args.get('q', '').strip()
+    return jsonify(current_app.extensions['search'].suggest(q) if len(q) >= 2 else [])
@@ -0,0 +1,390 @@
+"""
+KrishiTrack – Smart Feature Views
+Market prices, crop / fertilizer / pesticide recommendations, the crop
+mix planner, seasonal alerts, profit prediction and weather tips.
+"""
+
+import math
+from datetime import date
+
+from flask import Blueprint, current_app, render_template, request
+
+import forecast
+from extensions import db
+from fragment_cache import deferred
+from helpers import login_required
+from models import (Crop, CropRecommendation, FertilizerRecommendation,
+                    PesticideRecommendation, SeasonalAlert)
+from money import crop_rows
+
+bp = Blueprint('smart', __name__)
+
+
+# ═════════════════════════════════════════════════════════
+#  MARKET PRICES
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/market-price')
+@login_required
+def market_price():
+    all_crops     = deferred(Crop.query.order_by(Crop.name).all)
+    growing_crops = deferred(Crop.query.filter_by(status='Growing').order_by(Crop.name).all)
+    investment    = deferred(lambda: {r['crop'].id: r['investment']
+                                      for r in crop_rows(db.session, list(growing_crops))[0]})
+    return render_template('market_price.html',
+                           growing_crops=growing_crops,
+                           investment=investment,
+                           all_crops=all_crops)
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 1 — CROP RECOMMENDATION
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/crop-recommendation', methods=['GET', 'POST'])
+@login_required
+def crop_recommendation():
+    season   = request.form.get('season', '')
+    soil     = request.form.get('soil_type', '')
+    water    = request.form.get('water_req', '')
+    searched = request.method == 'POST' and bool(season)
+
+    # Runs only when the cached page fragment misses.
+    def load():
+        if not searched:
+            return []
+        q = CropRecommendation.query
+        q = q.filter_by(season=season)
+        if soil and soil != 'Any':
+            q = q.filter_by(soil_type=soil)
+        if water:
+            q = q.filter_by(water_req=water)
+        rows = q.all()
+        # Deduplicate: keep best-profit row per crop
+        seen = {}
+        for r in rows:
+            if r.crop_name not in seen:
+                seen[r.crop_name] = r
+        return sorted(seen.values(),
+                      key=lambda x: x.expected_profit_per_acre, reverse=True)
+
+    results = deferred(load)
+    return render_template('crop_recommendation.html',
+                           results=results, searched=searched,
+                           season=season, soil=soil, water=water)
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 1b — CROP MIX PLANNER
+# ═════════════════════════════════════════════════════════
+
+def optional_float(name):
+    """A non-negative, finite form number, or None when left empty."""
+    raw = request.form.get(name, '').strip()
+    if not raw:
+        return None
+    value = float(raw)
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(name)
+    return value
+
+
+@bp.route('/crop-plan', methods=['GET', 'POST'])
+@login_required
+def crop_plan():
+    import planner
+
+    form  = request.form
+    result, error = None, None
+    if request.method == 'POST' and form.get('season'):
+        try:
+            plots   = planner.parse_plots(form.get('plots', ''),
+                                          current_app.config['PLANNER_MAX_PLOTS'])
+            area    = optional_float('area') or 0.0
+            budgets = {k: optional_float(k) for k in ('water', 'labour', 'capital')}
+            share   = min(max(optional_float('max_share') or 100.0, 1.0), 100.0) / 100
+        except planner.PlanError as exc:
+            error = str(exc)
+        except ValueError:
+            error = 'Areas and budgets must be numbers.'
+        else:
+            if not plots and area <= 0:
+                error = 'Give the total area or a list of plots.'
+            else:
+                cands  = planner.candidates(db.session, form['season'], form.get('soil_type'),
+                                            forecast.current())
+                result = planner.plan(cands, area, plots, max_share=share, **budgets)
+                if not result['rows']:
+                    error = 'No crop makes a profit within these budgets.'
+
+    return render_template('crop_plan.html', form=form, result=result, error=error,
+                           water_classes=planner.WATER_ACRE_INCHES)
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 2 — FERTILIZER GUIDE
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/fertilizer', methods=['GET', 'POST'])
+@login_required
+def fertilizer_recommendation():
+    crop_name = request.form.get('crop_name', '')
+    stage     = request.form.get('growth_stage', '')
+    searched  = request.method == 'POST' and bool(crop_name)
+
+    # Each runs only when the cached page fragment misses.
+    all_crops = deferred(lambda: [r[0] for r in
+                                  db.session.query(FertilizerRecommendation.crop_name)
+                                  .distinct().order_by(FertilizerRecommendation.crop_name).all()])
+
+    def load_results():
+        if not searched:
+            return []
+        q = FertilizerRecommendation.query.filter_by(crop_name=crop_name)
+        if stage:
+            q = q.filter_by(growth_stage=stage)
+        return q.order_by(
+            FertilizerRecommendation.growth_stage,
+            FertilizerRecommendation.priority).all()
+
+    def load_stages():
+        if not crop_name:
+            return []
+        return [s[0] for s in
+                db.session.query(FertilizerRecommendation.growth_stage)
+                .filter_by(crop_name=crop_name)
+                .distinct()
+                .order_by(FertilizerRecommendation.growth_stage).all()]
+
+    results = deferred(load_results)
+    stages  = deferred(load_stages)
+
+    return render_template('fertilizer.html',
+                           results=results, searched=searched,
+                           crop_name=crop_name, stage=stage,
+                           all_crops=all_crops, stages=stages)
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 3 — PEST & DISEASE CONTROL
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/pesticide', methods=['GET', 'POST'])
+@login_required
+def pesticide_recommendation():
+    crop_name = request.form.get('crop_name', '')
+    pest_type = request.form.get('pest_type', '')
+    searched  = request.method == 'POST' and bool(crop_name)
+
+    # Each runs only when the cached page fragment misses.
+    all_crops = deferred(lambda: [r[0] for r in
+                                  db.session.query(PesticideRecommendation.crop_name)
+                                  .distinct().order_by(PesticideRecommendation.crop_name).all()])
+
+    def load_results():
+        if not searched:
+            return []
+        q = PesticideRecommendation.query.filter_by(crop_name=crop_name)
+        if pest_type:
+            q = q.filter_by(pest_type=pest_type)
+        return q.order_by(
+            PesticideRecommendation.pest_type,
+            PesticideRecommendation.pest_name).all()
+
+    results = deferred(load_results)
+
+    return render_template('pesticide.html',
+                           results=results, searched=searched,
+                           crop_name=crop_name, pest_type=pest_type,
+                           all_crops=all_crops)
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 4 — SEASONAL ALERTS
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/seasonal-alerts')
+@login_required
+def seasonal_alerts():
+    current_month = date.today().month
+    month_filter  = request.args.get('month', current_month, type=int)
+
+    # Runs only when the cached page fragment misses.
+    alerts = deferred(SeasonalAlert.query
+                      .filter_by(month=month_filter)
+                      .order_by(SeasonalAlert.priority.desc(), SeasonalAlert.crop_name)
+                      .all)
+
+    month_names = ['', 'January', 'February', 'March', 'April', 'May', 'June',
+                   'July', 'August', 'September', 'October', 'November', 'December']
+
+    return render_template('seasonal_alerts.html',
+                           alerts=alerts,
+                           month_filter=month_filter,
+                           month_names=month_names,
+                           current_month=current_month)
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 5 — PROFIT PREDICTOR
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/profit-prediction', methods=['GET', 'POST'])
+@login_required
+def profit_prediction():
+    all_crops    = Crop.query.order_by(Crop.name).all()
+    pred_crop    = request.form.get('pred_crop', '')
+    pred_variety = request.form.get('pred_variety', '').strip()
+    pred_area    = float(request.form.get('pred_area', 0) or 0)
+    prediction   = None
+    model        = forecast.current()
+
+    if request.method == 'POST' and pred_crop and pred_area > 0:
+        rec = CropRecommendation.query.filter_by(crop_name=pred_crop).first()
+        est = model.predict(pred_crop, pred_variety, pred_area) if model else None
+        if rec or est:
+            prediction = expected_profit(pred_crop, pred_area, rec, est)
+
+    # Chart data for actual crops
+    chart_labels = []
+    chart_income = []
+    chart_cost   = []
+    chart_profit = []
+    actuals      = [r for r in crop_rows(db.session, all_crops)[0]
+                    if r['investment'] > 0 or r['income'] > 0]
+    for r in actuals:
+        chart_labels.append(r['crop'].name)
+        chart_income.append(round(r['income']))
+        chart_cost.append(round(r['investment']))
+        chart_profit.append(round(r['profit']))
+
+    rec_crops = (db.session
+                 .query(CropRecommendation.crop_name, CropRecommendation.emoji)
+                 .distinct()
+                 .order_by(CropRecommendation.crop_name)
+                 .all())
+    if model:                               # crops we have grown but the guide lacks
+        known     = {forecast.key(name) for name, _ in rec_crops}
+        rec_crops = sorted([*rec_crops, *((name, '🌿') for name in model.crops()
+                                          if forecast.key(name) not in known)])
+
+    return render_template('profit_prediction.html',
+                           all_crops=all_crops,
+                           actuals=actuals,
+                           prediction=prediction,
+                           pred_crop=pred_crop,
+                           pred_variety=pred_variety,
+                           pred_area=pred_area,
+                           chart_labels=chart_labels,
+                           chart_income=chart_income,
+                           chart_cost=chart_cost,
+                           chart_profit=chart_profit,
+                           rec_crops=rec_crops)
+
+
+def expected_profit(crop, area, rec, est):
+    """Forecast from our own history where it has a value, else the crop
+    guide's averages."""
+    def pick(field, fallback):
+        value = est and est[field]
+        return value if value is not None else (fallback() if rec else 0.0)
+
+    exp_yield  = pick('yield_q', lambda: rec.avg_yield_acre * area)
+    price_q    = pick('price_q', lambda: rec.avg_price_quintal)
+    exp_cost   = pick('cost',    lambda: rec.cost_per_acre * area)
+    exp_income = exp_yield * price_q
+    exp_profit = exp_income - exp_cost
+    return {
+        'crop':     crop,
+        'variety':  est['variety'] if est else '',
+        'area':     area,
+        'yield_q':  round(exp_yield, 1),
+        'yield_sd': round(est['yield_sd'], 1) if est and est['yield_sd'] else None,
+        'income':   round(exp_income),
+        'cost':     round(exp_cost),
+        'profit':   round(exp_profit),
+        'roi':      round((exp_profit / exp_cost * 100), 1) if exp_cost else 0,
+        'emoji':    rec.emoji if rec else '🌿',
+        'duration': rec.duration_days if rec else None,
+        'price_q':  price_q,
+        'samples':  est['samples'] if est else 0,
+    }
+
+# ═════════════════════════════════════════════════════════
+#  SMART FEATURE 6 — WEATHER TIPS
+# ═════════════════════════════════════════════════════════
+
+@bp.route('/weather-suggestions')
+@login_required
+def weather_suggestions():
+    growing_crops = Crop.query.filter_by(status='Growing').all()
+    month         = date.today().month
+
+    # Seasonal weather logic — no external API needed
+    if month in [12, 1, 2]:
+        season_label, temp, humidity, rain_chance, wind = 'Winter',      18, 62, 10, 8
+    elif month in [3, 4, 5]:
+        season_label, temp, humidity, rain_chance, wind = 'Summer',      36, 35,  5, 14
+    elif month in [6, 7, 8, 9]:
+        season_label, temp, humidity, rain_chance, wind = 'Monsoon',     29, 85, 75, 18
+    else:
+        season_label, temp, humidity, rain_chance, wind = 'Post-Monsoon',26, 65, 20, 10
+
+    weather = {
+        'temp': temp, 'humidity': humidity,
+        'rain_chance': rain_chance, 'wind': wind,
+        'season': season_label,
+        'month_name': date.today().strftime('%B'),
+    }
+
+    # Per-crop suggestions
+    suggestions = []
+    for crop in growing_crops:
+        days  = (date.today() - crop.seeding_date).days
+        stage = ('Seedling'  if days < 25 else
+                 'Vegetative' if days < 60 else
+                 'Flowering'  if days < 90 else 'Maturity')
+        tips  = []
+
+        if rain_chance > 60:
+            tips.append({'icon': '🌧️', 'color': '#3b82f6',
+                'title': 'Skip Irrigation Today',
+                'msg': f'Rain expected ({rain_chance}% chance). Skip irrigation for {crop.name} to avoid waterlogging.'})
+            tips.append({'icon': '🍄', 'color': '#dc2626',
+                'title': 'Fungal Disease Risk',
+                'msg': f'High humidity ({humidity}%) + rain = fungal risk. Check {crop.name} for blight/rust symptoms.'})
+        elif temp > 35:
+            tips.append({'icon': '💧', 'color': '#f59e0b',
+                'title': 'Extra Irrigation Needed',
+                'msg': f'High temp ({temp}°C). Irrigate {crop.name} in evening to reduce evaporation.'})
+            tips.append({'icon': '☀️', 'color': '#f97316',
+                'title': 'Heat Stress Watch',
+                'msg': f'Above 35°C can damage {crop.name} at {stage} stage. Apply potassium foliar spray.'})
+        elif humidity > 80:
+            tips.append({'icon': '🌫️', 'color': '#6366f1',
+                'title': 'High Humidity Alert',
+                'msg': f'Humidity {humidity}% — ideal for fungal diseases. Ensure good drainage for {crop.name}.'})
+        else:
+            tips.append({'icon': '✅', 'color': '#16a34a',
+                'title': 'Good Growing Conditions',
+                'msg': f'Temp {temp}°C, humidity {humidity}% — suitable for {crop.name} at {stage} stage.'})
+
+        if stage == 'Flowering' and rain_chance > 50:
+            tips.append({'icon': '🌸', 'color': '#ec4899',
+                'title': 'Flowering Stage — Rain Risk',
+                'msg': f'{crop.name} is flowering. Heavy rain can damage flowers. Avoid chemical sprays now.'})
+
+        suggestions.append({'crop': crop, 'stage': stage, 'days': days, 'tips': tips})
+
+    # General tips
+    general_tips = []
+    if rain_chance > 60:
+        general_tips.append('🌧️ Rain expected — postpone fertilizer application 2-3 days.')
+        general_tips.append('🚜 Do not spray pesticides before rain — it washes off immediately.')
+    if temp > 35:
+        general_tips.append('🌡️ Very hot — do all field work before 10 AM or after 5 PM.')
+        general_tips.append('💧 Check drip/sprinkler systems for clogs in hot weather.')
+    if humidity > 80:
+        general_tips.append('🍄 High humidity — scout for fungal diseases every 2-3 days.')
+    if wind > 15:
+        general_tips.append('💨 High winds — do not spray pesticides or fertilizers today.')
+
+    return render_template('weather_suggestions.html',
+                           weather=weather,
+                           suggestions=suggestions,
+                           general_tips=general_tips,
+                           growing_crops=growing_crops)
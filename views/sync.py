@@ -0,0 +1,353 @@
+"""
+KrishiTrack – Offline Sync (delta protocol for field devices)
+
+Pull:  GET  /api/v1/sync/pull?cursor=<token>&tables=expenses,labours
+       Rows changed since the cursor, plus ids deleted since then.
+       Keep calling with the returned cursor while has_more is true.
+
+Push:  POST /api/v1/sync/push
+       {"expenses": [{"client_id": "...", "crop_id": 1, ...}],
+        "labours":  [...],
+        "deleted":  {"expenses": ["<client_id>", ...]}}
+       Rows are upserted by client-generated client_id, so a retried
+       batch is a no-op. Request bodies may be gzip-encoded.
+
+Responses are gzip-compressed when the client accepts it.
+
+Pages follow sync_seq, a per-table number that grows in commit order
+(changes.py), not updated_at: a row committed late – a long cascade, an
+archive run, a bulk settle – still lands after every cursor handed out
+before its commit, so no row is skipped however long its transaction ran.
+"""
+
+import base64
+import gzip
+import io
+import json
+from datetime import date, datetime, timezone
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import and_, event, insert, literal, or_, select
+
+from views.api import api_login_required, json_value
+from extensions import db
+from models import Crop, Expense, Labour, Harvest, SyncTombstone, change_counter
+
+sync = Blueprint('sync', __name__, url_prefix='/api/v1/sync')
+
+PULL_TABLES = {
+    'crops':    Crop,
+    'expenses': Expense,
+    'labours':  Labour,
+    'harvests': Harvest,
+}
+
+# Writable fields per table; everything else is server-owned.
+PUSH_FIELDS = {
+    'expenses': {'crop_id': int, 'date': date.fromisoformat,
+                 'seeds_cost': float, 'fertilizer_cost': float,
+                 'equipment_cost': float, 'labour_cost': float,
+                 'other_expenses': float, 'notes': str},
+    'labours':  {'crop_id': int, 'name': str, 'work_type': str,
+                 'days_worked': float, 'payment_per_day': float,
+                 'date': date.fromisoformat, 'notes': str},
+}
+PUSH_MODELS = {'expenses': Expense, 'labours': Labour}
+REQUIRED    = {'expenses': ('crop_id', 'date'),
+               'labours':  ('crop_id', 'name', 'date')}
+
+# Cursors of older servers held (updated_at, id) positions; those clients
+# start over, which their upserts by id make harmless.
+CURSOR_VERSION = 2
+
+
+class SyncError(Exception):
+    pass
+
+
+# ─────────────────────────────────────────────────────────────
+#  Tombstones – record deletes so devices can drop the rows
+# ─────────────────────────────────────────────────────────────
+
+def record_tombstone(mapper, connection, target):
+    connection.execute(insert(SyncTombstone).values(
+        table_name = target.__tablename__,
+        row_id     = target.id,
+        client_id  = getattr(target, 'client_id', None),
+        deleted_at = datetime.utcnow(),
+        sync_seq   = change_counter(target.__tablename__),
+    ))
+
+
+def record_cascade_tombstones(mapper, connection, target):
+    """Tombstones for the ledger rows ON DELETE CASCADE is about to remove
+    with a crop – one INSERT … SELECT per table, nothing loaded."""
+    now = datetime.utcnow()
+    for table, model in PULL_TABLES.items():
+        if model is Crop:
+            continue
+        connection.execute(insert(SyncTombstone).from_select(
+            ['table_name', 'row_id', 'client_id', 'deleted_at', 'sync_seq'],
+            select(literal(table), model.id, model.client_id, literal(now), change_counter(table))
+            .where(model.crop_id == target.id)))
+
+
+for _model in PULL_TABLES.values():
+    event.listen(_model, 'after_delete', record_tombstone)
+event.listen(Crop, 'before_delete', record_cascade_tombstones)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Cursor – opaque per-table (sync_seq, id) keyset positions
+# ─────────────────────────────────────────────────────────────
+
+def decode_cursor(token):
+    if not token:
+        return {}
+    try:
+        padded    = token + '=' * (-len(token) % 4)
+        positions = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise SyncError('Invalid cursor.')
+    if not isinstance(positions, dict):
+        raise SyncError('Invalid cursor.')
+    if positions.pop('v', None) != CURSOR_VERSION:
+        return {}
+    return positions
+
+
+def encode_cursor(positions):
+    raw = json.dumps(dict(positions, v=CURSOR_VERSION), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def after_position(seq_col, id_col, position):
+    """WHERE (seq, id) > (position) – keyset predicate on the index."""
+    if not position:
+        return None
+    try:
+        seq, row_id = int(position[0]), int(position[1])
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise SyncError('Invalid cursor.')
+    return or_(seq_col > seq, and_(seq_col == seq, id_col > row_id))
+
+
+def row_dict(row):
+    return {c.key: json_value(getattr(row, c.key)) for c in row.__table__.columns}
+
+
+# ─────────────────────────────────────────────────────────────
+#  Compression helpers
+# ─────────────────────────────────────────────────────────────
+
+def read_json_body():
+    limit = current_app.config['SYNC_MAX_BODY']
+    raw   = request.get_data(cache=False)
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(raw)) as gz:
+                raw = gz.read(limit + 1)
+        except OSError:
+            raise SyncError('Malformed gzip body.')
+    if len(raw) > limit:
+        raise SyncError('Sync batch too large.')
+    try:
+        return json.loads(raw or b'{}')
+    except ValueError:
+        raise SyncError('Body must be JSON.')
+
+
+def compressed_json(payload, status=200):
+    body = json.dumps(payload, default=json_value, separators=(',', ':')).encode()
+    resp = current_app.response_class(body, status=status, mimetype='application/json')
+    resp.vary.add('Accept-Encoding')
+    if 'gzip' in request.accept_encodings and len(body) > 512:
+        resp.set_data(gzip.compress(body, compresslevel=6))
+        resp.headers['Content-Encoding'] = 'gzip'
+    return resp
+
+
+# ─────────────────────────────────────────────────────────────
+#  Endpoints
+# ─────────────────────────────────────────────────────────────
+
+@sync.errorhandler(SyncError)
+def handle_sync_error(err):
+    return jsonify({'error': str(err)}), 400
+
+
+@sync.route('/pull')
+@api_login_required
+def pull():
+    positions = decode_cursor(request.args.get('cursor', ''))
+    raw       = request.args.get('tables', '')
+    tables    = [t.strip() for t in raw.split(',') if t.strip()] or list(PULL_TABLES)
+    unknown   = [t for t in tables if t not in PULL_TABLES]
+    if unknown:
+        raise SyncError(f"Unknown table(s): {', '.join(unknown)}")
+
+    limit = current_app.config['SYNC_PAGE_SIZE']
+    page  = max(1, min(request.args.get('limit', limit, type=int), limit))
+
+    changes, deleted, has_more = {}, {}, False
+    for table in tables:
+        model = PULL_TABLES[table]
+        stmt  = (select(model)
+                 .where(model.sync_seq.is_not(None))
+                 .order_by(model.sync_seq, model.id)
+                 .limit(page))
+        cond = after_position(model.sync_seq, model.id, positions.get(table))
+        if cond is not None:
+            stmt = stmt.where(cond)
+        rows = db.session.scalars(stmt).all()
+        changes[table] = [row_dict(r) for r in rows]
+        if rows:
+            positions[table] = [rows[-1].sync_seq, rows[-1].id]
+        has_more = has_more or len(rows) == page
+
+        key   = f'{table}.deleted'
+        tstmt = (select(SyncTombstone)
+                 .where(SyncTombstone.table_name == table,
+                        SyncTombstone.sync_seq.is_not(None))
+                 .order_by(SyncTombstone.sync_seq, SyncTombstone.id)
+                 .limit(page))
+        cond = after_position(SyncTombstone.sync_seq, SyncTombstone.id, positions.get(key))
+        if cond is not None:
+            tstmt = tstmt.where(cond)
+        tombs = db.session.scalars(tstmt).all()
+        deleted[table] = [{'id': t.row_id, 'client_id': t.client_id} for t in tombs]
+        if tombs:
+            positions[key] = [tombs[-1].sync_seq, tombs[-1].id]
+        has_more = has_more or len(tombs) == page
+
+    return compressed_json({
+        'cursor':   encode_cursor(positions),
+        'has_more': has_more,
+        'changes':  changes,
+        'deleted':  deleted,
+    })
+
+
+@sync.route('/push', methods=['POST'])
+@api_login_required
+def push():
+    data = read_json_body()
+    if not isinstance(data, dict):
+        raise SyncError('Body must be a JSON object.')
+    for table in PUSH_MODELS:
+        if not isinstance(data.get(table) or [], list):
+            raise SyncError(f'{table} must be a list of rows.')
+    deletes = data.get('deleted') or {}
+    if not isinstance(deletes, dict):
+        raise SyncError('deleted must be an object of client_id lists.')
+    for table, client_ids in deletes.items():
+        if table in PUSH_MODELS and not (isinstance(client_ids, list) and
+                                         all(isinstance(c, str) for c in client_ids)):
+            raise SyncError(f'deleted.{table} must be a list of client_ids.')
+
+    batch_size = sum(len(data.get(t) or []) for t in PUSH_MODELS)
+    if batch_size > current_app.config['SYNC_PAGE_SIZE']:
+        raise SyncError(f"At most {current_app.config['SYNC_PAGE_SIZE']} rows per push.")
+
+    refs = set()
+    for t in PUSH_MODELS:
+        for i in data.get(t) or []:
+            if isinstance(i, dict) and i.get('crop_id') is not None:
+                try:
+                    refs.add(PUSH_FIELDS[t]['crop_id'](i['crop_id']))
+                except (TypeError, ValueError):
+                    pass                      # apply_item reports it
+    crop_ids = set(db.session.scalars(select(Crop.id).where(Crop.id.in_(refs)))) if refs else set()
+    results  = {}
+
+    for table, model in PUSH_MODELS.items():
+        items = data.get(table) or []
+        ids   = [client_key(i) for i in items if isinstance(i, dict)]
+        ids   = [i for i in ids if i]
+        existing = {r.client_id: r for r in
+                    db.session.scalars(select(model).where(model.client_id.in_(ids)))} if ids else {}
+        results[table] = [apply_item(table, model, item, existing, crop_ids)
+                          for item in items]
+
+    for table, client_ids in deletes.items():
+        model = PUSH_MODELS.get(table)
+        if model is None:
+            continue
+        rows = db.session.scalars(select(model).where(model.client_id.in_(client_ids))).all()
+        for row in rows:
+            db.session.delete(row)
+        results.setdefault(f'{table}.deleted', []).extend(
+            {'client_id': r.client_id, 'status': 'deleted'} for r in rows)
+
+    db.session.commit()
+    for table_results in results.values():
+        for r in table_results:
+            obj = r.pop('_obj', None)
+            if obj is not None:
+                r['id'] = obj.id
+    return compressed_json({'results': results})
+
+
+def client_key(item):
+    """The row's client_id as stored, or '' when it isn't a string/number."""
+    value = item.get('client_id')
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        return ''
+    return str(value).strip()
+
+
+def parse_client_ts(value):
+    """A pushed updated_at as naive UTC, like the server's columns. Accepts
+    offsets and the 'Z' suffix of JavaScript's toISOString()."""
+    if not isinstance(value, str):
+        raise ValueError(value)
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def apply_item(table, model, item, existing, crop_ids):
+    """Validate one pushed row and upsert it. Returns a result dict."""
+    if not isinstance(item, dict):
+        return {'status': 'error', 'error': 'Row must be an object.'}
+    client_id = client_key(item)
+    if not client_id or len(client_id) > 36:
+        return {'status': 'error', 'error': 'client_id is required (max 36 chars).'}
+
+    values = {}
+    try:
+        for field, cast in PUSH_FIELDS[table].items():
+            if field in item and item[field] is not None:
+                values[field] = cast(item[field])
+    except (TypeError, ValueError) as exc:
+        return {'client_id': client_id, 'status': 'error', 'error': str(exc)}
+
+    row = existing.get(client_id)
+    if row is None:
+        missing = [f for f in REQUIRED[table] if f not in values]
+        if missing:
+            return {'client_id': client_id, 'status': 'error',
+                    'error': f"Missing field(s): {', '.join(missing)}"}
+    if 'crop_id' in values and values['crop_id'] not in crop_ids:
+        return {'client_id': client_id, 'status': 'error', 'error': 'Unknown crop_id.'}
+
+    if row is None:
+        row = model(client_id=client_id, **values)
+        db.session.add(row)
+        existing[client_id] = row
+        return {'client_id': client_id, 'status': 'created', '_obj': row}
+
+    # Last writer wins, unless the device edited an older copy.
+    client_ts = item.get('updated_at')
+    if client_ts and row.updated_at:
+        try:
+            if parse_client_ts(client_ts) < row.updated_at:
+                return {'client_id': client_id, 'id': row.id, 'status': 'stale'}
+        except ValueError:
+            return {'client_id': client_id, 'status': 'error', 'error': 'Bad updated_at.'}
+    if all(getattr(row, k) == v for k, v in values.items()):
+        return {'client_id': client_id, 'id': row.id, 'status': 'unchanged'}
+    for k, v in values.items():
+        setattr(row, k, v)
+    return {'client_id': client_id, 'status': 'updated', '_obj': row}
@@ -0,0 +1,253 @@
+"""
+KrishiTrack – Workforce
+A worker dimension over the labour ledger. Labour.name stays the free
+text the farmer typed; Labour.worker_id points at one `workers` row per
+person, matched on the name with case and spacing ignored, so
+"Anita Kumar", "anita kumar" and " Anita Kumar  " are one worker.
+
+  • ORM writes (forms, sync push, API) get their worker before each flush
+  • Core bulk inserts are linked afterwards by assign_workers(), which is
+    also the 0004 migration: a few grouped statements, never a row loop
+
+Every report below is a grouped query – per worker, or per (day, worker)
+for the weekly demand series – so no view loads the labours table.
+
+Payments: amount_paid NULL means paid in full (every record before this
+existed); a number is what has been paid so far, the rest is owed.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import distinct, event, func, insert, inspect, select, text, update
+from sqlalchemy.orm import Session
+
+from money import labour_paise, paise, rupees
+
+
+def name_key(name):
+    """Matching key for a worker name: spacing collapsed, case folded."""
+    return ' '.join((name or '').split()).casefold()
+
+
+def display_name(name):
+    return ' '.join((name or '').split())
+
+
+# ─────────────────────────────────────────────────────────────
+#  Linking labour rows to workers
+# ─────────────────────────────────────────────────────────────
+
+def assign_workers(conn):
+    """Create workers for unlinked labour names and link those rows.
+
+    The spelling used most often becomes the worker's display name.
+    Returns the number of workers created.
+    """
+    from models import Labour, Worker
+
+    spellings = conn.execute(select(Labour.name, func.count(Labour.id))
+                             .where(Labour.worker_id.is_(None))
+                             .group_by(Labour.name)).all()
+    if not spellings:
+        return 0
+    from changes import bump
+    bump(conn, {('workers', None), ('labours', None)})     # raw connection: no hooks. Before writing, see changes.py
+
+    best = {}
+    for name, n in spellings:
+        key = name_key(name)
+        if key and (key not in best or n > best[key][1]):
+            best[key] = (display_name(name), n)
+    known = set(conn.scalars(select(Worker.name_key)))
+    now   = datetime.utcnow()
+    fresh = [{'name': shown, 'name_key': key, 'created_at': now}
+             for key, (shown, _) in best.items() if key not in known]
+    if fresh:
+        conn.execute(insert(Worker), fresh)
+
+    # One UPDATE through a spelling -> worker map instead of one per name.
+    ids = dict(conn.execute(select(Worker.name_key, Worker.id)).all())
+    conn.execute(text('CREATE TEMPORARY TABLE worker_names '
+                      '(name VARCHAR(120) NOT NULL, worker_id INTEGER NOT NULL)'))
+    conn.execute(text('CREATE INDEX ix_worker_names_name ON worker_names (name)'))
+    try:
+        conn.execute(text('INSERT INTO worker_names (name, worker_id) VALUES (:name, :worker_id)'),
+                     [{'name': name, 'worker_id': ids[name_key(name)]}
+                      for name, _ in spellings if name_key(name)])
+        conn.execute(text('UPDATE labours SET worker_id = '
+                          '(SELECT MIN(w.worker_id) FROM worker_names w WHERE w.name = labours.name), '
+                          'sync_seq = (SELECT version FROM data_versions '
+                          "WHERE table_name = 'labours' AND crop_id = 0) "
+                          'WHERE worker_id IS NULL'))
+    finally:
+        conn.execute(text('DROP TABLE worker_names'))
+    return len(fresh)
+
+
+def _before_flush(sess, flush_context, instances):
+    from models import Labour, Worker
+
+    pending = [obj for obj in (*sess.new, *sess.dirty) if isinstance(obj, Labour)
+               and (obj.worker_id is None or inspect(obj).attrs.name.history.has_changes())]
+    if not pending:
+        return
+    cache = {}
+    with sess.no_autoflush:
+        for labour in pending:
+            key    = name_key(labour.name)
+            worker = labour.worker
+            if not key or (worker is not None and worker.name_key == key):
+                continue
+            if key not in cache:
+                cache[key] = (sess.scalar(select(Worker).where(Worker.name_key == key))
+                              or Worker(name=display_name(labour.name), name_key=key))
+                sess.add(cache[key])
+            labour.worker = cache[key]
+
+
+def init_workforce(app):
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Grouped reports
+# ─────────────────────────────────────────────────────────────
+
+def _pay():
+    return rupees(labour_paise())
+
+
+def _owed():
+    from models import Labour
+    return rupees(labour_paise() - func.coalesce(paise(Labour.amount_paid), labour_paise()))
+
+
+def _filtered(stmt, start=None, end=None, crop_id=None, worker_id=None):
+    from models import Labour
+    if worker_id:
+        stmt = stmt.where(Labour.worker_id == worker_id)
+    if start is not None:
+        stmt = stmt.where(Labour.date >= start)
+    if end is not None:
+        stmt = stmt.where(Labour.date <= end)
+    if crop_id:
+        stmt = stmt.where(Labour.crop_id == crop_id)
+    return stmt
+
+
+def ledger_totals(s, start=None, end=None, crop_id=None, worker_id=None):
+    """{'entries', 'days', 'payment', 'owed'} over the filtered ledger."""
+    from models import Labour
+    entries, days, pay, owed = s.execute(_filtered(
+        select(func.count(Labour.id), func.sum(Labour.days_worked),
+               func.sum(_pay()), func.sum(_owed())), start, end, crop_id, worker_id)).one()
+    return {'entries': entries, 'days': days or 0.0,
+            'payment': pay or 0.0, 'owed': owed or 0.0}
+
+
+def worker_totals(s, start=None, end=None, crop_id=None):
+    """Days, pay and amount owed per worker, highest paid first."""
+    from models import Labour, Worker
+
+    # Aggregate the filtered labour rows first, then attach names: joining
+    # workers up front lets the planner walk every worker's rows instead.
+    totals = _filtered(
+        select(Labour.worker_id,
+               func.count(Labour.id).label('entries'),
+               func.count(distinct(Labour.crop_id)).label('crops'),
+               func.sum(Labour.days_worked).label('days'),
+               func.sum(_pay()).label('pay'),
+               func.sum(_owed()).label('owed'),
+               func.min(Labour.date).label('first'),
+               func.max(Labour.date).label('last'))
+        .group_by(Labour.worker_id), start, end, crop_id).subquery()
+    stmt = (select(Worker.id, Worker.name, totals.c.entries, totals.c.crops, totals.c.days,
+                   totals.c.pay, totals.c.owed, totals.c.first, totals.c.last)
+            .join(totals, totals.c.worker_id == Worker.id)
+            .order_by(totals.c.pay.desc()))
+    return [{'id': wid, 'name': name, 'entries': entries, 'crops': crops,
+             'days': days or 0.0, 'payment': pay or 0.0, 'owed': owed or 0.0,
+             'first': first, 'last': last}
+            for wid, name, entries, crops, days, pay, owed, first, last in s.execute(stmt)]
+
+
+def worker_crops(s, worker_id, start=None, end=None):
+    """One worker's days and pay per crop."""
+    from models import Crop, Labour
+
+    stmt = (select(Crop.id, Crop.name, func.sum(Labour.days_worked),
+                   func.sum(_pay()), func.sum(_owed()))
+            .select_from(Labour)
+            .join(Crop, Crop.id == Labour.crop_id)
+            .group_by(Crop.id, Crop.name)
+            .order_by(func.sum(Labour.days_worked).desc()))
+    return [{'crop_id': cid, 'crop': name, 'days': days or 0.0,
+             'payment': pay or 0.0, 'owed': owed or 0.0}
+            for cid, name, days, pay, owed
+            in s.execute(_filtered(stmt, start, end, worker_id=worker_id))]
+
+
+def outstanding(s, crop_id=None):
+    """Workers with unpaid wages: amount owed, part-paid entries and the
+    oldest of them, largest debt first. Advances (paid more than earned)
+    count against the same worker's debt."""
+    from models import Labour, Worker
+
+    owed = _filtered(
+        select(Labour.worker_id,
+               func.sum(_owed()).label('owed'),
+               func.count(Labour.id).label('entries'),
+               func.min(Labour.date).label('since'))
+        .where(Labour.amount_paid.is_not(None))
+        .group_by(Labour.worker_id)
+        .having(func.sum(_owed()) > 0.005), crop_id=crop_id).subquery()
+    stmt = (select(Worker.id, Worker.name, owed.c.owed, owed.c.entries, owed.c.since)
+            .join(owed, owed.c.worker_id == Worker.id)
+            .order_by(owed.c.owed.desc()))
+    return [{'id': wid, 'name': name, 'owed': amount or 0.0, 'entries': n, 'since': since}
+            for wid, name, amount, n, since in s.execute(stmt)]
+
+
+def settle(s, worker_id):
+    """Mark every entry of a worker paid in full. Returns rows changed."""
+    from models import Labour
+    result = s.execute(update(Labour)
+                       .where(Labour.worker_id == worker_id, Labour.amount_paid.is_not(None))
+                       .values(amount_paid=None, updated_at=datetime.utcnow())
+                       .execution_options(synchronize_session=False))
+    s.commit()
+    return result.rowcount
+
+
+def weekly_demand(s, start, end, crop_id=None):
+    """Worker-days, wages and head count per Monday-started week.
+
+    SQL returns one row per (day, worker), wages in paise; NumPy buckets
+    them into weeks.
+    Weeks without labour are included as zeros.
+    """
+    import numpy as np
+    from analytics import bucket_keys, bucket_label, bucket_start, day_numbers
+    from models import Labour
+
+    rows = s.execute(_filtered(
+        select(Labour.date, Labour.worker_id, func.sum(Labour.days_worked),
+               func.sum(labour_paise()))
+        .group_by(Labour.date, Labour.worker_id), start, end, crop_id)).all()
+
+    first = int(bucket_keys(day_numbers([start]), 'week')[0])
+    n     = int(bucket_keys(day_numbers([end]), 'week')[0] - first) // 7 + 1
+    days, pay, heads = np.zeros(n), np.zeros(n), np.zeros(n, dtype=np.int64)
+    if rows:
+        week    = (bucket_keys(day_numbers([r[0] for r in rows]), 'week') - first) // 7
+        workers = np.array([r[1] or 0 for r in rows], dtype=np.int64)
+        days    = np.bincount(week, np.array([r[2] or 0.0 for r in rows]), n)
+        pay     = np.bincount(week, np.array([r[3] or 0 for r in rows], dtype=float), n) / 100
+        span    = workers.max() + 1                 # distinct (week, worker) pairs
+        heads   = np.bincount(np.unique(week * span + workers) // span, minlength=n)
+
+    keys = first + 7 * np.arange(n)
+    return [{'week': bucket_label(k, 'week'), 'start': bucket_start(k, 'week'),
+             'days': float(d), 'payment': float(p), 'workers': int(h)}
+            for k, d, p, h in zip(keys, days, pay, heads)]
@@ -0,0 +1,90 @@
+"""
+KrishiTrack – Set-based Writes
+Child rows belong to the database, not the session:
+
+  • expenses, labours, harvests, crop_photos and crop_photo_index use
+    ON DELETE CASCADE and the Crop relationships are passive, so deleting
+    a crop is one DELETE however long its ledger is – nothing is loaded.
+    Tombstones (views/sync.py) and search documents (search.py) for the
+    cascaded rows are written by their flush hooks with set-based
+    statements. SQLite only honours the cascade with PRAGMA foreign_keys,
+    switched on for every connection here.
+  • unit_of_work() – queue the inserts, updates and deletes that belong
+    together and send them in one transaction with one commit; inserts
+    into the same table go as one multi-row statement.
+
+Queued statements are Core, so ORM flush hooks do not see them: use it
+for tables without search documents or worker links (or refresh those
+afterwards), and go through the session for everything else.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.engine import Engine
+
+
+def _sqlite_foreign_keys(dbapi_conn, connection_record):
+    if isinstance(dbapi_conn, sqlite3.Connection):
+        cursor = dbapi_conn.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+def init_writes(app):
+    if not event.contains(Engine, 'connect', _sqlite_foreign_keys):
+        event.listen(Engine, 'connect', _sqlite_foreign_keys)
+
+
+# ─────────────────────────────────────────────────────────────
+#  Unit of work
+# ─────────────────────────────────────────────────────────────
+
+class UnitOfWork:
+    """Writes queued against a session, sent in order by flush()."""
+
+    def __init__(self, s):
+        self.s   = s
+        self.ops = []                      # (model, [rows]) or a statement
+
+    def insert(self, model, **values):
+        last = self.ops[-1] if self.ops else None
+        if isinstance(last, tuple) and last[0] is model:
+            last[1].append(values)
+        else:
+            self.ops.append((model, [values]))
+
+    def update(self, model, *where, **values):
+        self.ops.append(update(model).where(*where).values(**values)
+                        .execution_options(synchronize_session=False))
+
+    def delete(self, model, *where):
+        self.ops.append(delete(model).where(*where)
+                        .execution_options(synchronize_session=False))
+
+    def flush(self):
+        """Execute what is queued. Returns the rows each statement touched."""
+        counts = []
+        for op in self.ops:
+            if isinstance(op, tuple):
+                self.s.execute(insert(op[0]), op[1])
+                counts.append(len(op[1]))
+            else:
+                counts.append(self.s.execute(op).rowcount)
+        self.ops = []
+        return counts
+
+
+@contextmanager
+def unit_of_work(s):
+    """Queue writes on the yielded UnitOfWork; they are flushed together
+    with any pending ORM changes and committed once, or rolled back."""
+    uow = UnitOfWork(s)
+    try:
+        yield uow
+        uow.flush()
+        s.commit()
+    except Exception:
+        s.rollback()
+        raise